@@ -22,7 +22,18 @@ USE_TZ = True
 DATABASES = {
     'default': env.db('DATABASE_URL'),
 }
-DATABASES['default']['ATOMIC_REQUESTS'] = True
+# Views opt in to transactions, see cride.utils.views.TransactionPolicyMixin
+DATABASES['default']['ATOMIC_REQUESTS'] = False
+
+# Read replicas, list and retrieve requests are served by them
+DATABASE_REPLICAS = []
+for number, url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[]), start=1):
+    alias = 'replica_{}'.format(number)
+    DATABASES[alias] = env.db_url_config(url)
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['cride.utils.db.ReplicaRouter']
+# Clients read from the primary database for a while after writing
+DATABASE_REPLICA_PIN_SECONDS = env.int('DATABASE_REPLICA_PIN_SECONDS', default=5)
 
 # URLs
 ROOT_URLCONF = 'config.urls'
@@ -32,6 +43,21 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 # Users & Authentication
 AUTH_USER_MODEL = 'users.User'
+USERS_TOKEN_CACHE_TIMEOUT = env.int('USERS_TOKEN_CACHE_TIMEOUT', default=60)
+# Logins issue `token` DRF tokens or `jwt` signed tokens, see cride.users.authentication
+USERS_AUTHENTICATION = env('USERS_AUTHENTICATION', default='token')
+USERS_ACCESS_TOKEN_LIFETIME = env.int('USERS_ACCESS_TOKEN_LIFETIME', default=5 * 60)
+USERS_REFRESH_TOKEN_LIFETIME = env.int('USERS_REFRESH_TOKEN_LIFETIME', default=7 * 24 * 60 * 60)
+
+# Circles
+CIRCLES_CACHE_TIMEOUT = env.int('CIRCLES_CACHE_TIMEOUT', default=15 * 60)
+CIRCLES_MEMBERSHIP_CACHE_TIMEOUT = env.int('CIRCLES_MEMBERSHIP_CACHE_TIMEOUT', default=5 * 60)
+CIRCLES_LIST_CACHE_TIMEOUT = env.int('CIRCLES_LIST_CACHE_TIMEOUT', default=60)
+
+# Rides
+RIDES_EXPIRY_BATCH_SIZE = env.int('RIDES_EXPIRY_BATCH_SIZE', default=500)
+RIDES_EXPIRY_LOOKBACK = env.int('RIDES_EXPIRY_LOOKBACK', default=60 * 60)
+RIDES_MATCH_WINDOW = env.int('RIDES_MATCH_WINDOW', default=3 * 60 * 60)
 
 # Apps
 DJANGO_APPS = [
@@ -51,7 +77,8 @@ THIRD_PARTY_APPS = [
 LOCAL_APPS = [
     'cride.users.apps.UserAppConfig',
     'cride.circles.apps.CircleAppConfig',
-    'cride.rides.apps.RidesAppConfig'
+    'cride.rides.apps.RidesAppConfig',
+    'cride.emails.apps.EmailsAppConfig',
 ]
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
@@ -81,6 +108,7 @@ AUTH_PASSWORD_VALIDATORS = [
 # Middlewares
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'cride.utils.db.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -139,6 +167,19 @@ X_FRAME_OPTIONS = 'DENY'
 
 # Email
 EMAIL_BACKEND = env('DJANGO_EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_TIMEOUT = env.int('EMAIL_TIMEOUT', default=30)
+
+# Email outbox
+EMAIL_OUTBOX_BATCH_SIZE = env.int('EMAIL_OUTBOX_BATCH_SIZE', default=100)
+EMAIL_OUTBOX_MAX_BATCHES = env.int('EMAIL_OUTBOX_MAX_BATCHES', default=10)
+EMAIL_OUTBOX_INTERVAL = env.int('EMAIL_OUTBOX_INTERVAL', default=10)
+EMAIL_OUTBOX_MAX_ATTEMPTS = env.int('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5)
+EMAIL_OUTBOX_RETRY_DELAY = env.int('EMAIL_OUTBOX_RETRY_DELAY', default=60)
+# Seconds a worker owns the messages it claimed, unfinished ones are retried after
+EMAIL_OUTBOX_LEASE = env.int('EMAIL_OUTBOX_LEASE', default=10 * 60)
+# Messages per minute and recipient domain
+EMAIL_OUTBOX_RATE_LIMIT = env.int('EMAIL_OUTBOX_RATE_LIMIT', default=60)
+EMAIL_OUTBOX_DOMAIN_RATE_LIMITS = {}
 
 # Admin
 ADMIN_URL = 'admin/'
@@ -158,16 +199,30 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERYD_TASK_TIME_LIMIT = 5 * 60
 CELERYD_TASK_SOFT_TIME_LIMIT = 60
+CELERY_BEAT_SCHEDULE = {
+    'deliver-emails': {
+        'task': 'deliver_emails',
+        'schedule': EMAIL_OUTBOX_INTERVAL,
+    },
+    'disable-finished-rides': {
+        'task': 'disabled_finished_rides',
+        'schedule': 60,
+    },
+}
 
 
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'cride.utils.renderers.FastJSONRenderer',
         # 'rest_framework.renderers.BrowsableAPIRenderer',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'cride.users.authentication.CachedTokenAuthentication',
+        'cride.users.authentication.JWTAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 10
 }
+
+# Serialize list pages from .values() rows, see cride.utils.fast_serializers
+FAST_LIST_SERIALIZERS = env.bool('FAST_LIST_SERIALIZERS', default=True)
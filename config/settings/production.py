@@ -9,7 +9,7 @@ ALLOWED_HOSTS = env.list('DJANGO_ALLOWED_HOSTS', default=['comparteride.com'])
 
 # Databases
 DATABASES['default'] = env.db('DATABASE_URL')  # NOQA
-DATABASES['default']['ATOMIC_REQUESTS'] = True  # NOQA
+DATABASES['default']['ATOMIC_REQUESTS'] = False  # NOQA
 DATABASES['default']['CONN_MAX_AGE'] = env.int('CONN_MAX_AGE', default=60)  # NOQA
 
 # Cache
@@ -131,6 +131,11 @@ LOGGING = {
             'level': 'ERROR',
             'handlers': ['console', 'mail_admins'],
             'propagate': True
+        },
+        'cride': {
+            'level': 'INFO',
+            'handlers': ['console'],
+            'propagate': True
         }
     }
 }
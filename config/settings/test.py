@@ -11,6 +11,12 @@ DEBUG = False
 SECRET_KEY = env("DJANGO_SECRET_KEY", default="7lEaACt4wsCj8JbXYgQLf4BmdG5QbuHTMYUGir2Gc1GHqqb2Pv8w9iXwwlIIviI2")
 TEST_RUNNER = "django.test.runner.DiscoverRunner"
 
+# Databases
+# Stands for a read replica, tests opt in with DATABASE_REPLICAS=["replica"]
+DATABASES["replica"] = dict(DATABASES["default"], ATOMIC_REQUESTS=False, TEST={})  # NOQA
+if DATABASES["default"]["ENGINE"] != "django.db.backends.sqlite3":  # NOQA
+    DATABASES["replica"]["TEST"] = {"NAME": "test_{}_replica".format(DATABASES["default"]["NAME"])}  # NOQA
+
 # Cache
 CACHES = {
     "default": {
@@ -2,16 +2,19 @@
 
 # Django
 from django.contrib import admin
-from django.http import HttpResponse
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.urls import path
 from django.utils import timezone
 
 # Model
 from cride.circles.models import Circle, Membership, Invitation
-from cride.rides.models import Ride
+
+# Cache
+from cride.circles.cache import invalidate_circle, invalidate_circles_list
 
 # Utiles
-from datetime import datetime, timedelta
-import csv
+from cride.rides import exports
 
 
 @admin.register(Circle)
@@ -33,54 +36,83 @@ class CircleAdmin(admin.ModelAdmin):
         'is_limited'
     )
 
-    actions = ['make_verified', 'make_unverified', 'download_todays_rides']
+    actions = ['make_verified', 'make_unverified', 'download_todays_rides', 'download_todays_rides_jsonl']
 
     def make_verified(self, request, queryset):
         """Make circles verified."""
-        queryset.update(verified=True)
+        queryset.update(verified=True, modified=timezone.now())
+        self.invalidate(queryset)
     make_verified.short_description = 'Make selected circles verified'
 
     def make_unverified(self, request, queryset):
         """Make circles unverified."""
-        queryset.update(verified=False)
+        queryset.update(verified=False, modified=timezone.now())
+        self.invalidate(queryset)
     make_unverified.short_description = 'Make selected circles unverified'
 
-    def download_todays_rides(self, request, queryset):
-        """Return today's rides."""
-        now = timezone.now()
-        start = datetime(now.year, now.month, now.day, 0, 0, 0)
-        end = start + timedelta(days=1)
-        rides = Ride.objects.filter(
-            offered_in__in=queryset.values_list('id'),
-            departure_date__gte=start,
-            departure_date__lte=end
+    def invalidate(self, queryset):
+        """Drop the cached circles, bulk updates don't send signals."""
+        invalidate_circle(*queryset.values_list('slug_name', flat=True))
+        invalidate_circles_list()
+
+    def get_urls(self):
+        """Add the rides export view."""
+        urls = [
+            path(
+                'export-rides/',
+                self.admin_site.admin_view(self.export_rides_view),
+                name='circles_circle_export_rides'
+            ),
+        ]
+        return urls + super(CircleAdmin, self).get_urls()
+
+    def stream_rides(self, rides, export_format, filename):
+        """Return a streaming download of the rides."""
+        response = StreamingHttpResponse(
+            exports.export_rides(rides, export_format),
+            content_type=exports.CONTENT_TYPES[export_format]
         )
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="todays_rides.csv"'
-
-        writer = csv.writer(response)
-        writer.writerow([
-            'id',
-            'passengers',
-            'departure_location',
-            'departure_date',
-            'arrival_location',
-            'arrival_date',
-            'rating'
-        ])
-        for ride in rides:
-            writer.writerow([
-                ride.pk,
-                ride.passengers.count(),
-                ride.departure_location,
-                str(ride.departure_date),
-                ride.arrival_location,
-                str(ride.arrival_date),
-                ride.rating
-            ])
+        response['Content-Disposition'] = 'attachment; filename="{}.{}"'.format(filename, export_format)
         return response
+
+    def download_todays_rides(self, request, queryset):
+        """Return today's rides."""
+        start, end = exports.today()
+        rides = exports.get_rides(circles=queryset.values('id'), start=start, end=end)
+        return self.stream_rides(rides, 'csv', 'todays_rides')
     download_todays_rides.short_description = 'Download Todays Rides'
 
+    def download_todays_rides_jsonl(self, request, queryset):
+        """Return today's rides as JSON lines."""
+        start, end = exports.today()
+        rides = exports.get_rides(circles=queryset.values('id'), start=start, end=end)
+        return self.stream_rides(rides, 'jsonl', 'todays_rides')
+    download_todays_rides_jsonl.short_description = 'Download Todays Rides (JSON lines)'
+
+    def export_rides_view(self, request):
+        """Export the rides departing in a date range.
+
+        Query params: start and end (ISO dates or datetimes, end is
+        exclusive), format (csv or jsonl) and circle (ids, repeatable).
+        Either the date range or a circle is required. Staff members
+        need to be allowed to view circles and rides.
+        """
+        if not self.has_view_permission(request) or not request.user.has_perm('rides.view_ride'):
+            raise PermissionDenied
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in exports.EXPORTERS:
+            return HttpResponseBadRequest('Unknown format.')
+        try:
+            start = exports.parse_bound(request.GET['start']) if request.GET.get('start') else None
+            end = exports.parse_bound(request.GET['end']) if request.GET.get('end') else None
+            circles = [int(pk) for pk in request.GET.getlist('circle')] or None
+        except ValueError as error:
+            return HttpResponseBadRequest(str(error))
+        if not (start and end) and not circles:
+            return HttpResponseBadRequest('A date range (start and end) or a circle is required.')
+        rides = exports.get_rides(circles=circles, start=start, end=end)
+        return self.stream_rides(rides, export_format, 'rides')
+
 
 @admin.register(Membership)
 class MembershipAdmin(admin.ModelAdmin):
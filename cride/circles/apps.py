@@ -8,3 +8,7 @@ class CircleAppConfig(AppConfig):
 
     name = 'cride.circles'
     verbose_name = 'Circles'
+
+    def ready(self):
+        """Register signals."""
+        from cride.circles import signals  # noqa
@@ -0,0 +1,219 @@
+"""Circles cache.
+
+Resolve the objects most endpoints look up on every request,
+memoized for the lifetime of the request and cached in the
+configured Django cache, and share the public circles list pages
+between users. Entries are invalidated by the receivers in
+`cride.circles.signals` once the change is committed.
+
+Invalidated entries are replaced by a tombstone for a while and
+entries are only added where there is nothing, so a request that
+loaded the object before the change can't cache it back.
+"""
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.shortcuts import get_object_or_404
+
+# Models
+from cride.circles.models import Circle, Membership
+
+# Utilities
+from cride.utils.db import replica_reads
+import hashlib
+import time
+
+
+# Bump when the cached models change so stale pickles are ignored.
+CACHE_VERSION = 2
+
+CIRCLE_KEY = 'circles:circle:v{version}:{slug_name}'
+MEMBERSHIP_KEY = 'circles:membership:v{version}:{circle}:{user}'
+LIST_KEY = 'circles:list:v{version}:{generation}:{query}'
+LIST_GENERATION_KEY = 'circles:list:generation'
+
+# Seconds a list page computation may hold its lock, seconds other
+# requests wait for it before computing the page themselves, and
+# seconds between their checks. Waits are kept short, they hold
+# request threads.
+LIST_LOCK_TIMEOUT = 10
+LIST_LOCK_WAIT = 0.2
+LIST_LOCK_POLL = 0.02
+
+# Cached when the user has no active membership in the circle.
+NOT_A_MEMBER = 'not-a-member'
+
+# Cached in place of invalidated entries for INVALIDATION_GRACE
+# seconds, longer than any load started before the invalidation.
+INVALIDATED = 'invalidated'
+INVALIDATION_GRACE = 30
+
+
+def get_or_load(key, load, timeout):
+    """Return the cached value of the key, loading and caching it on misses.
+
+    Invalidated keys are loaded but not cached until their tombstone
+    expires.
+    """
+    value = cache.get(key) if timeout else None
+    if value is None or value == INVALIDATED:
+        cached = value
+        value = load()
+        if timeout and cached is None:
+            cache.add(key, value, timeout)
+    return value
+
+
+def invalidate(*keys):
+    """Replace the cached values of the keys with tombstones."""
+    cache.set_many({key: INVALIDATED for key in keys}, INVALIDATION_GRACE)
+
+
+def circle_key(slug_name):
+    """Return the cache key of a circle."""
+    return CIRCLE_KEY.format(version=CACHE_VERSION, slug_name=slug_name)
+
+
+def membership_key(circle_id, user_id):
+    """Return the cache key of a user membership in a circle."""
+    return MEMBERSHIP_KEY.format(version=CACHE_VERSION, circle=circle_id, user=user_id)
+
+
+def get_circle_or_404(slug_name):
+    """Return the circle with the given slug name or raise Http404.
+
+    Circles are cached by slug name, unknown slugs are not. Counters
+    updated in place (members_count, rides_offered, rides_taken) skip
+    the invalidation, so their values on the cached circle are stale
+    and must not be read, update them with F() expressions instead.
+    """
+    return get_or_load(
+        circle_key(slug_name),
+        lambda: get_object_or_404(Circle.objects.using(DEFAULT_DB_ALIAS), slug_name=slug_name),
+        settings.CIRCLES_CACHE_TIMEOUT
+    )
+
+
+def invalidate_circle(*slug_names):
+    """Invalidate the cached circles with the given slug names."""
+    invalidate(*[circle_key(slug_name) for slug_name in slug_names if slug_name])
+
+
+def get_active_membership(request, circle, user=None):
+    """Return the active membership of the user in the circle, or None.
+
+    The requesting user is used unless another user is given.
+    Permissions and serializers handling the same request share
+    a single lookup.
+    """
+    user = user or request.user
+    if not user.is_authenticated:
+        return None
+
+    memberships = getattr(request, '_circle_memberships', None)
+    if memberships is None:
+        memberships = {}
+        request._circle_memberships = memberships
+
+    key = membership_key(circle.pk, user.pk)
+    if key not in memberships:
+        memberships[key] = load_active_membership(circle, user)
+    return memberships[key]
+
+
+def load_active_membership(circle, user):
+    """Return the active membership of the user in the circle, using the cache."""
+    membership = get_or_load(
+        membership_key(circle.pk, user.pk),
+        lambda: fetch_active_membership(circle, user) or NOT_A_MEMBER,
+        settings.CIRCLES_MEMBERSHIP_CACHE_TIMEOUT
+    )
+    return None if membership == NOT_A_MEMBER else membership
+
+
+def fetch_active_membership(circle, user):
+    """Return the active membership of the user in the circle from the database, or None."""
+    return Membership.objects.using(DEFAULT_DB_ALIAS).filter(
+        user=user,
+        circle=circle,
+        is_active=True
+    ).first()
+
+
+def invalidate_membership(circle_id, user_id):
+    """Invalidate the cached membership of a user in a circle."""
+    invalidate(membership_key(circle_id, user_id))
+
+
+def get_list_generation():
+    """Return the current generation of the cached lists.
+
+    Generations start from the clock so a generation lost by the
+    cache never comes back to an older one.
+    """
+    generation = cache.get(LIST_GENERATION_KEY)
+    if generation is None:
+        cache.add(LIST_GENERATION_KEY, int(time.time() * 1000), timeout=None)
+        generation = cache.get(LIST_GENERATION_KEY)
+    return generation
+
+
+def invalidate_circles_list():
+    """Drop every cached list page by moving to a new generation."""
+    try:
+        cache.incr(LIST_GENERATION_KEY)
+    except ValueError:
+        get_list_generation()
+
+
+def circles_list_key(request):
+    """Return the cache key of a list page.
+
+    Query params are normalized so their order doesn't matter, the
+    host is part of the key because pagination links are absolute.
+    Changes are handled by the list generation.
+    """
+    params = sorted((name, sorted(request.query_params.getlist(name))) for name in request.query_params)
+    query = repr((request.get_host(), params))
+    return LIST_KEY.format(
+        version=CACHE_VERSION,
+        generation=get_list_generation(),
+        query=hashlib.md5(query.encode()).hexdigest()
+    )
+
+
+def get_circles_list(request, compute):
+    """Return the entry of a public circles list page, computing it only once.
+
+    Entries are whatever `compute` returns. Concurrent misses for
+    the same page wait for the first one to compute it (single
+    flight) instead of all hitting the database, unless it takes
+    longer than LIST_LOCK_WAIT seconds.
+    """
+    timeout = settings.CIRCLES_LIST_CACHE_TIMEOUT
+    if not timeout:
+        return compute()
+    key = circles_list_key(request)
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    lock = '{}:lock'.format(key)
+    if not cache.add(lock, True, timeout=LIST_LOCK_TIMEOUT):
+        deadline = time.monotonic() + LIST_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LIST_LOCK_POLL)
+            data = cache.get(key)
+            if data is not None:
+                return data
+        return compute()
+    try:
+        # Cached pages come from the primary database, see cride.utils.db
+        with replica_reads(False):
+            data = compute()
+        cache.set(key, data, timeout)
+    finally:
+        cache.delete(lock)
+    return data
@@ -0,0 +1,60 @@
+"""Benchmark for invitation codes issuing."""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+# Models
+from cride.circles.models import Circle, Invitation
+from cride.users.models import User
+
+# Utilities
+import time
+import uuid
+
+
+class Command(BaseCommand):
+    """Benchmark invitations command.
+
+    Issue invitations one by one with `Invitation.objects.create`,
+    then in bulk with `Invitation.objects.bulk_issue`, in a
+    transaction that is rolled back at the end, and report the
+    codes issued per second by both.
+    """
+
+    help = 'Compare issuing invitation codes one by one and in bulk.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000)
+        parser.add_argument('--one-by-one', type=int, default=1000, help='Codes issued one by one.')
+
+    def handle(self, *args, **options):
+        run = uuid.uuid4().hex[:8]
+        with transaction.atomic():
+            user = User.objects.create(
+                username='bench-{}'.format(run),
+                email='bench-{}@comparteride.com'.format(run),
+                first_name='Bench',
+                last_name='Invitations'
+            )
+            circle = Circle.objects.create(
+                name='Benchmark {}'.format(run),
+                slug_name='benchmark-{}'.format(run),
+                about='Invitations benchmark'
+            )
+
+            start = time.perf_counter()
+            for _ in range(options['one_by_one']):
+                Invitation.objects.create(issued_by=user, circle=circle)
+            self.report('one by one', options['one_by_one'], time.perf_counter() - start)
+
+            start = time.perf_counter()
+            Invitation.objects.bulk_issue(options['count'], issued_by=user, circle=circle)
+            self.report('bulk', options['count'], time.perf_counter() - start)
+            transaction.set_rollback(True)
+
+    def report(self, label, count, elapsed):
+        """Print the issuing rate."""
+        self.stdout.write('{:<10} {:6d} codes in {:.3f}s ({:.0f} codes/s)'.format(
+            label, count, elapsed, count / elapsed
+        ))
@@ -0,0 +1,61 @@
+"""Import circles from a CSV file."""
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+
+# Utilities
+from cride.utils.csv_importer import CIRCLE_FIELDS, ON_CONFLICT, load_circles
+import csv
+
+
+class Command(BaseCommand):
+    """Import circles command.
+
+    The file is streamed in batches, see cride.utils.csv_importer.
+    Rejected rows are listed with their line number and can be
+    written to a CSV file to be fixed and imported again.
+    """
+
+    help = 'Import circles from a CSV file with a header row.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--on-conflict',
+            choices=ON_CONFLICT,
+            default='skip',
+            help='What to do with circles whose slug_name already exists.'
+        )
+        parser.add_argument('--rejects', help='Write rejected rows to this CSV file.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive number.')
+        try:
+            report = load_circles(
+                options['file'],
+                batch_size=options['batch_size'],
+                on_conflict=options['on_conflict']
+            )
+        except (OSError, csv.Error, UnicodeDecodeError) as error:
+            raise CommandError('Could not read {}: {}'.format(options['file'], error))
+
+        for line, row, error in report.rejects[:20]:
+            self.stderr.write('Line {}: {}'.format(line, error))
+        if len(report.rejects) > 20:
+            self.stderr.write('... and {} more.'.format(len(report.rejects) - 20))
+
+        if options['rejects'] and report.rejects:
+            with open(options['rejects'], 'w', newline='', encoding='utf-8') as rejects_file:
+                writer = csv.DictWriter(
+                    rejects_file,
+                    fieldnames=('line', 'error') + CIRCLE_FIELDS,
+                    extrasaction='ignore'
+                )
+                writer.writeheader()
+                for line, row, error in report.rejects:
+                    writer.writerow(dict(row, line=line, error=error))
+
+        style = self.style.WARNING if report.rejects else self.style.SUCCESS
+        self.stdout.write(style(str(report)))
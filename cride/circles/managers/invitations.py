@@ -1,25 +1,82 @@
 """Circle invitations Manager"""
 
 # Django
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
 # Utilities
-import random
 from string import ascii_uppercase, digits
+import secrets
 
 
 class InvitationManager(models.Manager):
     """Invitation Manager
 
-    Used to handle code creation.
+    Used to handle code creation. Codes are drawn with the secrets
+    module from 37 symbols, 10 symbols give about 52 bits of entropy
+    so collisions are rare enough to be handled by retrying instead
+    of checking every code beforehand.
     """
     CODE_LENGTH = 10
+    CODE_POOL = ascii_uppercase + digits + '-'
+    MAX_ATTEMPTS = 5
+
+    def generate_codes(self, count):
+        """Return `count` distinct random codes."""
+        codes = set()
+        while len(codes) < count:
+            codes.add(''.join(secrets.choice(self.CODE_POOL) for _ in range(self.CODE_LENGTH)))
+        return list(codes)
 
     def create(self, **kwargs):
         """Handle Code Creation"""
-        pool = ascii_uppercase + digits + '-'
-        code = kwargs.get('code', ''.join(random.choices(pool, k=self.CODE_LENGTH)))
+        code = kwargs.get('code') or self.generate_codes(1)[0]
         while self.filter(code=code).exists():
-            code = ''.join(random.choices(pool, k=self.CODE_LENGTH))
+            code = self.generate_codes(1)[0]
         kwargs['code'] = code
         return super(InvitationManager, self).create(**kwargs)
+
+    def bulk_issue(self, count, batch_size=1000, **kwargs):
+        """Issue `count` invitations with the given fields in a single bulk insert.
+
+        When the insert hits the unique constraint on `code` only
+        the codes already taken are drawn again.
+        Return the new invitations.
+        """
+        codes = self.generate_codes(count)
+        for _ in range(self.MAX_ATTEMPTS):
+            try:
+                with transaction.atomic(using=self.db):
+                    return self.bulk_create(
+                        [self.model(code=code, **kwargs) for code in codes],
+                        batch_size=batch_size
+                    )
+            except IntegrityError:
+                taken = set()
+                for start in range(0, len(codes), batch_size):
+                    taken.update(self.filter(
+                        code__in=codes[start:start + batch_size]
+                    ).values_list('code', flat=True))
+                if not taken:
+                    raise
+                fresh = set(codes) - taken
+                while len(fresh) < count:
+                    fresh.update(self.generate_codes(count - len(fresh)))
+                codes = list(fresh)
+        raise IntegrityError('Could not find {} unused invitation codes.'.format(count))
+
+    def top_up(self, membership):
+        """Issue the invitations a member needs to hold `remaining_invitations` unused ones.
+
+        Calling it again issues nothing, callers lock the membership
+        row so concurrent calls don't both top it up.
+        Return the new invitations.
+        """
+        unused = self.filter(
+            circle_id=membership.circle_id,
+            issued_by_id=membership.user_id,
+            used=False
+        ).count()
+        missing = membership.remaining_invitations - unused
+        if missing <= 0:
+            return []
+        return self.bulk_issue(missing, issued_by_id=membership.user_id, circle_id=membership.circle_id)
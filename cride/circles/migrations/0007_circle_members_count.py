@@ -0,0 +1,36 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:20
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_members(apps, schema_editor):
+    """Store the number of active members of every circle."""
+    Circle = apps.get_model('circles', 'Circle')
+    Membership = apps.get_model('circles', 'Membership')
+    members = Membership.objects.filter(
+        circle=OuterRef('pk'),
+        is_active=True
+    ).order_by().values('circle').annotate(total=Count('*')).values('total')
+    Circle.objects.update(members_count=Coalesce(Subquery(members, output_field=IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('circles', '0006_auto_20211205_2025'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='circle',
+            name='members_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of active members, kept in sync when members join or leave.'),
+        ),
+        migrations.RunPython(count_members, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='circle',
+            index=models.Index(condition=models.Q(('is_public', True)), fields=['-members_count', '-rides_offered', '-rides_taken'], name='circle_public_popular_idx'),
+        ),
+    ]
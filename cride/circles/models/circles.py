@@ -31,6 +31,10 @@ class Circle(CRideModel):
     # Stats
     rides_offered = models.PositiveIntegerField(default=0)
     rides_taken = models.PositiveIntegerField(default=0)
+    members_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Number of active members, kept in sync when members join or leave.'
+    )
 
     verified = models.BooleanField(
         'verified circle',
@@ -60,3 +64,11 @@ class Circle(CRideModel):
     class Meta(CRideModel.Meta):
         """Meta class."""
         ordering = ('name',)
+        indexes = [
+            # Public circles listing
+            models.Index(
+                fields=['-members_count', '-rides_offered', '-rides_taken'],
+                name='circle_public_popular_idx',
+                condition=models.Q(is_public=True)
+            ),
+        ]
@@ -42,5 +42,12 @@ class Invitation(CRideModel):
     # Manager
     objects = InvitationManager()
 
+    class Meta(CRideModel.Meta):
+        """Meta class."""
+        indexes = [
+            # Member invitations breakdown
+            models.Index(fields=['circle', 'issued_by', 'used'], name='invitation_issuer_idx'),
+        ]
+
     def __str__(self):
         return '#{}: {}'.format(self.circle.slug_name, self.code)
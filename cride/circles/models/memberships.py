@@ -41,6 +41,13 @@ class Membership(CRideModel):
         help_text='Only active users are allowed to interact in the circle'
     )
 
+    class Meta(CRideModel.Meta):
+        """Meta class."""
+        indexes = [
+            # Active membership lookups
+            models.Index(fields=['user', 'circle', 'is_active'], name='membership_user_circle_idx'),
+        ]
+
     def __str__(self):
         """Retutn username and circle."""
         return '@{} at #{}'.format(
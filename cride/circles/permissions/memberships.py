@@ -3,8 +3,8 @@
 # Django REST Framework
 from rest_framework.permissions import BasePermission
 
-# Models
-from cride.circles.models import Membership
+# Cache
+from cride.circles.cache import get_active_membership
 
 
 class IsActiveCircleMember(BasePermission):
@@ -16,16 +16,7 @@ class IsActiveCircleMember(BasePermission):
 
     def has_permission(self, request, view):
         """Verify user is an active member of the circle."""
-
-        try:
-            Membership.objects.get(
-                user=request.user,
-                circle=view.circle,
-                is_active=True
-            )
-        except Membership.DoesNotExist:
-            return False
-        return True
+        return get_active_membership(request, view.circle) is not None
 
 
 class IsSelfMember(BasePermission):
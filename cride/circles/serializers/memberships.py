@@ -1,6 +1,7 @@
 """Membership Serializer"""
 
 # Django
+from django.db.models import F, Q
 from django.utils import timezone
 
 # Django REST Framework
@@ -11,7 +12,10 @@ from rest_framework import serializers
 from cride.users.serializers import UserModelSerializer
 
 # Models
-from cride.circles.models import Membership
+from cride.circles.models import Circle, Membership
+
+# Utilities
+from cride.utils.stats import increment
 
 
 class MembershipModelSerializer(serializers.ModelSerializer):
@@ -74,21 +78,26 @@ class AddMemberSerializer(serializers.Serializer):
         self.context['invitation'] = invitation
         return data
 
-    def validate(self, data):
-        """Vefify circle is capable of accepting a new member."""
-        circle = self.context['circle']
-        if circle.is_limited and circle.members.count() >= circle.members_limit:
-            raise serializers.ValidationError('Circle has reached its member limit :(')
-        return data
-
     def create(self, data):
-        """Create new circle member"""
+        """Create new circle member
+
+        The member is counted before being created, limited circles
+        only accept it while the count is under their limit.
+        """
         circle = self.context['circle']
         invitation = self.context['invitation']
         user = self.context['request'].user
 
         now = timezone.now()
 
+        # Take a place in the circle
+        counted = Circle.objects.filter(
+            Q(is_limited=False) | Q(members_count__lt=F('members_limit')),
+            pk=circle.pk
+        ).update(members_count=F('members_count') + 1, modified=now)
+        if not counted:
+            raise serializers.ValidationError('Circle has reached its member limit :(')
+
         # member creation
         member = Membership.objects.create(
             user=user,
@@ -104,9 +113,11 @@ class AddMemberSerializer(serializers.Serializer):
         invitation.save()
 
         # Update issuer data
-        issuer = Membership.objects.get(user=invitation.issued_by, circle=circle)
-        issuer.used_invitations += 1
-        issuer.remaining_invitations -= 1
-        issuer.save()
+        increment(
+            Membership,
+            {'user_id': invitation.issued_by_id, 'circle_id': circle.pk},
+            used_invitations=1,
+            remaining_invitations=-1
+        )
 
         return member
@@ -0,0 +1,44 @@
+"""Circles signals."""
+
+# Django
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+# Models
+from cride.circles.models import Circle, Membership
+
+# Cache
+from cride.circles.cache import invalidate_circle, invalidate_circles_list, invalidate_membership
+
+
+@receiver(pre_save, sender=Circle)
+def circle_saving(sender, instance, **kwargs):
+    """Remember the stored slug name, it may be about to change."""
+    instance._stored_slug_name = None
+    if instance.pk:
+        instance._stored_slug_name = Circle.objects.filter(
+            pk=instance.pk
+        ).values_list('slug_name', flat=True).first()
+
+
+@receiver(post_save, sender=Circle)
+@receiver(post_delete, sender=Circle)
+def circle_changed(sender, instance, created=False, **kwargs):
+    """Invalidate the cached circle and lists once committed.
+
+    Unknown slugs aren't cached, new circles have nothing to invalidate.
+    """
+    if not created:
+        slug_names = (instance.slug_name, getattr(instance, '_stored_slug_name', None))
+        transaction.on_commit(lambda: invalidate_circle(*slug_names))
+    transaction.on_commit(invalidate_circles_list)
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def membership_changed(sender, instance, **kwargs):
+    """Invalidate the cached membership and lists once committed."""
+    circle_id, user_id = instance.circle_id, instance.user_id
+    transaction.on_commit(lambda: invalidate_membership(circle_id, user_id))
+    transaction.on_commit(invalidate_circles_list)
@@ -0,0 +1,271 @@
+"""Circles cache tests."""
+
+# Django
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404
+from django.test import TestCase, override_settings
+
+# Django REST Framework
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+# Model
+from cride.circles.models import Circle, Membership
+from cride.users.models import User, Profile
+
+# Cache
+from cride.circles import cache as circles_cache
+from cride.circles.cache import circles_list_key, get_active_membership, get_circle_or_404, get_circles_list
+
+# Utilities
+from unittest import mock
+import threading
+
+
+class MembershipCacheTestCase(TestCase):
+    """Membership resolver tests."""
+
+    def setUp(self):
+        """Create user and circle."""
+        cache.clear()
+        self.user = User.objects.create_user(
+            first_name='Pablo',
+            last_name='Trinidad',
+            email='pablotrinidad@ciencias.unam.mx',
+            username='pablotrinidad',
+            password='admin123'
+        )
+        self.profile = Profile.objects.create(user=self.user)
+        self.circle = Circle.objects.create(
+            name='Facultad de Ciencias',
+            slug_name='ciencias',
+            about='Grupo de la facultadad de ciencias de la UNAM',
+        )
+        self.membership = Membership.objects.create(user=self.user, profile=self.profile, circle=self.circle)
+
+    def get_request(self):
+        """Return a new request made by the user."""
+        request = APIRequestFactory().get('/')
+        request.user = self.user
+        return request
+
+    def test_single_lookup_per_request(self):
+        """The membership is loaded once per request."""
+        request = self.get_request()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_active_membership(request, self.circle), self.membership)
+            self.assertEqual(get_active_membership(request, self.circle, self.user), self.membership)
+
+    def test_cached_across_requests(self):
+        """Following requests use the cache."""
+        get_active_membership(self.get_request(), self.circle)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_active_membership(self.get_request(), self.circle), self.membership)
+
+    @override_settings(CIRCLES_MEMBERSHIP_CACHE_TIMEOUT=0)
+    def test_cache_disabled(self):
+        """The cache can be disabled."""
+        get_active_membership(self.get_request(), self.circle)
+        with self.assertNumQueries(1):
+            get_active_membership(self.get_request(), self.circle)
+
+    def test_invalidation(self):
+        """Deactivated and new memberships are picked up once committed."""
+        get_active_membership(self.get_request(), self.circle)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.membership.is_active = False
+            self.membership.save()
+        self.assertIsNone(get_active_membership(self.get_request(), self.circle))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Membership.objects.create(user=self.user, profile=self.profile, circle=self.circle)
+        self.assertIsNotNone(get_active_membership(self.get_request(), self.circle))
+
+    def read_during(self, change):
+        """Return the membership loaded by a request that read it right before the change committed."""
+        fetch = circles_cache.fetch_active_membership
+
+        def fetch_then_change(circle, user):
+            membership = fetch(circle, user)
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    change()
+            return membership
+
+        with mock.patch.object(circles_cache, 'fetch_active_membership', fetch_then_change):
+            return get_active_membership(self.get_request(), self.circle)
+
+    def test_deactivated_while_read(self):
+        """Requests reading a membership being deactivated don't cache it back."""
+        def deactivate():
+            self.membership.is_active = False
+            self.membership.save()
+
+        self.assertEqual(self.read_during(deactivate), self.membership)
+        self.assertIsNone(get_active_membership(self.get_request(), self.circle))
+
+    def test_joined_while_read(self):
+        """Requests reading a membership being created don't cache its absence."""
+        self.membership.delete()
+
+        def join():
+            Membership.objects.create(user=self.user, profile=self.profile, circle=self.circle)
+
+        self.assertIsNone(self.read_during(join))
+        self.assertIsNotNone(get_active_membership(self.get_request(), self.circle))
+
+
+class CircleCacheTestCase(TestCase):
+    """Circle resolution tests."""
+
+    def setUp(self):
+        """Create circle."""
+        cache.clear()
+        self.circle = Circle.objects.create(
+            name='Facultad de Ciencias',
+            slug_name='ciencias',
+            about='Grupo de la facultadad de ciencias de la UNAM',
+        )
+
+    def test_cached_lookup(self):
+        """Circles are loaded from the cache after the first lookup."""
+        with self.assertNumQueries(1):
+            self.assertEqual(get_circle_or_404('ciencias'), self.circle)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_circle_or_404('ciencias'), self.circle)
+
+    def test_not_found(self):
+        """Unknown slugs raise 404."""
+        with self.assertRaises(Http404):
+            get_circle_or_404('ingenieria')
+
+    def test_update_invalidation(self):
+        """Updated circles are reloaded, renamed slugs stop resolving."""
+        get_circle_or_404('ciencias')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.circle.name = 'Ciencias UNAM'
+            self.circle.slug_name = 'ciencias-unam'
+            self.circle.save()
+
+        self.assertEqual(get_circle_or_404('ciencias-unam').name, 'Ciencias UNAM')
+        with self.assertRaises(Http404):
+            get_circle_or_404('ciencias')
+
+    def test_delete_invalidation(self):
+        """Deleted circles stop resolving."""
+        get_circle_or_404('ciencias')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.circle.delete()
+        with self.assertRaises(Http404):
+            get_circle_or_404('ciencias')
+
+    def test_updated_while_read(self):
+        """Requests reading a circle being updated don't cache it back."""
+        load = circles_cache.get_object_or_404
+
+        def load_then_update(queryset, **kwargs):
+            circle = load(queryset, **kwargs)
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    self.circle.name = 'Ciencias UNAM'
+                    self.circle.save()
+            return circle
+
+        with mock.patch.object(circles_cache, 'get_object_or_404', load_then_update):
+            self.assertEqual(get_circle_or_404('ciencias').name, 'Facultad de Ciencias')
+        self.assertEqual(get_circle_or_404('ciencias').name, 'Ciencias UNAM')
+
+
+class CirclesListCacheAPITestCase(APITestCase):
+    """Public circles list cache tests."""
+
+    def setUp(self):
+        """Create circle and user."""
+        cache.clear()
+        self.circle = Circle.objects.create(
+            name='Facultad de Ciencias',
+            slug_name='ciencias',
+            about='Grupo de la facultadad de ciencias de la UNAM',
+            is_public=True
+        )
+        self.user = User.objects.create_user(
+            first_name='Pablo',
+            last_name='Trinidad',
+            email='pablotrinidad@ciencias.unam.mx',
+            username='pablotrinidad',
+            password='admin123'
+        )
+        Profile.objects.create(user=self.user)
+        token = Token.objects.create(user=self.user).key
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+
+    def get_names(self):
+        """Return the names of the listed circles."""
+        response = self.client.get('/circles/')
+        self.assertEqual(response.status_code, 200)
+        return [circle['name'] for circle in response.data['results']]
+
+    def get_request(self, query):
+        """Return a DRF request with the given query string."""
+        return Request(APIRequestFactory().get('/circles/?' + query))
+
+    def test_shared_pages(self):
+        """Pages are served from the cache until circles change."""
+        self.assertEqual(self.get_names(), ['Facultad de Ciencias'])
+        # Skips signals and the cache generation alike
+        Circle.objects.filter(pk=self.circle.pk).update(name='Stale')
+        self.assertEqual(self.get_names(), ['Facultad de Ciencias'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.circle.name = 'Ciencias UNAM'
+            self.circle.save()
+        self.assertEqual(self.get_names(), ['Ciencias UNAM'])
+
+    def test_not_modified(self):
+        """Cached pages answer conditional requests without queries."""
+        response = self.client.get('/circles/')
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/circles/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('Last-Modified', response)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.circle.name = 'Ciencias UNAM'
+            self.circle.save()
+        response = self.client.get('/circles/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_normalized_key(self):
+        """Query params order doesn't matter, their values do."""
+        self.assertEqual(
+            circles_list_key(self.get_request('search=a&ordering=name')),
+            circles_list_key(self.get_request('ordering=name&search=a'))
+        )
+        self.assertNotEqual(
+            circles_list_key(self.get_request('ordering=name')),
+            circles_list_key(self.get_request('ordering=-name'))
+        )
+
+    def test_single_flight(self):
+        """Requests missing a page being computed wait for it."""
+        request = self.get_request('')
+        key = circles_list_key(request)
+        cache.add('{}:lock'.format(key), True)
+        threading.Timer(0.05, cache.set, (key, {'results': []})).start()
+
+        compute = mock.Mock(return_value={'results': ['computed']})
+        self.assertEqual(get_circles_list(request, compute), {'results': []})
+        compute.assert_not_called()
+
+    def test_single_flight_timeout(self):
+        """Requests stop waiting for computations taking too long."""
+        request = self.get_request('')
+        cache.add('{}:lock'.format(circles_list_key(request)), True)
+        compute = mock.Mock(return_value={'results': ['computed']})
+        with mock.patch.object(circles_cache, 'LIST_LOCK_WAIT', 0.1):
+            self.assertEqual(get_circles_list(request, compute), {'results': ['computed']})
+        compute.assert_called_once_with()
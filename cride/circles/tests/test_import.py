@@ -0,0 +1,66 @@
+"""Circles import tests."""
+
+# Django
+from django.core.management import call_command
+from django.test import TestCase
+
+# Model
+from cride.circles.models import Circle
+
+# Utilities
+from cride.utils.csv_importer import import_circles
+from io import StringIO
+import os
+import tempfile
+
+
+class CirclesImportTestCase(TestCase):
+    """Streaming circles importer tests."""
+
+    def setUp(self):
+        """Create an existing circle."""
+        Circle.objects.create(name='Old name', slug_name='unam-fciencias', about='Existing')
+
+    def test_import(self):
+        """Rows are coerced, deduplicated and rejected when invalid."""
+        rows = [
+            {'name': 'Facultad de Ciencias', 'slug_name': 'unam-fciencias', 'is_public': '1', 'verified': '1'},
+            {'name': 'Inventive', 'slug_name': 'inventive', 'is_public': '0', 'members_limit': '30'},
+            {'name': 'Inventive again', 'slug_name': 'inventive'},
+            {'name': 'Bad slug', 'slug_name': 'no slug'},
+            {'name': 'Bad limit', 'slug_name': 'bad-limit', 'members_limit': 'many'},
+            {'name': 'Platzi', 'slug_name': 'platzi', 'verified': 'True'},
+        ]
+        # Savepoint, then a lookup and an insert per chunk
+        with self.assertNumQueries(6):
+            report = import_circles(rows, batch_size=3)
+
+        self.assertEqual((report.read, report.created, report.skipped), (6, 2, 1))
+        self.assertEqual([line for line, row, error in report.rejects], [4, 5, 6])
+
+        inventive = Circle.objects.get(slug_name='inventive')
+        self.assertFalse(inventive.is_public)
+        self.assertTrue(inventive.is_limited)
+        self.assertEqual(inventive.members_limit, 30)
+        self.assertTrue(Circle.objects.get(slug_name='platzi').verified)
+        self.assertEqual(Circle.objects.get(slug_name='unam-fciencias').name, 'Old name')
+
+    def test_update_on_conflict(self):
+        """Existing circles can be updated instead of skipped."""
+        report = import_circles([{'name': 'Facultad de Ciencias', 'slug_name': 'unam-fciencias'}], on_conflict='update')
+        self.assertEqual(report.updated, 1)
+        self.assertEqual(Circle.objects.get(slug_name='unam-fciencias').name, 'Facultad de Ciencias')
+
+    def test_command(self):
+        """The command imports a file and writes the rejected rows."""
+        rejects = os.path.join(tempfile.mkdtemp(), 'rejects.csv')
+        stdout = StringIO()
+        call_command(
+            'import_circles', 'circles.csv',
+            batch_size=5, on_conflict='reject', rejects=rejects,
+            stdout=stdout, stderr=StringIO()
+        )
+        self.assertEqual(Circle.objects.count(), 21)
+        self.assertIn('20 created', stdout.getvalue())
+        with open(rejects) as rejects_file:
+            self.assertIn('Circle already exists', rejects_file.read())
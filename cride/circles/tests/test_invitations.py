@@ -12,6 +12,10 @@ from rest_framework import status
 from cride.circles.models import Invitation, Circle, Membership
 from cride.users.models import User, Profile
 
+# Utilities
+from cride.circles.managers import InvitationManager
+from unittest import mock
+
 
 class InvitationsManagerTestCase(TestCase):
     """Invitations manager tests."""
@@ -67,6 +71,23 @@ class InvitationsManagerTestCase(TestCase):
 
         self.assertNotEqual(invitation.code, code)
 
+    def test_bulk_issue(self):
+        """Invitations are issued with unique codes in a single insert."""
+        with self.assertNumQueries(3):  # Savepoint, insert, release
+            invitations = Invitation.objects.bulk_issue(50, issued_by=self.user, circle=self.circle)
+        codes = {invitation.code for invitation in invitations}
+        self.assertEqual(len(codes), 50)
+        self.assertEqual(Invitation.objects.filter(code__in=codes, circle=self.circle, used=False).count(), 50)
+
+    def test_bulk_issue_collisions(self):
+        """Only the codes already taken are drawn again."""
+        Invitation.objects.create(issued_by=self.user, circle=self.circle, code='TAKEN')
+        draws = [['TAKEN', 'FREE-1'], ['FREE-2']]
+        with mock.patch.object(InvitationManager, 'generate_codes', side_effect=draws) as generate_codes:
+            invitations = Invitation.objects.bulk_issue(2, issued_by=self.user, circle=self.circle)
+        self.assertEqual(sorted(invitation.code for invitation in invitations), ['FREE-1', 'FREE-2'])
+        self.assertEqual(generate_codes.call_args_list, [mock.call(2), mock.call(1)])
+
 
 class MemberInvitationsAPITestCase(APITestCase):
     """Member invitations API test case."""
@@ -119,12 +140,51 @@ class MemberInvitationsAPITestCase(APITestCase):
         """Invitations in DB must be 0"""
         self.assertEqual(Invitation.objects.count(), 0)
 
-        # Call member invitations URL
-        request = self.client.get(self.url)
-        self.assertEqual(request.status_code, status.HTTP_200_OK)
+        # Issue member invitations
+        request = self.client.post(self.url)
+        self.assertEqual(request.status_code, status.HTTP_201_CREATED)
 
         # Verify that invitation were created
         invitations = Invitation.objects.filter(issued_by=self.user)
         self.assertEqual(invitations.count(), self.membership.remaining_invitations)
         for invitation in invitations:
             self.assertIn(invitation.code, request.data['invitations'])
+
+    def test_breakdown_is_read_only(self):
+        """Retrieving the breakdown doesn't issue invitations."""
+        request = self.client.get(self.url)
+        self.assertEqual(request.status_code, status.HTTP_200_OK)
+        self.assertEqual(request.data['invitations'], [])
+        self.assertEqual(Invitation.objects.count(), 0)
+
+    def test_issue_is_idempotent(self):
+        """Issuing again only returns the unused invitations."""
+        codes = self.client.post(self.url).data['invitations']
+
+        request = self.client.post(self.url)
+        self.assertEqual(request.status_code, status.HTTP_200_OK)
+        self.assertEqual(request.data['invitations'], codes)
+        self.assertEqual(self.client.get(self.url).data['invitations'], codes)
+        self.assertEqual(Invitation.objects.count(), self.membership.remaining_invitations)
+
+    def test_breakdown_of_other_member(self):
+        """Members can't see nor issue other members invitations."""
+        user = User.objects.create_user(
+            first_name='Carlos',
+            last_name='Zamora',
+            email='carlos@ciencias.unam.mx',
+            username='carlos',
+            password='admin123'
+        )
+        Membership.objects.create(
+            user=user,
+            profile=Profile.objects.create(user=user),
+            circle=self.circle,
+            invited_by=self.user
+        )
+        url = '/circles/{}/members/carlos/invitations/'.format(self.circle.slug_name)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        used_invitations = self.client.get(self.url).data['used_invitations']
+        self.assertEqual([member['user']['username'] for member in used_invitations], ['carlos'])
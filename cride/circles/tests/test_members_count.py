@@ -0,0 +1,146 @@
+"""Circle members count tests."""
+
+# Django
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Count, Q
+
+# Django REST Framework
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+from rest_framework import status
+
+# Model
+from cride.circles.models import Circle, Invitation, Membership
+from cride.users.models import User, Profile
+
+# Cache
+from cride.circles.cache import load_active_membership
+
+# Views
+from cride.circles.views.memberships import MembershipViewSet
+
+# Utilities
+from io import StringIO
+from unittest import mock
+
+
+class MembersCountAPITestCase(APITestCase):
+    """Materialized members count tests."""
+
+    def setUp(self):
+        """Create users."""
+        cache.clear()
+        self.admin = self.create_user('pablotrinidad')
+        self.user = self.create_user('cvander')
+
+    def create_user(self, username):
+        """Create a user with profile."""
+        user = User.objects.create_user(
+            first_name=username,
+            last_name='Test',
+            email='{}@ciencias.unam.mx'.format(username),
+            username=username,
+            password='admin123'
+        )
+        Profile.objects.create(user=user)
+        return user
+
+    def authenticate(self, user):
+        """Send following requests as the given user."""
+        token, _ = Token.objects.get_or_create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    def create_circle(self, **data):
+        """Create a circle through the API."""
+        self.authenticate(self.admin)
+        data.setdefault('name', 'Facultad de Ciencias')
+        data.setdefault('slug_name', 'ciencias')
+        data.setdefault('about', 'Grupo de la facultadad de ciencias de la UNAM')
+        response = self.client.post('/circles/', data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Circle.objects.get(slug_name=data['slug_name'])
+
+    def join(self, circle, user):
+        """Join the circle with an invitation issued by the admin."""
+        invitation = Invitation.objects.create(circle=circle, issued_by=self.admin)
+        self.authenticate(user)
+        return self.client.post(
+            '/circles/{}/members/'.format(circle.slug_name),
+            {'invitation_code': invitation.code}
+        )
+
+    def assertMembersCount(self, circle, expected):
+        """The stored count must match the number of active memberships."""
+        actual = Circle.objects.annotate(
+            actual=Count('membership', filter=Q(membership__is_active=True))
+        ).get(pk=circle.pk).actual
+        circle.refresh_from_db()
+        self.assertEqual(actual, expected)
+        self.assertEqual(circle.members_count, actual)
+
+    def test_create_join_and_leave(self):
+        """The count follows every flow changing memberships."""
+        circle = self.create_circle()
+        self.assertMembersCount(circle, 1)
+
+        response = self.join(circle, self.user)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertMembersCount(circle, 2)
+
+        response = self.client.delete('/circles/ciencias/members/cvander/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertMembersCount(circle, 1)
+
+    def test_concurrent_leave(self):
+        """Members leaving from concurrent requests are uncounted once."""
+        circle = self.create_circle()
+        self.join(circle, self.user)
+        membership = Membership.objects.get(circle=circle, user=self.user)
+        load_active_membership(circle, self.user)
+
+        # Another request deactivated it after this one loaded it
+        Membership.objects.filter(pk=membership.pk).update(is_active=False)
+        with mock.patch.object(MembershipViewSet, 'get_object', return_value=membership):
+            response = self.client.delete('/circles/ciencias/members/cvander/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        circle.refresh_from_db()
+        self.assertEqual(circle.members_count, 2)
+
+        Membership.objects.filter(pk=membership.pk).update(is_active=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete('/circles/ciencias/members/cvander/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertMembersCount(circle, 1)
+        self.assertIsNone(load_active_membership(circle, self.user))
+
+    def test_limited_circle(self):
+        """Members beyond the limit are rejected without changing the count."""
+        circle = self.create_circle(is_limited=True, members_limit=10)
+        Circle.objects.filter(pk=circle.pk).update(members_count=10)
+
+        response = self.join(circle, self.user)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Membership.objects.filter(user=self.user).exists())
+        circle.refresh_from_db()
+        self.assertEqual(circle.members_count, 10)
+
+    def test_list_ordered_by_members(self):
+        """Public circles are listed by members count."""
+        small = self.create_circle(name='Small', slug_name='small')
+        big = self.create_circle()
+        self.join(big, self.user)
+
+        response = self.client.get('/circles/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(c['slug_name'], c['members_count']) for c in response.data['results']],
+            [(big.slug_name, 2), (small.slug_name, 1)]
+        )
+
+    def test_reconcile(self):
+        """Reconciling restores drifted counts."""
+        circle = self.create_circle()
+        Circle.objects.filter(pk=circle.pk).update(members_count=7)
+        call_command('reconcile_stats', stdout=StringIO())
+        self.assertMembersCount(circle, 1)
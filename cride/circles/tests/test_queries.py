@@ -0,0 +1,59 @@
+"""Circles query budget tests."""
+
+# Django
+from django.test import override_settings
+
+# Django REST Framework
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+
+# Model
+from cride.circles.models import Circle, Membership
+from cride.users.models import User, Profile
+
+# Utilities
+from cride.utils.testing import QueryBudgetMixin
+
+
+class CirclesQueryBudgetTestCase(QueryBudgetMixin, APITestCase):
+    """Circles and memberships endpoints query budget tests."""
+
+    def setUp(self):
+        """Create circles with members."""
+        self.circles = [
+            Circle.objects.create(
+                name='Circle {}'.format(i),
+                slug_name='circle-{}'.format(i),
+                about='Circle number {}'.format(i),
+            )
+            for i in range(12)
+        ]
+        self.user = None
+        for i in range(12):
+            user = User.objects.create_user(
+                first_name='User',
+                last_name=str(i),
+                email='user{}@ciencias.unam.mx'.format(i),
+                username='user{}'.format(i),
+                password='admin123'
+            )
+            profile = Profile.objects.create(user=user)
+            Membership.objects.create(
+                user=user,
+                profile=profile,
+                circle=self.circles[0],
+                invited_by=self.user
+            )
+            self.user = self.user or user
+
+        token = Token.objects.create(user=self.user).key
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+
+    @override_settings(CIRCLES_LIST_CACHE_TIMEOUT=0)
+    def test_list_circles(self):
+        """Listing circles doesn't depend on the page size."""
+        self.assertQueryBudget('/circles/', budget=3)
+
+    def test_list_members(self):
+        """Listing members doesn't depend on the page size."""
+        self.assertQueryBudget('/circles/circle-0/members/', budget=3)
@@ -0,0 +1,101 @@
+"""Read replicas routing tests."""
+
+# Django
+from django.core.cache import cache
+from django.test import override_settings
+
+# Django REST Framework
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+from rest_framework import status
+
+# Model
+from cride.circles.models import Circle, Membership
+from cride.users.models import User, Profile
+
+# Cache
+from cride.circles.cache import get_circle_or_404, load_active_membership
+
+# Utilities
+from cride.utils.db import ReplicaRouter, replica_reads
+from unittest import mock
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], DATABASE_REPLICA_PIN_SECONDS=60, CIRCLES_LIST_CACHE_TIMEOUT=0)
+class ReplicaRoutingAPITestCase(APITestCase):
+    """List and retrieve requests are served by the replicas."""
+
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        """Create the same user in both databases and a circle in each."""
+        cache.clear()
+        for db in ('default', 'replica'):
+            user = User(
+                pk=1,
+                first_name='Pablo',
+                last_name='Trinidad',
+                email='pablotrinidad@ciencias.unam.mx',
+                username='pablotrinidad'
+            )
+            user.set_password('admin123')
+            user.save(using=db)
+            Profile(pk=1, user=user).save(using=db)
+            Token(key='a' * 40, user=user).save(using=db)
+        Circle.objects.using('default').create(name='Primary', slug_name='primary', about='Primary only')
+        Circle.objects.using('replica').create(name='Replica', slug_name='replica', about='Replica only')
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + 'a' * 40)
+
+    def get_slugs(self):
+        """Return the slugs of the listed circles."""
+        response = self.client.get('/circles/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [circle['slug_name'] for circle in response.data['results']]
+
+    def test_router(self):
+        """Writes go to the primary, reads only inside replica blocks."""
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_write(Circle), 'default')
+        self.assertEqual(router.db_for_read(Circle), 'default')
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Circle), 'replica')
+            self.assertEqual(router.db_for_write(Circle), 'default')
+
+    def test_single_replica_per_block(self):
+        """A replica is picked once per block, not once per query."""
+        router = ReplicaRouter()
+        with mock.patch('cride.utils.db.random.choice', side_effect=['replica']) as choice:
+            with replica_reads():
+                self.assertEqual(router.db_for_read(Circle), 'replica')
+                self.assertEqual(router.db_for_read(Membership), 'replica')
+                with replica_reads(False):
+                    self.assertEqual(router.db_for_read(Circle), 'default')
+                self.assertEqual(router.db_for_read(Circle), 'replica')
+        choice.assert_called_once_with(['replica'])
+
+    def test_cache_filled_from_primary(self):
+        """Cached objects are loaded from the primary database."""
+        user = User.objects.get()
+        with replica_reads():
+            circle = get_circle_or_404('primary')
+            Membership.objects.create(user=user, profile=user.profile, circle=circle)
+            self.assertIsNotNone(load_active_membership(circle, user))
+
+    def test_list_from_replica(self):
+        """Listing circles reads from the replica."""
+        self.assertEqual(self.get_slugs(), ['replica'])
+
+    def test_pinned_after_write(self):
+        """Clients read from the primary right after writing."""
+        response = self.client.post('/circles/', {
+            'name': 'Facultad de Ciencias',
+            'slug_name': 'ciencias',
+            'about': 'Grupo de la facultadad de ciencias de la UNAM',
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(sorted(self.get_slugs()), ['ciencias', 'primary'])
+
+        # Other clients keep reading from the replica
+        self.client.credentials()
+        self.client.force_authenticate(User.objects.get())
+        self.assertEqual(self.get_slugs(), ['replica'])
@@ -0,0 +1,57 @@
+"""View transaction policy tests."""
+
+# Django
+from django.db import connection
+from django.test import TestCase
+
+# Django REST Framework
+from rest_framework import status, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+# Model
+from cride.circles.models import Circle
+
+# Utilities
+from cride.utils.views import TransactionPolicyMixin
+
+
+class CircleTestViewSet(TransactionPolicyMixin, viewsets.GenericViewSet):
+    """Record the transaction depth of every action."""
+
+    authentication_classes = ()
+    permission_classes = ()
+    depths = []
+
+    def list(self, request):
+        self.depths.append(len(connection.savepoint_ids))
+        return Response([])
+
+    def create(self, request):
+        self.depths.append(len(connection.savepoint_ids))
+        Circle.objects.create(name='Rolled back', slug_name='rolled-back', about='Never saved')
+        raise ValidationError('Failed')
+
+
+class TransactionPolicyTestCase(TestCase):
+    """Only write actions run in a transaction."""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        CircleTestViewSet.depths = []
+
+    def test_reads_autocommit(self):
+        """List runs in the enclosing (test) transaction, create in its own."""
+        depth = len(connection.savepoint_ids)
+        view = CircleTestViewSet.as_view({'get': 'list', 'post': 'create'})
+        view(self.factory.get('/'))
+        view(self.factory.post('/'))
+        self.assertEqual(CircleTestViewSet.depths, [depth, depth + 1])
+
+    def test_failed_write_rolls_back(self):
+        """Writes of requests raising errors are rolled back."""
+        view = CircleTestViewSet.as_view({'post': 'create'})
+        response = view(self.factory.post('/'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Circle.objects.filter(slug_name='rolled-back').exists())
@@ -1,8 +1,5 @@
 """Circles View."""
 
-# Django
-from django.db.models import Count
-
 # Django REST Framework
 from rest_framework import mixins, viewsets
 from rest_framework.response import Response
@@ -18,11 +15,26 @@ from django_filters.rest_framework import DjangoFilterBackend
 # Models
 from cride.circles.models import Membership
 
+# Cache
+from cride.circles.cache import get_circles_list
+
 # Serializers
 from cride.circles.serializers import Circle, CircleModelSerializer
 
+# Utilities
+from cride.utils.stats import increment
+from cride.utils.pagination import KeysetPagination
+from cride.utils.views import (
+    ConditionalMixin, EagerLoadingMixin, FastListMixin, ReplicaReadMixin, TransactionPolicyMixin
+)
+
 
-class CircleViewSet(mixins.CreateModelMixin,
+class CircleViewSet(ReplicaReadMixin,
+                    TransactionPolicyMixin,
+                    ConditionalMixin,
+                    EagerLoadingMixin,
+                    FastListMixin,
+                    mixins.CreateModelMixin,
                     mixins.RetrieveModelMixin,
                     mixins.UpdateModelMixin,
                     mixins.ListModelMixin,
@@ -32,11 +44,12 @@ class CircleViewSet(mixins.CreateModelMixin,
 
     serializer_class = CircleModelSerializer
     lookup_field = 'slug_name'
+    pagination_class = KeysetPagination
 
     # Filters
     filter_backends = (SearchFilter, OrderingFilter, DjangoFilterBackend)
     search_fields = ('slug_name', 'name')
-    ordering_fields = ('rides_offered', 'rides_taken', 'name', 'created', 'member_limit')
+    ordering_fields = ('rides_offered', 'rides_taken', 'name', 'created', 'member_limit', 'members_count')
     ordering = ('-members_count', '-rides_offered', '-rides_taken')
     filter_fields = ('verified', 'is_limited')
 
@@ -51,14 +64,23 @@ class CircleViewSet(mixins.CreateModelMixin,
         """Restrict list to public only"""
         queryset = Circle.objects.all()
         if self.action == 'list':
-            return queryset.annotate(members_count=Count('members')).filter(is_public=True)
-        return queryset
+            queryset = queryset.filter(is_public=True)
+        return self.optimize_queryset(queryset)
+
+    def list(self, request, *args, **kwargs):
+        """Share public circles pages between users through the cache.
+
+        Pages are cached with their validators, so conditional
+        requests are answered without touching the database.
+        """
+        entry = get_circles_list(request, lambda: self.get_list_entry(request, *args, **kwargs))
+        return self.conditional_response(entry['etag'], entry['last_modified'], lambda: Response(entry['data']))
 
-    def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        print('entro al retrieve')
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+    def get_list_entry(self, request, *args, **kwargs):
+        """Return the data of a list page with its validators."""
+        count, last_modified = self.get_validators(self.filter_queryset(self.get_queryset()))
+        data = self.get_list_response(request, *args, **kwargs).data
+        return {'data': data, 'etag': self.get_etag(count, last_modified), 'last_modified': last_modified}
 
     def perform_create(self, serializer):
         """Assign Circle Admin """
@@ -72,3 +94,5 @@ class CircleViewSet(mixins.CreateModelMixin,
             is_admin=True,
             remaining_invitations=10
         )
+        increment(circle, members_count=1)
+        circle.refresh_from_db(fields=['members_count'])
@@ -1,5 +1,10 @@
 """Circle membership Views"""
 
+# Django
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
 # Django REST Framework
 from cride.circles.models.invitations import Invitation
 from cride.users import serializers
@@ -13,24 +18,41 @@ from rest_framework.permissions import IsAuthenticated
 from cride.circles.permissions.memberships import IsActiveCircleMember, IsSelfMember
 
 # Models
-from cride.circles.models import Circle, Membership
+from cride.circles.models import Membership
+
+# Cache
+from cride.circles.cache import get_circle_or_404, invalidate_circles_list, invalidate_membership
 
 # Serializers
 from cride.circles.serializers.memberships import MembershipModelSerializer, AddMemberSerializer
 
+# Utilities
+from cride.utils.stats import increment
+from cride.utils.pagination import KeysetPagination
+from cride.utils.views import EagerLoadingMixin, FastListMixin, ReplicaReadMixin, TransactionPolicyMixin
 
-class MembershipViewSet(mixins.ListModelMixin,
+
+class MembershipViewSet(ReplicaReadMixin,
+                        TransactionPolicyMixin,
+                        EagerLoadingMixin,
+                        FastListMixin,
+                        mixins.ListModelMixin,
                         mixins.RetrieveModelMixin,
                         mixins.DestroyModelMixin,
                         viewsets.GenericViewSet):
     """Circle membership view set."""
 
     serializer_class = MembershipModelSerializer
+    pagination_class = KeysetPagination
+    string_fields = {'users.User': 'username'}
+    ordering = ('created',)
+    atomic_actions = ('create', 'destroy', 'issue_invitations')
+    replica_actions = ('list', 'retrieve', 'invitations')
 
     def dispatch(self, request, *args, **kwargs):
         """Verify that the circle exists."""
         slug_name = kwargs['slug_name']
-        self.circle = get_object_or_404(Circle, slug_name=slug_name)
+        self.circle = get_circle_or_404(slug_name)
         return super(MembershipViewSet, self).dispatch(request, *args, **kwargs)
 
     def get_permissions(self):
@@ -38,28 +60,40 @@ class MembershipViewSet(mixins.ListModelMixin,
         permissions = [IsAuthenticated]
         if self.action != 'create':
             permissions.append(IsActiveCircleMember)
+        if self.action in ('invitations', 'issue_invitations'):
+            permissions.append(IsSelfMember)
         return [p() for p in permissions]
 
     def get_queryset(self):
         """Return Circle members"""
-        return Membership.objects.filter(
+        queryset = Membership.objects.filter(
             circle=self.circle,
             is_active=True
         )
+        return self.optimize_queryset(queryset)
 
     def get_object(self):
         """Return the circle member by using the user's username"""
         return get_object_or_404(
-            Membership,
-            user__username=self.kwargs['pk'],
-            circle=self.circle,
-            is_active=True
+            self.get_queryset(),
+            user__username=self.kwargs['pk']
         )
 
     def perform_destroy(self, instance):
-        """Disable membership"""
-        instance.is_active = False
-        instance.save()
+        """Disable membership
+
+        Only the request actually deactivating the membership uncounts
+        it. Updates don't send signals, the caches are invalidated here.
+        """
+        deactivated = Membership.objects.filter(
+            pk=instance.pk,
+            is_active=True
+        ).update(is_active=False, modified=timezone.now())
+        if deactivated:
+            increment(self.circle, members_count=-1)
+            circle_id, user_id = instance.circle_id, instance.user_id
+            transaction.on_commit(lambda: invalidate_membership(circle_id, user_id))
+            transaction.on_commit(invalidate_circles_list)
 
     @action(detail=True, methods=['GET'])
     def invitations(self, request, *args, **kwargs):
@@ -67,36 +101,42 @@ class MembershipViewSet(mixins.ListModelMixin,
 
         will return a list containing all the members that have
         used its invitations and another list containing the
-        invitations that haven't being used yet
+        invitations that haven't being used yet. Nothing is written,
+        codes are issued by POSTing to the same URL.
         """
-        member = self.get_object()
-        invited_members = Membership.objects.filter(
-            circle=self.circle,
-            invited_by=request.user,
-            is_active=True
+        return Response(self.get_invitations_breakdown(request.user))
+
+    @invitations.mapping.post
+    def issue_invitations(self, request, *args, **kwargs):
+        """Top up the member's unused invitations to its remaining invitations.
+
+        Repeating the request issues nothing new.
+        """
+        member = Membership.objects.select_for_update().get(pk=self.get_object().pk)
+        issued = Invitation.objects.top_up(member)
+        return Response(
+            self.get_invitations_breakdown(request.user),
+            status=status.HTTP_201_CREATED if issued else status.HTTP_200_OK
         )
 
-        unused_invitations = Invitation.objects.filter(
+    def get_invitations_breakdown(self, user):
+        """Return the members invited by the user and its unused codes."""
+        invited_members = self.get_queryset().filter(invited_by=user).order_by(*self.ordering)
+        if settings.FAST_LIST_SERIALIZERS:
+            compiled = self.get_compiled_serializer()
+            used_invitations = compiled.serialize(compiled.values(invited_members), self.get_serializer_context())
+        else:
+            used_invitations = self.get_serializer(invited_members, many=True).data
+
+        invitations = Invitation.objects.filter(
             circle=self.circle,
-            issued_by=request.user,
+            issued_by=user,
             used=False
-        ).values_list('code')
-        diff = member.remaining_invitations - len(unused_invitations)
-
-        invitations = [x[0] for x in unused_invitations]
-        for i in range(0, diff):
-            invitations.append(
-                Invitation.objects.create(
-                    issued_by=request.user,
-                    circle=self.circle
-                    ).code
-            )
-        data = {
-            'used_invitations': MembershipModelSerializer(invited_members, many=True).data,
-            'invitations': invitations
-
+        ).order_by('created').values_list('code', flat=True)
+        return {
+            'used_invitations': used_invitations,
+            'invitations': list(invitations)
         }
-        return Response(data)
 
     def create(self, request, *args, **kwargs):
         """Handle member create from invitation code"""
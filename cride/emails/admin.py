@@ -0,0 +1,27 @@
+"""Emails admin."""
+
+# Django
+from django.contrib import admin
+from django.utils import timezone
+
+# Models
+from cride.emails.models import OutboxMessage
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    """Outbox message admin."""
+
+    list_display = ('to', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'domain')
+    search_fields = ('to', 'subject')
+    actions = ['retry']
+
+    def retry(self, request, queryset):
+        """Queue the selected messages again."""
+        queryset.exclude(status=OutboxMessage.SENT).update(
+            status=OutboxMessage.PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now()
+        )
+    retry.short_description = 'Retry selected messages'
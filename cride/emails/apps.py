@@ -0,0 +1,10 @@
+"""Emails app."""
+
+# django
+from django.apps import AppConfig
+
+
+class EmailsAppConfig(AppConfig):
+
+    name = 'cride.emails'
+    verbose_name = 'Emails'
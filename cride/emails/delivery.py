@@ -0,0 +1,160 @@
+"""Outbox delivery.
+
+Due messages are delivered in batches over a single backend
+connection. A worker first claims a batch in a short transaction,
+leasing it by moving its next attempt EMAIL_OUTBOX_LEASE seconds
+ahead, then sends it outside any transaction and records every
+result on its own. Messages of a worker dying mid-batch are retried
+once their lease is over, only the one being sent may go out twice.
+
+Every recipient domain gets a budget of messages per minute shared
+by all workers through the cache, messages over the budget wait for
+the next minute. Failed messages are retried with exponential
+backoff until they run out of attempts.
+"""
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection as db_connection, transaction
+from django.utils import timezone
+
+# Models
+from cride.emails.models import OutboxMessage
+
+# Utilities
+from collections import Counter, defaultdict, namedtuple
+from datetime import timedelta
+
+
+RATE_KEY = 'emails:rate:{domain}:{window}'
+
+Delivery = namedtuple('Delivery', ['sent', 'retried', 'failed', 'postponed'])
+
+
+def get_rate_limit(domain):
+    """Return how many messages per minute the domain accepts."""
+    limits = settings.EMAIL_OUTBOX_DOMAIN_RATE_LIMITS
+    return limits.get(domain, settings.EMAIL_OUTBOX_RATE_LIMIT)
+
+
+def reserve(domain, count, now):
+    """Take up to `count` messages from the domain's budget for the current minute.
+
+    Return how many were granted.
+    """
+    key = RATE_KEY.format(domain=domain, window=int(now.timestamp() // 60))
+    limit = get_rate_limit(domain)
+    cache.add(key, 0, timeout=120)
+    total = cache.incr(key, count)
+    granted = max(0, min(count, limit - (total - count)))
+    if granted < count:
+        cache.decr(key, count - granted)
+    return granted
+
+
+def build_email(message, connection):
+    """Return the email of an outbox message."""
+    email = EmailMultiAlternatives(
+        message.subject,
+        message.body,
+        message.from_email,
+        [message.to],
+        connection=connection
+    )
+    if message.html_body:
+        email.attach_alternative(message.html_body, 'text/html')
+    return email
+
+
+def fail(message, error, now):
+    """Record a failed attempt, scheduling a retry while attempts are left."""
+    message.attempts += 1
+    message.last_error = str(error)
+    if message.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        message.status = OutboxMessage.FAILED
+    else:
+        delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (message.attempts - 1)
+        message.next_attempt_at = now + timedelta(seconds=delay)
+
+
+RESULT_FIELDS = ['status', 'attempts', 'next_attempt_at', 'sent_at', 'last_error', 'modified']
+
+
+def claim(batch_size, now):
+    """Lease a batch of due messages to the current worker and return it.
+
+    Messages over their domain budget are postponed to the next
+    minute instead, they are returned in `postponed`.
+    """
+    with transaction.atomic():
+        messages = OutboxMessage.objects.due(now)
+        if db_connection.features.has_select_for_update_skip_locked:
+            # Concurrent workers pick different messages
+            messages = messages.select_for_update(skip_locked=True)
+        messages = list(messages[:batch_size])
+
+        by_domain = defaultdict(list)
+        for message in messages:
+            by_domain[message.domain].append(message)
+        lease = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+        next_window = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        claimed, postponed = [], []
+        for domain, domain_messages in by_domain.items():
+            granted = reserve(domain, len(domain_messages), now)
+            claimed += domain_messages[:granted]
+            postponed += domain_messages[granted:]
+
+        for message in claimed:
+            message.next_attempt_at = lease
+        for message in postponed:
+            message.next_attempt_at = next_window
+        for message in messages:
+            message.modified = now
+        OutboxMessage.objects.bulk_update(messages, ['next_attempt_at', 'modified'])
+    return claimed, postponed
+
+
+def deliver_outbox(batch_size=None):
+    """Deliver a batch of due messages and return the Delivery counts."""
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    now = timezone.now()
+    counts = Counter()
+
+    claimed, postponed = claim(batch_size, now)
+    counts['postponed'] = len(postponed)
+    if not claimed:
+        return Delivery(0, 0, 0, counts['postponed'])
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        for message in claimed:
+            counts[record_failure(message, error, now)] += 1
+        return Delivery(0, counts['retried'], counts['failed'], counts['postponed'])
+
+    try:
+        for message in claimed:
+            try:
+                connection.send_messages([build_email(message, connection)])
+            except Exception as error:
+                counts[record_failure(message, error, now)] += 1
+            else:
+                message.status = OutboxMessage.SENT
+                message.attempts += 1
+                message.sent_at = timezone.now()
+                message.last_error = ''
+                message.save(update_fields=RESULT_FIELDS)
+                counts['sent'] += 1
+    finally:
+        connection.close()
+    return Delivery(counts['sent'], counts['retried'], counts['failed'], counts['postponed'])
+
+
+def record_failure(message, error, now):
+    """Record a failed attempt of a claimed message and return its count name."""
+    fail(message, error, now)
+    message.save(update_fields=RESULT_FIELDS)
+    return 'failed' if message.status == OutboxMessage.FAILED else 'retried'
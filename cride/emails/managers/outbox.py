@@ -0,0 +1,38 @@
+"""Email outbox manager."""
+
+# Django
+from django.db import models
+from django.utils import timezone
+
+
+__all__ = ['OutboxManager']
+
+
+class OutboxManager(models.Manager):
+    """Outbox manager.
+
+    Used to queue messages and to pick the ones due for delivery.
+    """
+
+    def queue(self, subject, body, from_email, recipients, html_body=''):
+        """Queue one message per recipient and return them."""
+        now = timezone.now()
+        return self.bulk_create([
+            self.model(
+                subject=subject,
+                body=body,
+                html_body=html_body,
+                from_email=from_email,
+                to=recipient,
+                domain=recipient.rsplit('@', 1)[-1].lower(),
+                next_attempt_at=now
+            )
+            for recipient in recipients
+        ])
+
+    def due(self, now=None):
+        """Return the pending messages whose delivery time has come, oldest first."""
+        return self.filter(
+            status=self.model.PENDING,
+            next_attempt_at__lte=now or timezone.now()
+        ).order_by('next_attempt_at', 'pk')
@@ -0,0 +1,59 @@
+"""Email outbox model."""
+
+# Django
+from django.db import models
+
+# Utilities
+from cride.utils.models import CRideModel
+
+# Managers
+from cride.emails.managers import OutboxManager
+
+
+class OutboxMessage(CRideModel):
+    """Outbox message.
+
+    Emails are queued in the outbox instead of being sent while
+    handling a request, a periodic task delivers them in batches.
+    """
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    to = models.EmailField(max_length=254)
+    domain = models.CharField(
+        max_length=254,
+        help_text='Recipient domain, deliveries are rate limited per domain.'
+    )
+
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(help_text='Messages are not delivered before this date.')
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    objects = OutboxManager()
+
+    class Meta(CRideModel.Meta):
+        """Meta class."""
+        indexes = [
+            # Due messages lookup
+            models.Index(
+                fields=['next_attempt_at'],
+                name='outbox_pending_idx',
+                condition=models.Q(status='pending')
+            ),
+        ]
+
+    def __str__(self):
+        return '{} to {} ({})'.format(self.subject, self.to, self.status)
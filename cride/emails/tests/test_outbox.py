@@ -0,0 +1,151 @@
+"""Email outbox tests."""
+
+# Django
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+# Model
+from cride.emails.models import OutboxMessage
+
+# Utilities
+from cride.emails.delivery import deliver_outbox
+
+
+class CountingBackend(EmailBackend):
+    """Locmem backend counting opened connections."""
+
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super(CountingBackend, self).open()
+
+
+class FailingBackend(EmailBackend):
+    """Locmem backend rejecting messages sent to unknown.com."""
+
+    def send_messages(self, messages):
+        for message in messages:
+            if message.to[0].endswith('@unknown.com'):
+                raise ConnectionError('Mailbox unavailable')
+        return super(FailingBackend, self).send_messages(messages)
+
+
+class CrashingBackend(EmailBackend):
+    """Locmem backend whose worker dies when sending to crash.com."""
+
+    def send_messages(self, messages):
+        for message in messages:
+            if message.to[0].endswith('@crash.com'):
+                raise SystemExit()
+        return super(CrashingBackend, self).send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='cride.emails.tests.test_outbox.CountingBackend',
+    EMAIL_OUTBOX_DOMAIN_RATE_LIMITS={},
+    EMAIL_OUTBOX_RATE_LIMIT=60,
+)
+class OutboxDeliveryTestCase(TestCase):
+    """Outbox delivery tests."""
+
+    def setUp(self):
+        cache.clear()
+        CountingBackend.opened = 0
+
+    def queue(self, *recipients):
+        """Queue a test message."""
+        return OutboxMessage.objects.queue(
+            'Hi',
+            'Hello',
+            'noreply@comparteride.com',
+            recipients,
+            html_body='<b>Hello</b>'
+        )
+
+    def test_batch_single_connection(self):
+        """A batch is delivered over a single connection."""
+        self.queue(*['user{}@ciencias.unam.mx'.format(i) for i in range(5)])
+        delivery = deliver_outbox(batch_size=3)
+        self.assertEqual(delivery.sent, 3)
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives, [('<b>Hello</b>', 'text/html')])
+        self.assertEqual(OutboxMessage.objects.filter(status=OutboxMessage.SENT).count(), 3)
+
+        self.assertEqual(deliver_outbox(batch_size=3).sent, 2)
+        self.assertEqual(deliver_outbox(batch_size=3).sent, 0)
+
+    @override_settings(EMAIL_OUTBOX_DOMAIN_RATE_LIMITS={'gmail.com': 2})
+    def test_domain_rate_limit(self):
+        """Messages over the domain budget wait for the next minute."""
+        self.queue('a@gmail.com', 'b@GMAIL.com', 'c@gmail.com', 'd@ciencias.unam.mx')
+        delivery = deliver_outbox()
+        self.assertEqual((delivery.sent, delivery.postponed), (3, 1))
+        postponed = OutboxMessage.objects.get(status=OutboxMessage.PENDING)
+        self.assertEqual(postponed.domain, 'gmail.com')
+        self.assertGreater(postponed.next_attempt_at, timezone.now())
+        self.assertEqual(postponed.attempts, 0)
+
+    @override_settings(
+        EMAIL_BACKEND='cride.emails.tests.test_outbox.FailingBackend',
+        EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+        EMAIL_OUTBOX_RETRY_DELAY=60,
+    )
+    def test_retry_backoff(self):
+        """Failed messages are retried later until they run out of attempts."""
+        self.queue('a@unknown.com', 'b@ciencias.unam.mx')
+        delivery = deliver_outbox()
+        self.assertEqual((delivery.sent, delivery.retried), (1, 1))
+
+        message = OutboxMessage.objects.get(to='a@unknown.com')
+        self.assertEqual(message.attempts, 1)
+        self.assertEqual(message.last_error, 'Mailbox unavailable')
+        self.assertGreater(message.next_attempt_at, timezone.now())
+
+        OutboxMessage.objects.filter(pk=message.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_outbox().failed, 1)
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.FAILED)
+
+    @override_settings(EMAIL_BACKEND='cride.emails.tests.test_outbox.CrashingBackend', EMAIL_OUTBOX_LEASE=60)
+    def test_worker_crash(self):
+        """Messages sent before a worker dies stay sent, the rest wait for the lease."""
+        self.queue('a@ciencias.unam.mx', 'b@crash.com', 'c@gmail.com')
+        with self.assertRaises(SystemExit):
+            deliver_outbox()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(OutboxMessage.objects.get(status=OutboxMessage.SENT).to, 'a@ciencias.unam.mx')
+        self.assertEqual(deliver_outbox().sent, 0)
+
+        OutboxMessage.objects.filter(to='c@gmail.com').update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_outbox().sent, 1)
+        self.assertEqual([email.to for email in mail.outbox], [['a@ciencias.unam.mx'], ['c@gmail.com']])
+
+
+class SignupEmailAPITestCase(APITestCase):
+    """Signup email tests."""
+
+    def test_signup_queues_email(self):
+        """Signing up queues the verification email instead of sending it."""
+        response = self.client.post('/users/signup/', {
+            'email': 'pablotrinidad@ciencias.unam.mx',
+            'username': 'pablotrinidad',
+            'phone_number': '+525512345678',
+            'password': 'c0mparte-r1de',
+            'password_confirmation': 'c0mparte-r1de',
+            'first_name': 'Pablo',
+            'last_name': 'Trinidad',
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.to, 'pablotrinidad@ciencias.unam.mx')
+        self.assertEqual(message.domain, 'ciencias.unam.mx')
+        self.assertEqual(len(mail.outbox), 0)
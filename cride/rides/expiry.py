@@ -0,0 +1,76 @@
+"""Rides expiry.
+
+Rides stop being active once they arrive. Each run only looks at
+the arrival window between the previous run's high-water mark and
+now, reading it from the partial index over active rides, and
+deactivates the rides in small batches so no statement holds
+locks on many rows.
+"""
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+# Models
+from cride.rides.models import Ride
+
+# Utilities
+from collections import namedtuple
+from datetime import timedelta
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+HIGH_WATER_KEY = 'rides:expiry:high_water'
+
+Expiry = namedtuple('Expiry', ['expired', 'batches', 'window_start', 'window_end', 'duration'])
+
+
+def get_high_water():
+    """Return the arrival date up to which rides were expired, if known."""
+    return cache.get(HIGH_WATER_KEY)
+
+
+def expire_rides(now=None, batch_size=None):
+    """Deactivate the active rides that arrived since the last run.
+
+    The window starts RIDES_EXPIRY_LOOKBACK seconds before the
+    high-water mark so rides saved late with a past arrival date are
+    still caught, without a mark (first run, cache flushed) every
+    arrived ride is considered.
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or settings.RIDES_EXPIRY_BATCH_SIZE
+    started = time.monotonic()
+
+    high_water = get_high_water()
+    window_start = None
+    rides = Ride.objects.filter(is_active=True, arrival_date__lte=now)
+    if high_water is not None:
+        window_start = high_water - timedelta(seconds=settings.RIDES_EXPIRY_LOOKBACK)
+        rides = rides.filter(arrival_date__gt=window_start)
+    rides = rides.order_by('arrival_date', 'pk').values_list('pk', flat=True)
+
+    expired = 0
+    batches = 0
+    while True:
+        with transaction.atomic():
+            pks = list(rides[:batch_size])
+            if not pks:
+                break
+            expired += Ride.objects.filter(pk__in=pks, is_active=True).update(is_active=False, modified=now)
+        batches += 1
+        if len(pks) < batch_size:
+            break
+
+    cache.set(HIGH_WATER_KEY, now, timeout=None)
+    expiry = Expiry(expired, batches, window_start, now, time.monotonic() - started)
+    logger.info(
+        'Expired %d rides in %d batches (%.3fs).', expiry.expired, expiry.batches, expiry.duration,
+        extra={'rides_expired': expiry.expired, 'batches': expiry.batches, 'duration': expiry.duration}
+    )
+    return expiry
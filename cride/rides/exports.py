@@ -0,0 +1,118 @@
+"""Rides exports.
+
+Exports stream rows as they are read from the database: rides are
+fetched as plain values in chunks, with the number of passengers
+counted by the same query, so memory use and query count don't
+grow with the number of rides exported.
+"""
+
+# Django
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, F
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+# Models
+from cride.rides.models import Ride
+
+# Utilities
+from datetime import datetime, time, timedelta
+import csv
+
+
+EXPORT_FIELDS = (
+    'id',
+    'circle',
+    'passengers',
+    'departure_location',
+    'departure_date',
+    'arrival_location',
+    'arrival_date',
+    'rating',
+)
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object returning what is written instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def parse_bound(value):
+    """Return an aware datetime from an ISO date or datetime string.
+
+    Dates stand for their midnight in the current time zone.
+    """
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError('{} is not a valid date or datetime.'.format(value))
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def today():
+    """Return the (start, end) bounds of the current day."""
+    start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    return start, start + timedelta(days=1)
+
+
+def get_rides(circles=None, start=None, end=None):
+    """Return the export rows of the rides departing in [start, end)."""
+    rides = Ride.objects.all()
+    if circles is not None:
+        rides = rides.filter(offered_in__in=circles)
+    if start is not None:
+        rides = rides.filter(departure_date__gte=start)
+    if end is not None:
+        rides = rides.filter(departure_date__lt=end)
+    return rides.annotate(
+        circle=F('offered_in__slug_name'),
+        passengers_count=Count('passengers')
+    ).order_by('departure_date', 'pk').values_list(
+        'pk',
+        'circle',
+        'passengers_count',
+        'departure_location',
+        'departure_date',
+        'arrival_location',
+        'arrival_date',
+        'rating',
+    )
+
+
+def export_csv(rows):
+    """Yield the CSV lines of the rows, header first."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def export_jsonl(rows):
+    """Yield one JSON object per row."""
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(EXPORT_FIELDS, row))) + '\n'
+
+
+EXPORTERS = {
+    'csv': export_csv,
+    'jsonl': export_jsonl,
+}
+
+
+def export_rides(rides, export_format='csv', chunk_size=CHUNK_SIZE):
+    """Return a generator of the rides export in the given format."""
+    return EXPORTERS[export_format](rides.iterator(chunk_size=chunk_size))
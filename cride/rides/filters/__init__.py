@@ -0,0 +1,2 @@
+from .geo import *
+from .search import *
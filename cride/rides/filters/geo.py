@@ -0,0 +1,87 @@
+"""Rides geographic filters."""
+
+# Django
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# Django REST Framework
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+
+__all__ = ['RideProximityFilter']
+
+
+class RideProximityFilter(BaseFilterBackend):
+    """Rides proximity filter.
+
+    Handle the "rides near me" and "rides toward point" searches:
+        + near (lat,lng): departure point of the ride.
+        + toward (lat,lng): arrival point of the ride.
+        + radius (km): search radius around the given points.
+        + departure_after / departure_before (datetime): time window.
+    When no explicit ordering is requested, the closest rides come first.
+    """
+
+    DEFAULT_RADIUS = 2
+    MAX_RADIUS = 50
+
+    def filter_queryset(self, request, queryset, view):
+        """Apply proximity and time window filters."""
+        params = request.query_params
+        near = self.parse_point(params, 'near')
+        toward = self.parse_point(params, 'toward')
+        radius = self.parse_radius(params)
+
+        queryset = queryset.departing_between(
+            start=self.parse_date(params, 'departure_after'),
+            end=self.parse_date(params, 'departure_before')
+        )
+
+        distances = []
+        if near is not None:
+            queryset = queryset.near(*near, radius)
+            distances.append('departure_distance')
+        if toward is not None:
+            queryset = queryset.toward(*toward, radius)
+            distances.append('arrival_distance')
+
+        ordering_param = getattr(view, 'ordering_param', OrderingFilter.ordering_param)
+        if distances and ordering_param not in params:
+            queryset = queryset.order_by(*distances, *queryset.query.order_by)
+        return queryset
+
+    def parse_point(self, params, name):
+        """Return the (latitude, longitude) tuple in the given param."""
+        value = params.get(name)
+        if not value:
+            return None
+        try:
+            latitude, longitude = [float(x) for x in value.split(',')]
+        except ValueError:
+            raise ValidationError({name: 'Expected a "latitude,longitude" pair.'})
+        if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+            raise ValidationError({name: 'Coordinates out of range.'})
+        return latitude, longitude
+
+    def parse_radius(self, params):
+        """Return the search radius in km."""
+        try:
+            radius = float(params.get('radius', self.DEFAULT_RADIUS))
+        except ValueError:
+            raise ValidationError({'radius': 'A valid number is required.'})
+        if not 0 < radius <= self.MAX_RADIUS:
+            raise ValidationError({'radius': 'Radius must be between 0 and {} km.'.format(self.MAX_RADIUS)})
+        return radius
+
+    def parse_date(self, params, name):
+        """Return the datetime in the given param."""
+        value = params.get(name)
+        if not value:
+            return None
+        date = parse_datetime(value)
+        if date is None:
+            raise ValidationError({name: 'A valid ISO 8601 datetime is required.'})
+        if timezone.is_naive(date):
+            date = timezone.make_aware(date)
+        return date
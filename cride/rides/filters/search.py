@@ -0,0 +1,64 @@
+"""Rides location search filters."""
+
+# Django
+from django.db.models import Case, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+# Django REST Framework
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+from rest_framework.settings import api_settings
+
+# Models
+from cride.rides.models import RideLocationToken
+
+# Utilities
+from cride.utils import text
+
+
+__all__ = ['RideLocationSearchFilter']
+
+
+class RideLocationSearchFilter(BaseFilterBackend):
+    """Ride location search filter.
+
+    Replaces DRF's SearchFilter for rides. Every word of the search
+    must prefix-match a token of the departure or arrival location,
+    lookups are served by the RideLocationToken index. Results are
+    annotated with a `search_rank` (exact matches weight more than
+    prefix matches) and ranked by it unless an explicit ordering
+    is requested.
+    """
+
+    search_param = api_settings.SEARCH_PARAM
+    max_terms = 8
+
+    def filter_queryset(self, request, queryset, view):
+        """Filter and rank rides by location."""
+        terms = text.tokenize(request.query_params.get(self.search_param, ''))[:self.max_terms]
+        if not terms:
+            return queryset
+
+        matches = Q()
+        for term in terms:
+            term_tokens = RideLocationToken.objects.filter(token__startswith=term)
+            queryset = queryset.filter(pk__in=term_tokens.values('ride'))
+            matches |= Q(token__startswith=term)
+
+        ranks = RideLocationToken.objects.filter(
+            matches,
+            ride=OuterRef('pk')
+        ).values('ride').annotate(
+            rank=Sum(Case(
+                When(token__in=terms, then=Value(2)),
+                default=Value(1),
+                output_field=IntegerField()
+            ))
+        ).values('rank')
+        queryset = queryset.annotate(
+            search_rank=Coalesce(Subquery(ranks, output_field=IntegerField()), Value(0))
+        )
+
+        ordering_param = getattr(view, 'ordering_param', OrderingFilter.ordering_param)
+        if ordering_param not in request.query_params:
+            queryset = queryset.order_by('-search_rank', *queryset.query.order_by)
+        return queryset
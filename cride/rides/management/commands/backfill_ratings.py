@@ -0,0 +1,59 @@
+"""Backfill rating aggregates."""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum, Count, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# Models
+from cride.rides.models import Ride, Rating
+from cride.users.models import Profile
+
+# Utilities
+from cride.utils.stats import rounded_average
+
+
+def aggregate(group_by, function, **lookups):
+    """Return a correlated subquery aggregating the ratings matching the lookups."""
+    rows = Rating.objects.filter(**lookups).order_by().values(group_by).annotate(
+        value=function
+    ).values('value')
+    return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+
+class Command(BaseCommand):
+    """Backfill ratings command.
+
+    Recompute the ratings sum and count of rides and profiles from
+    the emitted ratings, then their averages.
+    """
+
+    help = 'Recompute ride ratings and profile reputations from the ratings table.'
+
+    def handle(self, *args, **options):
+        # Averages are served, their rows get a new modified for conditional requests
+        now = timezone.now()
+        with transaction.atomic():
+            rides = Ride.objects.update(
+                ratings_sum=aggregate('ride', Sum('rating'), ride=OuterRef('pk')),
+                ratings_count=aggregate('ride', Count('*'), ride=OuterRef('pk'))
+            )
+            Ride.objects.filter(ratings_count__gt=0).update(
+                rating=rounded_average(F('ratings_sum'), F('ratings_count')),
+                modified=now
+            )
+
+            profiles = Profile.objects.update(
+                ratings_sum=aggregate('rated_user', Sum('rating'), rated_user=OuterRef('user')),
+                ratings_count=aggregate('rated_user', Count('*'), rated_user=OuterRef('user'))
+            )
+            Profile.objects.filter(ratings_count__gt=0).update(
+                reputation=rounded_average(F('ratings_sum'), F('ratings_count')),
+                modified=now
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            'Backfilled ratings of {} rides and {} profiles.'.format(rides, profiles)
+        ))
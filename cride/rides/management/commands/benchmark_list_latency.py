@@ -0,0 +1,82 @@
+"""Latency benchmark for list endpoints."""
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+
+# Django REST Framework
+from rest_framework.authtoken.models import Token
+
+# Models
+from cride.circles.models import Circle
+from cride.users.models import User
+
+# Utilities
+import statistics
+import time
+
+
+class Command(BaseCommand):
+    """Benchmark list latency command.
+
+    Request list endpoints as a given user and report their p50 and
+    p99 latencies twice: wrapping every request in a transaction, as
+    ATOMIC_REQUESTS did, and with the views' own transaction policy.
+    """
+
+    help = 'Compare list endpoints latency with and without per-request transactions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='Username to request as.')
+        parser.add_argument('--url', action='append', dest='urls', help='Endpoint to request, repeatable.')
+        parser.add_argument('--requests', type=int, default=200)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError('User {} does not exist.'.format(options['user']))
+        token, _ = Token.objects.get_or_create(user=user)
+        client = Client(HTTP_AUTHORIZATION='Token {}'.format(token.key))
+
+        urls = options['urls'] or self.default_urls(user)
+        settings_dict = connections['default'].settings_dict
+        atomic_requests = settings_dict['ATOMIC_REQUESTS']
+        try:
+            with override_settings(ALLOWED_HOSTS=['*']):
+                for url in urls:
+                    self.stdout.write(url)
+                    for label, atomic in (('atomic', True), ('autocommit', False)):
+                        settings_dict['ATOMIC_REQUESTS'] = atomic
+                        timings = self.run(client, url, options['requests'])
+                        self.report(label, timings)
+        finally:
+            settings_dict['ATOMIC_REQUESTS'] = atomic_requests
+
+    def default_urls(self, user):
+        """Return the circles list plus the rides list of one of the user's circles."""
+        urls = ['/circles/']
+        circle = Circle.objects.filter(members=user).first()
+        if circle is not None:
+            urls.append('/circles/{}/rides/'.format(circle.slug_name))
+        return urls
+
+    def run(self, client, url, total):
+        """Request the URL `total` times and return the latencies in ms."""
+        client.get(url)  # Warm up
+        timings = []
+        for _ in range(total):
+            start = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise CommandError('{} answered {}.'.format(url, response.status_code))
+        return timings
+
+    def report(self, label, timings):
+        """Print the latency percentiles."""
+        percentiles = statistics.quantiles(timings, n=100)
+        self.stdout.write('  {:<10} p50 {:7.2f}ms  p99 {:7.2f}ms'.format(
+            label, statistics.median(timings), percentiles[98]
+        ))
@@ -0,0 +1,138 @@
+"""Latency benchmark for ride matching."""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.authtoken.models import Token
+
+# Models
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride
+from cride.users.models import User, Profile
+
+# Utilities
+from cride.rides import matching
+from cride.utils import geohash
+from datetime import timedelta
+import random
+import statistics
+import time
+
+
+class Command(BaseCommand):
+    """Benchmark ride matching command.
+
+    Create a user member of many circles with thousands of rides
+    each, spread over the next days around a city, in a transaction
+    that is rolled back at the end. Then request the user's matches
+    for random departures and points and report p50 and p99
+    latencies.
+    """
+
+    help = 'Measure the matches endpoint latency for a user in many busy circles.'
+
+    CENTER = (19.43, -99.13)
+
+    def add_arguments(self, parser):
+        parser.add_argument('--circles', type=int, default=50)
+        parser.add_argument('--rides', type=int, default=2000, help='Rides per circle.')
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        with transaction.atomic():
+            user = self.setup(options['circles'], options['rides'])
+            token, _ = Token.objects.get_or_create(user=user)
+            client = Client(HTTP_AUTHORIZATION='Token {}'.format(token.key))
+
+            self.stdout.write('Scoring with {}'.format('NumPy' if matching.numpy is not None else 'Python'))
+            with override_settings(ALLOWED_HOSTS=['*']):
+                for label, with_points in (('time only', False), ('time and points', True)):
+                    timings = self.run(client, options['requests'], with_points)
+                    percentiles = statistics.quantiles(timings, n=100)
+                    self.stdout.write('{:<16} p50 {:8.2f}ms  p99 {:8.2f}ms'.format(
+                        label, statistics.median(timings), percentiles[98]
+                    ))
+            transaction.set_rollback(True)
+
+    def random_point(self, spread=0.1):
+        """Return a point around the city center."""
+        return (
+            self.CENTER[0] + random.uniform(-spread, spread),
+            self.CENTER[1] + random.uniform(-spread, spread)
+        )
+
+    def setup(self, circles, rides):
+        """Create the user, drivers, circles and rides."""
+        run = timezone.now().strftime('%H%M%S%f')
+        users = User.objects.bulk_create([
+            User(
+                username='bench-match-{}-{}'.format(run, i),
+                email='bench-match-{}-{}@comparteride.com'.format(run, i),
+                first_name='Bench',
+                last_name=str(i),
+            )
+            for i in range(11)
+        ])
+        users = list(User.objects.filter(username__startswith='bench-match-{}-'.format(run)).order_by('pk'))
+        Profile.objects.bulk_create([
+            Profile(user=user, reputation=round(random.uniform(1, 5), 1)) for user in users
+        ])
+        user, drivers = users[0], users[1:]
+
+        Circle.objects.bulk_create([
+            Circle(name='Bench {}'.format(i), slug_name='bench-match-{}-{}'.format(run, i), about='Benchmark')
+            for i in range(circles)
+        ])
+        circles = list(Circle.objects.filter(slug_name__startswith='bench-match-{}-'.format(run)))
+        profiles = {profile.user_id: profile for profile in Profile.objects.filter(user__in=users)}
+        Membership.objects.bulk_create([
+            Membership(user=member, profile=profiles[member.pk], circle=circle)
+            for circle in circles for member in users
+        ])
+
+        now = timezone.now()
+        batch = []
+        for circle in circles:
+            for _ in range(rides):
+                departure = now + timedelta(minutes=random.randint(15, 3 * 24 * 60))
+                origin, destination = self.random_point(), self.random_point()
+                batch.append(Ride(
+                    offered_by=random.choice(drivers),
+                    offered_in=circle,
+                    available_seats=random.randint(1, 4),
+                    departure_location='Benchmark',
+                    departure_date=departure,
+                    departure_latitude=origin[0],
+                    departure_longitude=origin[1],
+                    departure_geohash=geohash.encode(*origin),
+                    arrival_location='Benchmark',
+                    arrival_date=departure + timedelta(hours=1),
+                    arrival_latitude=destination[0],
+                    arrival_longitude=destination[1],
+                    arrival_geohash=geohash.encode(*destination),
+                ))
+            Ride.objects.bulk_create(batch, batch_size=1000)
+            batch = []
+        self.stdout.write('{} circles with {} rides each'.format(len(circles), rides))
+        return user
+
+    def run(self, client, total, with_points):
+        """Request matches `total` times and return the latencies in ms."""
+        timings = []
+        for _ in range(total):
+            params = {'departure': (timezone.now() + timedelta(minutes=random.randint(30, 2 * 24 * 60))).isoformat()}
+            if with_points:
+                params['near'] = '{:.5f},{:.5f}'.format(*self.random_point())
+                params['toward'] = '{:.5f},{:.5f}'.format(*self.random_point())
+                params['radius'] = 10
+            start = time.perf_counter()
+            response = client.get('/rides/matches/', params)
+            timings.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, response.content
+        return timings
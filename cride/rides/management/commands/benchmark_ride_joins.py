@@ -0,0 +1,122 @@
+"""Stress benchmark for concurrent ride joins."""
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+# Models
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride
+from cride.users.models import User, Profile
+
+# Utilities
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import time
+import uuid
+
+
+class Command(BaseCommand):
+    """Benchmark ride joins command.
+
+    Create a throwaway circle with a single ride and fire concurrent
+    seat reservations at it from many threads, each one with its own
+    database connection. Verify the ride is never overbooked and
+    report the throughput. Use a PostgreSQL database, SQLite
+    serializes every write.
+    """
+
+    help = 'Fire concurrent joins at a single ride and verify no seat is oversold.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--passengers', type=int, default=300)
+        parser.add_argument('--seats', type=int, default=15)
+        parser.add_argument('--workers', type=int, default=32)
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark data.')
+
+    def handle(self, *args, **options):
+        circle, ride, passengers = self.setup(options['passengers'], options['seats'])
+        try:
+            results, elapsed = self.run(ride, passengers, options['workers'])
+            self.report(ride, options['seats'], results, elapsed)
+        finally:
+            if not options['keep']:
+                self.teardown(circle, passengers)
+
+    def setup(self, total, seats):
+        """Create the circle, the ride and its would-be passengers."""
+        run = uuid.uuid4().hex[:8]
+        with transaction.atomic():
+            circle = Circle.objects.create(
+                name='Benchmark {}'.format(run),
+                slug_name='benchmark-{}'.format(run),
+                about='Ride joins benchmark'
+            )
+            User.objects.bulk_create([
+                User(
+                    username='bench-{}-{}'.format(run, i),
+                    email='bench-{}-{}@comparteride.com'.format(run, i),
+                    first_name='Bench',
+                    last_name=str(i),
+                )
+                for i in range(total + 1)
+            ])
+            users = list(User.objects.filter(username__startswith='bench-{}-'.format(run)).order_by('pk'))
+            Profile.objects.bulk_create([Profile(user=user) for user in users])
+            profiles = Profile.objects.filter(user__in=users)
+            Membership.objects.bulk_create([
+                Membership(user_id=profile.user_id, profile=profile, circle=circle)
+                for profile in profiles
+            ])
+            departure = timezone.now() + timedelta(hours=1)
+            ride = Ride.objects.create(
+                offered_by=users[0],
+                offered_in=circle,
+                available_seats=seats,
+                departure_location='Benchmark',
+                departure_date=departure,
+                arrival_location='Benchmark',
+                arrival_date=departure + timedelta(hours=1)
+            )
+        return circle, ride, users[1:]
+
+    def run(self, ride, passengers, workers):
+        """Reserve seats from many threads at once."""
+
+        def join(user):
+            try:
+                return 'joined' if Ride.objects.reserve_seat(ride, user) else 'full'
+            except Exception as ex:
+                return type(ex).__name__
+            finally:
+                connection.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(join, passengers))
+        return results, time.perf_counter() - start
+
+    def report(self, ride, seats, results, elapsed):
+        """Verify the ride state and print the results."""
+        ride.refresh_from_db()
+        joined = results.count('joined')
+        passengers = ride.passengers.count()
+        self.stdout.write('{} joins in {:.3f}s ({:.0f} joins/s)'.format(
+            len(results), elapsed, len(results) / elapsed
+        ))
+        for outcome in sorted(set(results)):
+            self.stdout.write('  {}: {}'.format(outcome, results.count(outcome)))
+        self.stdout.write('Seats: {} offered, {} taken, {} left'.format(
+            seats, passengers, ride.available_seats
+        ))
+
+        if passengers != joined or passengers + ride.available_seats != seats or passengers > seats:
+            raise CommandError('Ride was overbooked!')
+        self.stdout.write(self.style.SUCCESS('No overbooking.'))
+
+    def teardown(self, circle, passengers):
+        """Delete the benchmark data."""
+        Ride.objects.filter(offered_in=circle).delete()
+        User.objects.filter(membership__circle=circle).delete()
+        circle.delete()
@@ -0,0 +1,103 @@
+"""Serialization benchmark for ride lists."""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.renderers import JSONRenderer
+
+# Models
+from cride.circles.models import Circle
+from cride.rides.models import Ride
+from cride.users.models import User, Profile
+
+# Serializers
+from cride.rides.serializers import RideModelSerializer
+
+# Utilities
+from cride.utils.fast_serializers import compile_serializer
+from cride.utils.renderers import FastJSONRenderer
+from cride.utils.views import get_eager_loading
+from datetime import timedelta
+import statistics
+import time
+
+
+class Command(BaseCommand):
+    """Benchmark ride serialization command.
+
+    Create rides with passengers in a transaction that is rolled
+    back at the end, then time serializing and rendering them with
+    RideModelSerializer and JSONRenderer against the compiled
+    serializer and FastJSONRenderer. Report milliseconds per 1000
+    rides, database time included.
+    """
+
+    help = 'Compare the time spent serializing rides with and without the fast path.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rides', type=int, default=1000)
+        parser.add_argument('--passengers', type=int, default=3)
+        parser.add_argument('--runs', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            circle = self.setup(options['rides'], options['passengers'])
+            queryset = Ride.objects.filter(offered_in=circle).order_by('pk')
+            for label, serialize in (('serializer', self.serialize), ('compiled', self.serialize_compiled)):
+                timings = []
+                for _ in range(options['runs']):
+                    start = time.perf_counter()
+                    serialize(queryset)
+                    timings.append(time.perf_counter() - start)
+                per_thousand = statistics.median(timings) * 1000 * 1000 / options['rides']
+                self.stdout.write('{:<10} {:8.1f}ms per 1000 rides'.format(label, per_thousand))
+            transaction.set_rollback(True)
+
+    def setup(self, total, passengers):
+        """Create a circle with rides and passengers."""
+        circle = Circle.objects.create(name='Benchmark', slug_name='benchmark-serializers', about='Benchmark')
+        User.objects.bulk_create([
+            User(
+                username='bench-serializers-{}'.format(i),
+                email='bench-serializers-{}@comparteride.com'.format(i),
+                first_name='Bench',
+                last_name=str(i),
+            )
+            for i in range(passengers + 1)
+        ])
+        users = list(User.objects.filter(username__startswith='bench-serializers-'))
+        Profile.objects.bulk_create([Profile(user=user) for user in users])
+
+        departure = timezone.now() + timedelta(hours=1)
+        Ride.objects.bulk_create([
+            Ride(
+                offered_by=users[0],
+                offered_in=circle,
+                available_seats=passengers,
+                departure_location='Ciudad Universitaria',
+                departure_date=departure + timedelta(minutes=i),
+                arrival_location='Zocalo',
+                arrival_date=departure + timedelta(minutes=i + 60),
+            )
+            for i in range(total)
+        ])
+        rides = Ride.objects.filter(offered_in=circle).values_list('pk', flat=True)
+        Ride.passengers.through.objects.bulk_create([
+            Ride.passengers.through(ride_id=ride, user_id=user.pk)
+            for ride in rides for user in users[1:]
+        ])
+        return circle
+
+    def serialize(self, queryset):
+        """Render rides the way ModelSerializer does, eager loaded."""
+        select_related, prefetch_related = get_eager_loading(RideModelSerializer(), Ride)
+        queryset = queryset.select_related(*select_related).prefetch_related(*prefetch_related)
+        return JSONRenderer().render(RideModelSerializer(queryset, many=True).data)
+
+    def serialize_compiled(self, queryset):
+        """Render rides with the compiled serializer."""
+        compiled = compile_serializer(RideModelSerializer, (('circles.Circle', 'name'),))
+        return FastJSONRenderer().render(compiled.serialize(compiled.values(queryset)))
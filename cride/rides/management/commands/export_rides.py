@@ -0,0 +1,52 @@
+"""Export rides."""
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+
+# Models
+from cride.circles.models import Circle
+
+# Utilities
+from cride.rides import exports
+from datetime import timedelta
+
+
+class Command(BaseCommand):
+    """Export rides command.
+
+    Rides are streamed to the output in chunks, see cride.rides.exports.
+    """
+
+    help = 'Export the rides departing in a date range as CSV or JSON lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='ISO date or datetime, defaults to today.')
+        parser.add_argument('--end', help='ISO date or datetime (exclusive), defaults to one day after start.')
+        parser.add_argument('--circle', action='append', dest='circles', help='Circle slug name, repeatable.')
+        parser.add_argument('--format', choices=sorted(exports.EXPORTERS), default='csv')
+        parser.add_argument('--output', help='Output file, defaults to stdout.')
+        parser.add_argument('--chunk-size', type=int, default=exports.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            start, end = exports.today()
+            if options['start']:
+                start = exports.parse_bound(options['start'])
+                end = start + timedelta(days=1)
+            if options['end']:
+                end = exports.parse_bound(options['end'])
+        except ValueError as error:
+            raise CommandError(error)
+
+        circles = None
+        if options['circles']:
+            circles = Circle.objects.filter(slug_name__in=options['circles']).values('id')
+
+        rides = exports.get_rides(circles=circles, start=start, end=end)
+        lines = exports.export_rides(rides, options['format'], chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,43 @@
+"""Rebuild the rides location search index."""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+# Models
+from cride.rides.models import Ride, RideLocationToken
+
+# Utilities
+from cride.utils import text
+
+
+class Command(BaseCommand):
+    """Index ride locations command."""
+
+    help = 'Rebuild the location search tokens of every ride.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        rides = Ride.objects.only('pk', 'departure_location', 'arrival_location').order_by('pk')
+        indexed = 0
+        last_pk = 0
+        while True:
+            batch = list(rides.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                RideLocationToken.objects.filter(ride__in=batch).delete()
+                tokens = []
+                for ride in batch:
+                    ride.location_search_text = text.normalize(
+                        '{} {}'.format(ride.departure_location, ride.arrival_location)
+                    )
+                    tokens += RideLocationToken.objects.build_tokens(ride)
+                RideLocationToken.objects.bulk_create(tokens, batch_size=batch_size)
+                Ride.objects.bulk_update(batch, ['location_search_text'], batch_size=batch_size)
+            indexed += len(batch)
+            last_pk = batch[-1].pk
+        self.stdout.write(self.style.SUCCESS('{} rides indexed.'.format(indexed)))
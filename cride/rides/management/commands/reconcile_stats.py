@@ -0,0 +1,56 @@
+"""Recompute denormalized ride stats."""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+# Models
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride
+from cride.users.models import Profile
+
+
+def count(queryset, group_by):
+    """Return a correlated subquery counting the rows of the queryset."""
+    rows = queryset.order_by().values(group_by).annotate(total=Count('*')).values('total')
+    return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+
+class Command(BaseCommand):
+    """Reconcile stats command.
+
+    Counters are recomputed from rides, passengers and active
+    memberships with one set-based UPDATE per table.
+    """
+
+    help = 'Recompute rides and members counters of circles, memberships and profiles.'
+
+    def handle(self, *args, **options):
+        passengers = Ride.passengers.through.objects.all()
+
+        with transaction.atomic():
+            circles = Circle.objects.update(
+                rides_offered=count(Ride.objects.filter(offered_in=OuterRef('pk')), 'offered_in'),
+                rides_taken=count(passengers.filter(ride__offered_in=OuterRef('pk')), 'ride__offered_in'),
+                members_count=count(Membership.objects.filter(circle=OuterRef('pk'), is_active=True), 'circle')
+            )
+            memberships = Membership.objects.update(
+                rides_offered=count(
+                    Ride.objects.filter(offered_in=OuterRef('circle'), offered_by=OuterRef('user')),
+                    'offered_by'
+                ),
+                rides_taken=count(
+                    passengers.filter(ride__offered_in=OuterRef('circle'), user=OuterRef('user')),
+                    'user'
+                )
+            )
+            profiles = Profile.objects.update(
+                rides_offered=count(Ride.objects.filter(offered_by=OuterRef('user')), 'offered_by'),
+                rides_taken=count(passengers.filter(user=OuterRef('user')), 'user')
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            'Reconciled {} circles, {} memberships and {} profiles.'.format(circles, memberships, profiles)
+        ))
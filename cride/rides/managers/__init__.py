@@ -0,0 +1,2 @@
+from .rides import *
+from .search import *
@@ -0,0 +1,97 @@
+"""Rides managers."""
+
+# Django
+from django.db import models, transaction
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+from django.utils import timezone
+
+# Utilities
+from cride.utils import geohash
+import math
+
+
+__all__ = ['RideQuerySet', 'RideManager']
+
+
+class RideQuerySet(models.QuerySet):
+    """Ride QuerySet.
+
+    Adds proximity lookups backed by the geohash columns
+    stored on every ride.
+    """
+
+    def near(self, latitude, longitude, radius, endpoint='departure'):
+        """Return rides whose endpoint lies within `radius` km of the point.
+
+        The geohash prefixes covering the search area narrow the
+        candidates using the index, the exact great circle distance
+        is then annotated as `<endpoint>_distance` and filtered.
+        """
+        prefixes = Q()
+        for cell in geohash.covering_cells(latitude, longitude, radius):
+            prefixes |= Q(**{'{}_geohash__startswith'.format(endpoint): cell})
+
+        distance_field = '{}_distance'.format(endpoint)
+        queryset = self.filter(prefixes).annotate(**{
+            distance_field: self._distance_expression(endpoint, latitude, longitude)
+        })
+        return queryset.filter(**{'{}__lte'.format(distance_field): radius})
+
+    def toward(self, latitude, longitude, radius):
+        """Return rides arriving within `radius` km of the point."""
+        return self.near(latitude, longitude, radius, endpoint='arrival')
+
+    def departing_between(self, start=None, end=None):
+        """Restrict rides to a departure time window."""
+        queryset = self
+        if start is not None:
+            queryset = queryset.filter(departure_date__gte=start)
+        if end is not None:
+            queryset = queryset.filter(departure_date__lte=end)
+        return queryset
+
+    @staticmethod
+    def _distance_expression(endpoint, latitude, longitude):
+        """Return the haversine distance in km between the endpoint and the point."""
+        lat = Radians(F('{}_latitude'.format(endpoint)))
+        lng = Radians(F('{}_longitude'.format(endpoint)))
+        origin_lat = Value(math.radians(latitude), output_field=FloatField())
+        origin_lng = Value(math.radians(longitude), output_field=FloatField())
+        two = Value(2.0, output_field=FloatField())
+
+        h = (
+            Power(Sin((lat - origin_lat) / two), 2) +
+            Cos(origin_lat) * Cos(lat) * Power(Sin((lng - origin_lng) / two), 2)
+        )
+        return ASin(Sqrt(h), output_field=FloatField()) * Value(
+            2 * geohash.EARTH_RADIUS_KM,
+            output_field=FloatField()
+        )
+
+
+class RideManager(models.Manager.from_queryset(RideQuerySet)):
+    """Ride manager.
+
+    Used to handle seat reservations.
+    """
+
+    def reserve_seat(self, ride, user):
+        """Take one of the ride's available seats for the user.
+
+        The seat is taken with a conditional UPDATE, the database
+        only decrements rows that still have seats left, so parallel
+        joins can never oversell a ride. Return False when the ride
+        is full, raise IntegrityError when the user is already a
+        passenger (the seat is given back).
+        """
+        with transaction.atomic(using=self.db):
+            reserved = self.filter(
+                pk=ride.pk,
+                is_active=True,
+                available_seats__gte=1
+            ).update(available_seats=F('available_seats') - 1, modified=timezone.now())
+            if not reserved:
+                return False
+            self.model.passengers.through.objects.using(self.db).create(ride_id=ride.pk, user_id=user.pk)
+        return True
@@ -0,0 +1,31 @@
+"""Rides location search managers."""
+
+# Django
+from django.db import models
+
+# Utilities
+from cride.utils import text
+
+
+__all__ = ['LocationTokenManager']
+
+
+class LocationTokenManager(models.Manager):
+    """Location token manager.
+
+    Used to keep the inverted index of ride locations up to date.
+    """
+
+    def index_ride(self, ride):
+        """Replace the tokens of the given ride."""
+        self.filter(ride=ride).delete()
+        self.bulk_create(self.build_tokens(ride))
+
+    def build_tokens(self, ride):
+        """Return the unsaved tokens of the given ride."""
+        tokens = []
+        for field in ('departure', 'arrival'):
+            location = getattr(ride, '{}_location'.format(field))
+            for token in text.tokenize(location):
+                tokens.append(self.model(ride=ride, field=field, token=token[:self.model.TOKEN_LENGTH]))
+        return tokens
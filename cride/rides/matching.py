@@ -0,0 +1,141 @@
+"""Rides matching.
+
+Rank the open rides of every circle a user is an active member of.
+Candidates come from a single query over all those circles: rides
+departing inside the time window around the desired departure,
+optionally within a radius of the desired departure and arrival
+points (the database computes the distances, see RideQuerySet.near).
+Each candidate is then scored on:
+    + time: how close its departure is to the desired one.
+    + location: how close its endpoints are to the desired points.
+    + reputation: its offerer's reputation.
+Scores are computed over whole columns with NumPy when installed,
+or row by row otherwise.
+"""
+
+# Django
+from django.conf import settings
+from django.db.models import FloatField, Value
+from django.utils import timezone
+
+# Models
+from cride.circles.models import Membership
+from cride.rides.models import Ride
+
+# Utilities
+from collections import namedtuple
+from datetime import timedelta
+import heapq
+import math
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+WEIGHTS = {
+    'time': 0.5,
+    'location': 0.3,
+    'reputation': 0.2,
+}
+
+# Seconds and km after which time and location scores fall to 1/e.
+TIME_SCALE = 60 * 60
+DISTANCE_SCALE = 5
+
+MAX_REPUTATION = 5.0
+# Offerers without a profile don't outrank rated ones.
+UNKNOWN_REPUTATION = 0.0
+
+# Rides leaving sooner than this can't be joined anymore.
+MIN_NOTICE = timedelta(minutes=10)
+
+Match = namedtuple('Match', ['ride', 'score'])
+
+
+def get_candidates(user, departure, near=None, toward=None, radius=None):
+    """Return the rows of the rides the user could join around the departure.
+
+    Rows are (pk, seconds between the ride and the desired departure,
+    offerer reputation, departure distance, arrival distance),
+    distances are None unless the matching point was given.
+    """
+    window = timedelta(seconds=settings.RIDES_MATCH_WINDOW)
+    circles = Membership.objects.filter(user=user, is_active=True).values('circle')
+    rides = Ride.objects.filter(
+        offered_in__in=circles,
+        is_active=True,
+        available_seats__gte=1
+    ).departing_between(
+        start=max(departure - window, timezone.now() + MIN_NOTICE),
+        end=departure + window
+    ).exclude(offered_by=user).exclude(passengers=user)
+
+    for endpoint, point in (('departure', near), ('arrival', toward)):
+        if point is None:
+            rides = rides.annotate(**{'{}_distance'.format(endpoint): Value(None, output_field=FloatField())})
+        else:
+            rides = rides.near(*point, radius, endpoint=endpoint)
+
+    # Rows are ranked in Python, skip the default ordering sort
+    rows = rides.order_by().values_list(
+        'pk',
+        'departure_date',
+        'offered_by__profile__reputation',
+        'departure_distance',
+        'arrival_distance'
+    )
+    target = departure.timestamp()
+    return [(pk, date.timestamp() - target, *values) for pk, date, *values in rows]
+
+
+def score_rows(rows, near=None, toward=None):
+    """Return the score of every candidate row.
+
+    The location score only counts the points that were given.
+    """
+    weights = dict(WEIGHTS)
+    endpoints = [index for index, point in ((3, near), (4, toward)) if point is not None]
+    if not endpoints:
+        del weights['location']
+    total_weight = sum(weights.values())
+
+    if numpy is not None:
+        columns = numpy.array(rows, dtype=float).T
+        time = numpy.exp(-numpy.abs(columns[1]) / TIME_SCALE)
+        reputation = numpy.nan_to_num(columns[2], nan=UNKNOWN_REPUTATION) / MAX_REPUTATION
+        score = weights['time'] * time + weights['reputation'] * reputation
+        if endpoints:
+            location = numpy.mean([numpy.exp(-columns[index] / DISTANCE_SCALE) for index in endpoints], axis=0)
+            score += weights['location'] * location
+        return (score / total_weight).tolist()
+
+    scores = []
+    for row in rows:
+        reputation = UNKNOWN_REPUTATION if row[2] is None else row[2]
+        score = (
+            weights['time'] * math.exp(-abs(row[1]) / TIME_SCALE) +
+            weights['reputation'] * reputation / MAX_REPUTATION
+        )
+        if endpoints:
+            location = sum(math.exp(-row[index] / DISTANCE_SCALE) for index in endpoints) / len(endpoints)
+            score += weights['location'] * location
+        scores.append(score / total_weight)
+    return scores
+
+
+def match_rides(user, departure=None, near=None, toward=None, radius=2, limit=20):
+    """Return the best `limit` matches for the user, best first."""
+    departure = departure or timezone.now()
+    rows = get_candidates(user, departure, near, toward, radius)
+    if not rows:
+        return []
+    scores = score_rows(rows, near, toward)
+    # Ties go to the earliest departure
+    best = heapq.nsmallest(
+        limit,
+        zip(scores, rows),
+        key=lambda item: (-item[0], item[1][1], item[1][0])
+    )
+    return [Match(row[0], round(score, 4)) for score, row in best]
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0002_rating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ride',
+            name='arrival_geohash',
+            field=models.CharField(blank=True, db_index=True, help_text='Geohash of the arrival point, used for proximity searches.', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='ride',
+            name='arrival_latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ride',
+            name='arrival_longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ride',
+            name='departure_geohash',
+            field=models.CharField(blank=True, db_index=True, help_text='Geohash of the departure point, used for proximity searches.', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='ride',
+            name='departure_latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ride',
+            name='departure_longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
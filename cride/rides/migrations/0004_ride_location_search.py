@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0003_ride_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ride',
+            name='location_search_text',
+            field=models.CharField(blank=True, editable=False, help_text='Normalized departure and arrival locations, kept in sync with the location tokens.', max_length=511),
+        ),
+        migrations.CreateModel(
+            name='RideLocationToken',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('departure', 'Departure'), ('arrival', 'Arrival')], max_length=10)),
+                ('token', models.CharField(db_index=True, max_length=64)),
+                ('ride', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='location_tokens', to='rides.ride')),
+            ],
+            options={
+                'unique_together': {('ride', 'field', 'token')},
+            },
+        ),
+    ]
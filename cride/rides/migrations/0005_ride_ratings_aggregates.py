@@ -0,0 +1,41 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:18
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def aggregate_ratings(apps, schema_editor):
+    """Store the sum and count of the ratings of every ride."""
+    Ride = apps.get_model('rides', 'Ride')
+    Rating = apps.get_model('rides', 'Rating')
+    ratings = Rating.objects.filter(ride=OuterRef('pk')).order_by().values('ride')
+    Ride.objects.update(
+        ratings_sum=Coalesce(Subquery(
+            ratings.annotate(total=Sum('rating')).values('total'), output_field=IntegerField()
+        ), Value(0)),
+        ratings_count=Coalesce(Subquery(
+            ratings.annotate(total=Count('*')).values('total'), output_field=IntegerField()
+        ), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0004_ride_location_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ride',
+            name='ratings_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ride',
+            name='ratings_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(aggregate_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0005_ride_ratings_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['ride', 'rating_user'], name='rating_ride_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ride',
+            index=models.Index(condition=models.Q(('available_seats__gte', 1), ('is_active', True)), fields=['offered_in', 'departure_date', 'arrival_date', 'available_seats'], name='ride_open_departure_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0006_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ride',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['arrival_date'], name='ride_active_arrival_idx'),
+        ),
+    ]
@@ -1,2 +1,3 @@
 from .rides import *
 from .ratings import *
+from .search import *
@@ -41,6 +41,13 @@ class Rating(CRideModel):
 
     rating = models.IntegerField(default=1)
 
+    class Meta(CRideModel.Meta):
+        """Meta class."""
+        indexes = [
+            # Duplicated rating check
+            models.Index(fields=['ride', 'rating_user'], name='rating_ride_user_idx'),
+        ]
+
     def __str__(self):
-        return self.name
+        return '{} rated ride #{} with {}'.format(self.rating_user, self.ride_id, self.rating)
 
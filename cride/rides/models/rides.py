@@ -3,8 +3,15 @@
 # Django
 from django.db import models
 
+# Models
+from cride.rides.models.search import RideLocationToken
+
+# Managers
+from cride.rides.managers import RideManager
+
 # Utilities
 from cride.utils.models import CRideModel
+from cride.utils import geohash, text
 
 
 class Ride(CRideModel):
@@ -23,7 +30,35 @@ class Ride(CRideModel):
     arrival_location = models.CharField(max_length=255)
     arrival_date = models.DateTimeField()
 
+    # Coordinates
+    departure_latitude = models.FloatField(null=True, blank=True)
+    departure_longitude = models.FloatField(null=True, blank=True)
+    departure_geohash = models.CharField(
+        max_length=12,
+        blank=True,
+        db_index=True,
+        help_text='Geohash of the departure point, used for proximity searches.'
+    )
+    arrival_latitude = models.FloatField(null=True, blank=True)
+    arrival_longitude = models.FloatField(null=True, blank=True)
+    arrival_geohash = models.CharField(
+        max_length=12,
+        blank=True,
+        db_index=True,
+        help_text='Geohash of the arrival point, used for proximity searches.'
+    )
+
+    # Search
+    location_search_text = models.CharField(
+        max_length=511,
+        blank=True,
+        editable=False,
+        help_text='Normalized departure and arrival locations, kept in sync with the location tokens.'
+    )
+
     rating = models.FloatField(null=True)
+    ratings_sum = models.PositiveIntegerField(default=0)
+    ratings_count = models.PositiveIntegerField(default=0)
 
     is_active = models.BooleanField(
         'active_status',
@@ -31,6 +66,44 @@ class Ride(CRideModel):
         help_text='Used for disabling the ride or marking it as finished.'
     )
 
+    objects = RideManager()
+
+    class Meta(CRideModel.Meta):
+        """Meta class."""
+        indexes = [
+            # Circle rides listing, open rides only
+            models.Index(
+                fields=['offered_in', 'departure_date', 'arrival_date', 'available_seats'],
+                name='ride_open_departure_idx',
+                condition=models.Q(is_active=True, available_seats__gte=1)
+            ),
+            # Expiry of arrived rides
+            models.Index(
+                fields=['arrival_date'],
+                name='ride_active_arrival_idx',
+                condition=models.Q(is_active=True)
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Keep geohashes and location tokens in sync with the ride data."""
+        for endpoint in ('departure', 'arrival'):
+            latitude = getattr(self, '{}_latitude'.format(endpoint))
+            longitude = getattr(self, '{}_longitude'.format(endpoint))
+            cell = ''
+            if latitude is not None and longitude is not None:
+                cell = geohash.encode(latitude, longitude)
+            setattr(self, '{}_geohash'.format(endpoint), cell)
+
+        search_text = text.normalize('{} {}'.format(self.departure_location, self.arrival_location))
+        reindex = search_text != self.location_search_text
+        self.location_search_text = search_text
+
+        super(Ride, self).save(*args, **kwargs)
+
+        if reindex:
+            RideLocationToken.objects.index_ride(self)
+
     def __str__(self):
         """Return ride details."""
         return '{_from} to {to} | {day} {i_time} - {f_time}'.format(
@@ -0,0 +1,45 @@
+"""Rides location search models."""
+
+# Django
+from django.db import models
+
+# Managers
+from cride.rides.managers import LocationTokenManager
+
+
+__all__ = ['RideLocationToken']
+
+
+class RideLocationToken(models.Model):
+    """Ride location token.
+
+    Inverted index of the normalized, accent-folded words found in the
+    departure and arrival locations of every ride. Looking up rides by
+    token prefix is served by the token index instead of scanning
+    every ride location.
+    """
+
+    TOKEN_LENGTH = 64
+
+    FIELD_CHOICES = (
+        ('departure', 'Departure'),
+        ('arrival', 'Arrival'),
+    )
+
+    ride = models.ForeignKey(
+        'rides.Ride',
+        on_delete=models.CASCADE,
+        related_name='location_tokens'
+    )
+    field = models.CharField(max_length=10, choices=FIELD_CHOICES)
+    token = models.CharField(max_length=TOKEN_LENGTH, db_index=True)
+
+    objects = LocationTokenManager()
+
+    class Meta:
+        """Meta class."""
+        unique_together = ('ride', 'field', 'token')
+
+    def __str__(self):
+        """Return token and ride."""
+        return '{} ({} of ride {})'.format(self.token, self.field, self.ride_id)
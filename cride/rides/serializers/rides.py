@@ -1,6 +1,7 @@
 """ Rides Serializer"""
 # Django
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import F
 
 
 # Django REST Framework
@@ -8,12 +9,15 @@ from rest_framework import serializers
 
 # Models
 from cride.rides.models import Ride, Rating
-from cride.circles.models import Membership, Circle, memberships
-from cride.users.models import User
+from cride.users.models import User, Profile
+
+# Cache
+from cride.circles.cache import get_active_membership
 
 # Utilities
 from datetime import timedelta
 from django.utils import timezone
+from cride.utils.stats import Counters, rounded_average
 
 # Serializers
 from cride.users.serializers import UserModelSerializer
@@ -29,11 +33,13 @@ class RideModelSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Ride
-        fields = '__all__'
+        exclude = ('location_search_text', 'ratings_sum', 'ratings_count')
         read_only_fields = (
             'offered_in',
             'offered_by',
-            'rating'
+            'rating',
+            'departure_geohash',
+            'arrival_geohash'
         )
 
     def update(self, instance, data):
@@ -50,11 +56,25 @@ class CreateRideSerializer(serializers.ModelSerializer):
     offered_by = serializers.HiddenField(default=serializers.CurrentUserDefault())
     available_seats = serializers.IntegerField(min_value=1, max_value=15)
 
+    departure_latitude = serializers.FloatField(required=False, min_value=-90, max_value=90)
+    departure_longitude = serializers.FloatField(required=False, min_value=-180, max_value=180)
+    arrival_latitude = serializers.FloatField(required=False, min_value=-90, max_value=90)
+    arrival_longitude = serializers.FloatField(required=False, min_value=-180, max_value=180)
+
     class Meta:
         """Meta Class"""
 
         model = Ride
-        exclude = ('offered_in', 'passengers', 'rating', 'is_active')
+        exclude = (
+            'offered_in',
+            'passengers',
+            'rating',
+            'is_active',
+            'departure_geohash',
+            'arrival_geohash',
+            'ratings_sum',
+            'ratings_count'
+        )
 
     def validate_departure_date(self, data):
         """Verify date is not in the past."""
@@ -77,14 +97,20 @@ class CreateRideSerializer(serializers.ModelSerializer):
 
         user = data['offered_by']
         circle = self.context['circle']
-        try:
-            membership = Membership.objects.get(user=user, circle=circle, is_active=True)
-        except Membership.DoesNotExist:
+        membership = get_active_membership(self.context['request'], circle, user)
+        if membership is None:
             raise serializers.ValidationError('User is not an active member of the circle')
 
         if data['arrival_date'] <= data['departure_date']:
             raise serializers.ValidationError('Departure date must happen before arrival date')
 
+        for endpoint in ('departure', 'arrival'):
+            coordinates = (data.get(endpoint + '_latitude'), data.get(endpoint + '_longitude'))
+            if (coordinates[0] is None) != (coordinates[1] is None):
+                raise serializers.ValidationError(
+                    'Both latitude and longitude are required for the {} point'.format(endpoint)
+                )
+
         self.context['membership'] = membership
         return data
 
@@ -94,18 +120,10 @@ class CreateRideSerializer(serializers.ModelSerializer):
         circle = self.context['circle']
         ride = Ride.objects.create(**data, offered_in=circle)
 
-        # Circle
-        circle.rides_offered += 1
-        circle.save()
-
-        # Membership
-        membership = self.context['membership']
-        membership.rides_offered += 1
-        membership.save()
-
-        # Profile
-        profile = data['offered_by'].profile
-        profile.rides_offered += 1
+        with Counters() as counters:
+            counters.add(circle, rides_offered=1)
+            counters.add(self.context['membership'], rides_offered=1)
+            counters.add(Profile, {'user_id': data['offered_by'].pk}, rides_offered=1)
 
         return ride
 
@@ -122,18 +140,18 @@ class JoinRideSerializer(serializers.ModelSerializer):
 
     def validate_passenger(self, data):
         """Verify passanger exists and is a circle member."""
-        try:
-            user = User.objects.get(pk=data)
-        except User.DoesNotExist:
-            raise serializers.ValidationError('Invalid Passenger')
+        request = self.context['request']
+        if data == request.user.pk:
+            user = request.user
+        else:
+            try:
+                user = User.objects.get(pk=data)
+            except User.DoesNotExist:
+                raise serializers.ValidationError('Invalid Passenger')
 
         circle = self.context['circle']
-        if not Membership.objects.filter(user=user, circle=circle, is_active=True).exists():
-            raise serializers.ValidationError('User is not an active member of the circle')
-
-        try:
-            membership = Membership.objects.get(user=user, circle=circle, is_active=True)
-        except Membership.DoesNotExist:
+        membership = get_active_membership(request, circle, user)
+        if membership is None:
             raise serializers.ValidationError('User is not an active member of the circle')
 
         self.context['user'] = user
@@ -142,40 +160,40 @@ class JoinRideSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         """Verify rides allow new passengers"""
-        offset = timezone.now() - timedelta(minutes=10)
+        offset = timezone.now() + timedelta(minutes=10)
         ride = self.context['ride']
-        if ride.departure_date > offset:
-            serializers.ValidationError("You can't join this ride now.")
+        if ride.departure_date <= offset:
+            raise serializers.ValidationError("You can't join this ride now.")
 
         if ride.available_seats < 1:
-            serializers.ValidationError('Ride is already full.')
+            raise serializers.ValidationError('Ride is already full.')
 
-        if Ride.objects.filter(passengers__pk=data['passenger']).exists():
+        if ride.passengers.filter(pk=data['passenger']).exists():
             raise serializers.ValidationError('Passanger is already in this trip.')
 
         return data
 
     def update(self, instance, data):
-        """Add passanger"""
+        """Add passanger
+
+        Seats are checked again while being reserved, validation
+        above can be outdated when many users join at once.
+        """
         ride = self.context['ride']
         user = self.context['user']
 
-        ride.passengers.add(user)
-
-        # Profile
-        profile = user.profile
-        profile.rides_taken += 1
-        profile.save()
-
-        # Membership
-        member = self.context['member']
-        member.rides_taken += 1
-        member.save()
+        try:
+            reserved = Ride.objects.reserve_seat(ride, user)
+        except IntegrityError:
+            raise serializers.ValidationError('Passanger is already in this trip.')
+        if not reserved:
+            raise serializers.ValidationError('Ride is already full.')
+        ride.refresh_from_db()
 
-        # Circle
-        circle = self.context['circle']
-        circle.rides_taken += 1
-        circle.save()
+        with Counters() as counters:
+            counters.add(Profile, {'user_id': user.pk}, rides_taken=1)
+            counters.add(self.context['member'], rides_taken=1)
+            counters.add(self.context['circle'], rides_taken=1)
 
         return ride
 
@@ -201,6 +219,8 @@ class EndRideSerializer(serializers.ModelSerializer):
 class CreateRideRatingSerializer(serializers.ModelSerializer):
     """Create ride rating serializer."""
 
+    rating = serializers.IntegerField(min_value=1, max_value=5)
+
     class Meta:
         """Meta class"""
         model = Rating
@@ -212,7 +232,7 @@ class CreateRideRatingSerializer(serializers.ModelSerializer):
         ride = self.context['ride']
         user = self.context['request'].user
 
-        if not ride.passengers.filter(user_id=user.pk).exists():
+        if not ride.passengers.filter(pk=user.pk).exists():
             raise serializers.ValidationError('User is not a passenger.')
 
         q = Rating.objects.filter(
@@ -225,37 +245,40 @@ class CreateRideRatingSerializer(serializers.ModelSerializer):
         return data
 
     def create(self, data):
-        """ Create Rating. """
+        """ Create Rating.
 
-        offered_by = self.context['ride'].offered_by
+        Ride rating and offerer reputation are running averages,
+        their sum and count are updated in place by the database
+        so the cost doesn't grow with the number of ratings.
+        """
 
-        Rating.objects.create(
-            circle=self.context['circle'],
-            ride=self.context['ride'],
-            ratin_user=self.context['request'].user,
-            rated_user=offered_by,
-            **data
-        )
+        ride = self.context['ride']
+        offered_by = ride.offered_by
+        rating = data['rating']
 
-        ride_avg = round(
-            Rating.objects.filter(
+        with transaction.atomic():
+            Rating.objects.create(
                 circle=self.context['circle'],
-                ride=self.context['ride']
-            ).aggregate(Avg('rating'))['rating__avg'],
-            1
-        )
-
-        self.context['ride'].rating = ride_avg
-        self.context['ride'].save()
+                ride=ride,
+                rating_user=self.context['request'].user,
+                rated_user=offered_by,
+                **data
+            )
 
-        user_avg = round(
-            Rating.objects.filter(
-                rated_user=offered_by
-            ).aggregate(Avg('rating'))['rating__avg'],
-            1
-        )
+            Ride.objects.filter(pk=ride.pk).update(
+                ratings_sum=F('ratings_sum') + rating,
+                ratings_count=F('ratings_count') + 1,
+                rating=rounded_average(F('ratings_sum') + rating, F('ratings_count') + 1),
+                modified=timezone.now()
+            )
 
-        offered_by.profile.reputation = user_avg
-        offered_by.profile.save()
+            if offered_by is not None:
+                Profile.objects.filter(user=offered_by).update(
+                    ratings_sum=F('ratings_sum') + rating,
+                    ratings_count=F('ratings_count') + 1,
+                    reputation=rounded_average(F('ratings_sum') + rating, F('ratings_count') + 1),
+                    modified=timezone.now()
+                )
 
-        return self.context['ride']
+        ride.refresh_from_db()
+        return ride
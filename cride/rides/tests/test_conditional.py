@@ -0,0 +1,153 @@
+"""Conditional requests tests."""
+
+# Django
+from django.utils import timezone
+from django.utils.http import http_date
+
+# Django REST Framework
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+from rest_framework import status
+
+# Model
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride
+from cride.users.models import User, Profile
+
+# Utilities
+from cride.utils.stats import increment
+from datetime import timedelta
+
+
+class ConditionalRequestsAPITestCase(APITestCase):
+    """ETag and Last-Modified support of rides and circles."""
+
+    def setUp(self):
+        """Create circle, members and a ride."""
+        self.circle = Circle.objects.create(
+            name='Facultad de Ciencias',
+            slug_name='ciencias',
+            about='Grupo de la facultadad de ciencias de la UNAM',
+        )
+        self.user, self.passenger = [
+            self.create_member(username) for username in ('pablotrinidad', 'passenger')
+        ]
+        departure = timezone.now() + timedelta(hours=1)
+        self.ride = Ride.objects.create(
+            offered_by=self.user,
+            offered_in=self.circle,
+            available_seats=3,
+            departure_location='CU',
+            departure_date=departure,
+            arrival_location='Zocalo',
+            arrival_date=departure + timedelta(hours=1),
+        )
+        token = Token.objects.create(user=self.user).key
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+        self.url = '/circles/{}/rides/'.format(self.circle.slug_name)
+
+    def create_member(self, username):
+        """Create a user member of the circle."""
+        user = User.objects.create_user(
+            first_name=username,
+            last_name='Member',
+            email='{}@ciencias.unam.mx'.format(username),
+            username=username,
+            password='admin123'
+        )
+        profile = Profile.objects.create(user=user)
+        Membership.objects.create(user=user, profile=profile, circle=self.circle)
+        return user
+
+    def get_etag(self, url, params=None):
+        """Return the ETag of a successful request."""
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('no-cache', response['Cache-Control'])
+        return response['ETag']
+
+    def test_list_not_modified(self):
+        """Unchanged lists answer 304 without a body."""
+        etag = self.get_etag(self.url)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        self.assertIn('Last-Modified', response)
+
+    def test_list_changes(self):
+        """Joins and passengers' profile changes change the list ETag."""
+        etag = self.get_etag(self.url)
+        Ride.objects.reserve_seat(self.ride, self.passenger)
+        joined = self.get_etag(self.url)
+        self.assertNotEqual(joined, etag)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results'][0]['passengers']), 1)
+
+        Profile.objects.filter(user=self.passenger).update(reputation=4.2, modified=timezone.now())
+        self.assertNotEqual(self.get_etag(self.url), joined)
+
+    def test_list_rows_leaving(self):
+        """Rows leaving the list change its ETag."""
+        etag = self.get_etag(self.url)
+        Ride.objects.filter(pk=self.ride.pk).update(is_active=False)
+        self.assertNotEqual(self.get_etag(self.url), etag)
+
+    def test_etag_varies_on_query(self):
+        """Different pages of the same rows get different ETags."""
+        self.assertNotEqual(self.get_etag(self.url), self.get_etag(self.url, {'limit': 1}))
+
+    def test_list_single_query(self):
+        """Unchanged lists are answered from one aggregate query."""
+        etag = self.get_etag(self.url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_not_modified(self):
+        """Unchanged details answer 304 without a body."""
+        url = '{}{}/'.format(self.url, self.ride.pk)
+        etag = self.get_etag(url)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        self.assertIn('Last-Modified', response)
+
+    def test_detail_changes(self):
+        """Joins change the ride ETag."""
+        url = '{}{}/'.format(self.url, self.ride.pk)
+        etag = self.get_etag(url)
+        Ride.objects.reserve_seat(self.ride, self.passenger)
+        self.assertNotEqual(self.get_etag(url), etag)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['passengers']), 1)
+
+    def test_detail_nested_changes(self):
+        """Changes to the offerer's profile change the ride ETag."""
+        url = '{}{}/'.format(self.url, self.ride.pk)
+        etag = self.get_etag(url)
+        Profile.objects.filter(user=self.user).update(reputation=4.2, modified=timezone.now())
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['offered_by']['profile']['reputation'], 4.2)
+
+    def test_detail_if_modified_since(self):
+        """Details honor If-Modified-Since until the row is updated."""
+        modified = timezone.now() - timedelta(minutes=1)
+        Circle.objects.filter(pk=self.circle.pk).update(modified=modified)
+        url = '/circles/{}/'.format(self.circle.slug_name)
+        self.get_etag(url)
+        since = http_date(modified.timestamp() + 1)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        increment(self.circle, rides_offered=1)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rides_offered'], 1)
@@ -0,0 +1,75 @@
+"""Rides expiry tests."""
+
+# Django
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+# Model
+from cride.circles.models import Circle
+from cride.rides.models import Ride
+from cride.users.models import User
+
+# Utilities
+from cride.rides.expiry import expire_rides, get_high_water
+from datetime import timedelta
+
+
+@override_settings(RIDES_EXPIRY_LOOKBACK=60)
+class RidesExpiryTestCase(TestCase):
+    """Rides expiry engine tests."""
+
+    def setUp(self):
+        """Create rides arriving around now."""
+        cache.clear()
+        self.user = User.objects.create_user(
+            first_name='Pablo',
+            last_name='Trinidad',
+            email='pablotrinidad@ciencias.unam.mx',
+            username='pablotrinidad',
+            password='admin123'
+        )
+        self.circle = Circle.objects.create(
+            name='Facultad de Ciencias',
+            slug_name='ciencias',
+            about='Grupo de la facultadad de ciencias de la UNAM',
+        )
+        self.now = timezone.now()
+        self.arrived = [self.create_ride(minutes) for minutes in (-300, -30, -20, -10, -1)]
+        self.upcoming = self.create_ride(30)
+
+    def create_ride(self, minutes):
+        """Create a ride arriving the given minutes from now."""
+        arrival_date = self.now + timedelta(minutes=minutes)
+        return Ride.objects.create(
+            offered_by=self.user,
+            offered_in=self.circle,
+            departure_location='CU',
+            departure_date=arrival_date - timedelta(hours=1),
+            arrival_location='Zocalo',
+            arrival_date=arrival_date,
+        )
+
+    def test_expire_in_batches(self):
+        """Every arrived ride is disabled, in bounded batches."""
+        expiry = expire_rides(now=self.now, batch_size=2)
+        self.assertEqual((expiry.expired, expiry.batches), (5, 3))
+        self.assertEqual(Ride.objects.filter(is_active=True).get(), self.upcoming)
+        self.assertEqual(get_high_water(), self.now)
+
+    def test_high_water_mark(self):
+        """Following runs only look at rides arrived since the last one."""
+        expire_rides(now=self.now)
+        late = self.create_ride(-0.5)
+        old = self.create_ride(-120)
+
+        later = self.now + timedelta(minutes=31)
+        expiry = expire_rides(now=later)
+        self.assertEqual(expiry.window_start, self.now - timedelta(seconds=60))
+        self.assertEqual(expiry.expired, 2)
+        self.assertFalse(Ride.objects.filter(pk__in=[late.pk, self.upcoming.pk], is_active=True).exists())
+        # Arrived before the window, left for a run without mark
+        self.assertTrue(Ride.objects.get(pk=old.pk).is_active)
+
+        cache.clear()
+        self.assertEqual(expire_rides(now=later).expired, 1)
@@ -0,0 +1,127 @@
+"""Rides exports tests."""
+
+# Django
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+# Model
+from cride.circles.models import Circle
+from cride.rides.models import Ride
+from cride.users.models import User
+
+# Utilities
+from cride.rides import exports
+from datetime import timedelta
+from io import StringIO
+import csv
+import json
+
+
+class RidesExportTestCase(TestCase):
+    """Streaming rides export tests."""
+
+    def setUp(self):
+        """Create today's and tomorrow's rides."""
+        self.admin = User.objects.create_superuser(
+            first_name='Pablo',
+            last_name='Trinidad',
+            email='pablotrinidad@ciencias.unam.mx',
+            username='pablotrinidad',
+            password='admin123'
+        )
+        self.circle = Circle.objects.create(
+            name='Facultad de Ciencias',
+            slug_name='ciencias',
+            about='Grupo de la facultadad de ciencias de la UNAM',
+        )
+        start, end = exports.today()
+        for i in range(5):
+            self.create_ride(start + timedelta(hours=1 + i), passengers=i % 2)
+        self.create_ride(end + timedelta(hours=1))
+
+    def create_ride(self, departure_date, passengers=0):
+        """Create a ride with the given number of passengers."""
+        ride = Ride.objects.create(
+            offered_by=self.admin,
+            offered_in=self.circle,
+            departure_location='CU',
+            departure_date=departure_date,
+            arrival_location='Zocalo',
+            arrival_date=departure_date + timedelta(hours=1),
+        )
+        if passengers:
+            ride.passengers.add(self.admin)
+        return ride
+
+    def test_single_query(self):
+        """Passengers are counted by the query listing the rides."""
+        start, end = exports.today()
+        with self.assertNumQueries(1):
+            lines = list(exports.export_rides(exports.get_rides(start=start, end=end), 'csv', chunk_size=2))
+        rows = list(csv.DictReader(lines))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual([row['passengers'] for row in rows], ['0', '1', '0', '1', '0'])
+        self.assertEqual(rows[0]['circle'], 'ciencias')
+
+    def test_command_jsonl(self):
+        """The command exports a date range as JSON lines."""
+        stdout = StringIO()
+        tomorrow = (timezone.localdate() + timedelta(days=1)).isoformat()
+        call_command('export_rides', start=tomorrow, format='jsonl', stdout=stdout)
+        rows = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['passengers'], 0)
+
+    def test_admin_action(self):
+        """The admin action streams today's rides."""
+        self.client.force_login(self.admin)
+        response = self.client.post('/admin/circles/circle/', {
+            'action': 'download_todays_rides',
+            '_selected_action': [self.circle.pk],
+        })
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(len(content.splitlines()), 6)
+
+    def test_admin_range_view(self):
+        """The admin export view filters by date range and circle."""
+        self.client.force_login(self.admin)
+        start, end = exports.today()
+        response = self.client.get('/admin/circles/circle/export-rides/', {
+            'start': start.date().isoformat(),
+            'end': (end + timedelta(days=1)).date().isoformat(),
+            'format': 'jsonl',
+            'circle': self.circle.pk,
+        })
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 6)
+
+        response = self.client.get('/admin/circles/circle/export-rides/', {'start': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get('/admin/circles/circle/export-rides/')
+        self.assertEqual(response.status_code, 400)
+
+    def test_admin_range_view_permissions(self):
+        """Staff members need to be allowed to view circles and rides."""
+        staff = User.objects.create_user(
+            first_name='Carlos',
+            last_name='Vander',
+            email='cvander@ciencias.unam.mx',
+            username='cvander',
+            password='admin123',
+            is_staff=True
+        )
+        self.client.force_login(staff)
+        params = {'circle': self.circle.pk}
+
+        staff.user_permissions.add(Permission.objects.get(codename='view_circle'))
+        response = self.client.get('/admin/circles/circle/export-rides/', params)
+        self.assertEqual(response.status_code, 403)
+
+        staff.user_permissions.add(Permission.objects.get(codename='view_ride'))
+        response = self.client.get('/admin/circles/circle/export-rides/', params)
+        self.assertEqual(response.status_code, 200)
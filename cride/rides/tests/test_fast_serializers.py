@@ -0,0 +1,130 @@
+"""Fast serializers tests."""
+
+# Django
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+# Model
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride
+from cride.users.models import User, Profile
+
+# Serializers
+from cride.circles.serializers import CircleModelSerializer, MembershipModelSerializer
+from cride.rides.serializers import RideModelSerializer
+
+# Utilities
+from cride.utils.fast_serializers import CompiledSerializer, compile_serializer
+from cride.utils.renderers import FastJSONRenderer
+from datetime import timedelta
+
+
+class FastSerializersTestCase(TestCase):
+    """Compiled serializers output what their serializers do."""
+
+    def setUp(self):
+        """Create circle, members and rides."""
+        self.circle = Circle.objects.create(
+            name='Facultad de Ciencias',
+            slug_name='ciencias',
+            about='Grupo de la facultadad de ciencias de la UNAM',
+            picture='circles/pictures/ciencias.png'
+        )
+        self.driver = self.create_user('driver')
+        Profile.objects.create(user=self.driver, picture='users/pictures/driver.png', reputation=4.5)
+        self.passenger = self.create_user('passenger')
+        Profile.objects.create(user=self.passenger)
+        # Users without profile are serialized with a null profile
+        self.guest = self.create_user('guest')
+
+        Membership.objects.create(user=self.driver, profile=self.driver.profile, circle=self.circle, is_admin=True)
+        Membership.objects.create(
+            user=self.passenger,
+            profile=self.passenger.profile,
+            circle=self.circle,
+            invited_by=self.driver
+        )
+
+        departure = timezone.now() + timedelta(hours=1)
+        for seats in (3, 2, 1):
+            ride = Ride.objects.create(
+                offered_by=self.driver,
+                offered_in=self.circle,
+                available_seats=seats,
+                departure_location='Ciudad Universitaria  ',
+                departure_date=departure,
+                arrival_location='Zócalo',
+                arrival_date=departure + timedelta(hours=1),
+                departure_latitude=19.3,
+                departure_longitude=-99.1,
+            )
+        ride.passengers.add(self.passenger, self.guest)
+        Ride.objects.create(
+            offered_by=None,
+            offered_in=None,
+            departure_location='CU',
+            departure_date=departure,
+            arrival_location='Zocalo',
+            arrival_date=departure + timedelta(hours=1),
+        )
+        self.context = {'request': APIRequestFactory().get('/')}
+
+    def create_user(self, username):
+        return User.objects.create_user(
+            first_name=username,
+            last_name='Ciencias',
+            email='{}@ciencias.unam.mx'.format(username),
+            username=username,
+            password='admin123'
+        )
+
+    def assertSameOutput(self, serializer_class, queryset, string_fields=()):
+        """The compiled serializer outputs the serializer's data."""
+        compiled = compile_serializer(serializer_class, string_fields)
+        expected = serializer_class(queryset, many=True, context=self.context).data
+        data = compiled.serialize(compiled.values(queryset), self.context)
+        self.assertEqual(data, expected)
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(expected))
+
+    def test_rides(self):
+        self.assertSameOutput(
+            RideModelSerializer,
+            Ride.objects.order_by('pk'),
+            (('circles.Circle', 'name'),)
+        )
+
+    def test_memberships(self):
+        self.assertSameOutput(
+            MembershipModelSerializer,
+            Membership.objects.order_by('pk'),
+            (('users.User', 'username'),)
+        )
+
+    def test_circles(self):
+        self.assertSameOutput(CircleModelSerializer, Circle.objects.all())
+
+    def test_unsupported_fields(self):
+        """Fields the compiler can't read from rows are refused."""
+
+        class RideSerializer(serializers.ModelSerializer):
+            summary = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Ride
+                fields = ('summary',)
+
+        with self.assertRaises(ImproperlyConfigured):
+            CompiledSerializer(RideSerializer)
+        with self.assertRaises(ImproperlyConfigured):
+            CompiledSerializer(RideModelSerializer)
+
+    def test_renderer(self):
+        """Values orjson doesn't handle are rendered like JSONRenderer does."""
+        data = {'when': timezone.now(), 'text': 'line\u2028separator', 1: [1.5, None, True]}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
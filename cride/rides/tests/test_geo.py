@@ -0,0 +1,122 @@
+"""Rides proximity search tests."""
+
+# Django
+from django.test import TestCase
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+from rest_framework import status
+
+# Model
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride
+from cride.users.models import User, Profile
+
+# Utilities
+from cride.utils import geohash
+from datetime import timedelta
+
+
+# Reference points in Mexico City
+CU = (19.3320, -99.1870)
+COYOACAN = (19.3500, -99.1620)
+SANTA_FE = (19.3590, -99.2590)
+ZOCALO = (19.4326, -99.1332)
+
+
+class GeohashTestCase(TestCase):
+    """Geohash utilities tests."""
+
+    def test_encode(self):
+        """Encoding should match the reference implementation."""
+        self.assertEqual(geohash.encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+
+    def test_covering_cells_contain_nearby_points(self):
+        """Every point inside the radius must fall in one of the cells."""
+        cells = geohash.covering_cells(*CU, 5)
+        point = geohash.encode(*COYOACAN)
+        self.assertLess(geohash.distance(*CU, *COYOACAN), 5)
+        self.assertTrue(any(point.startswith(cell) for cell in cells))
+
+    def test_distance(self):
+        """Distance should be computed in km."""
+        self.assertAlmostEqual(geohash.distance(*CU, *ZOCALO), 12.3, delta=0.5)
+
+
+class RideProximityAPITestCase(APITestCase):
+    """Rides near me / rides toward point API tests."""
+
+    def setUp(self):
+        """Create circle, member and rides."""
+        self.user = User.objects.create_user(
+            first_name='Pablo',
+            last_name='Trinidad',
+            email='pablotrinidad@ciencias.unam.mx',
+            username='pablotrinidad',
+            password='admin123'
+        )
+        self.profile = Profile.objects.create(user=self.user)
+        self.circle = Circle.objects.create(
+            name='Facultad de Ciencias',
+            slug_name='ciencias',
+            about='Grupo de la facultadad de ciencias de la UNAM',
+        )
+        Membership.objects.create(user=self.user, profile=self.profile, circle=self.circle)
+
+        now = timezone.now()
+        self.cu_to_zocalo = self.create_ride(CU, ZOCALO, now + timedelta(hours=1))
+        self.coyoacan_to_zocalo = self.create_ride(COYOACAN, ZOCALO, now + timedelta(hours=3))
+        self.santa_fe_to_cu = self.create_ride(SANTA_FE, CU, now + timedelta(hours=2))
+
+        token = Token.objects.create(user=self.user).key
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+        self.url = '/circles/{}/rides/'.format(self.circle.slug_name)
+
+    def create_ride(self, departure, arrival, departure_date):
+        """Create a ride between two points."""
+        return Ride.objects.create(
+            offered_by=self.user,
+            offered_in=self.circle,
+            departure_location='{},{}'.format(*departure),
+            departure_latitude=departure[0],
+            departure_longitude=departure[1],
+            departure_date=departure_date,
+            arrival_location='{},{}'.format(*arrival),
+            arrival_latitude=arrival[0],
+            arrival_longitude=arrival[1],
+            arrival_date=departure_date + timedelta(hours=1),
+        )
+
+    def get_ids(self, **params):
+        """Return the ids of the rides listed with the given params."""
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [ride['id'] for ride in response.data['results']]
+
+    def test_geohash_is_stored(self):
+        """Rides with coordinates get their geohash computed on save."""
+        self.assertEqual(self.cu_to_zocalo.departure_geohash, geohash.encode(*CU))
+        self.assertEqual(self.cu_to_zocalo.arrival_geohash, geohash.encode(*ZOCALO))
+
+    def test_rides_near(self):
+        """Only rides departing inside the radius are listed, closest first."""
+        ids = self.get_ids(near='{},{}'.format(*CU), radius=5)
+        self.assertEqual(ids, [self.cu_to_zocalo.pk, self.coyoacan_to_zocalo.pk])
+
+    def test_rides_toward(self):
+        """Only rides arriving inside the radius are listed."""
+        ids = self.get_ids(toward='{},{}'.format(*CU), radius=1)
+        self.assertEqual(ids, [self.santa_fe_to_cu.pk])
+
+    def test_time_window(self):
+        """Rides outside the departure window are excluded."""
+        after = timezone.now() + timedelta(minutes=90)
+        ids = self.get_ids(near='{},{}'.format(*CU), radius=5, departure_after=after.isoformat())
+        self.assertEqual(ids, [self.coyoacan_to_zocalo.pk])
+
+    def test_invalid_point(self):
+        """Malformed coordinates are rejected."""
+        response = self.client.get(self.url, {'near': 'somewhere'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,100 @@
+"""Query plans tests."""
+
+# Django
+from django.core.cache import cache
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+
+# Model
+from cride.circles.models import Circle, Invitation, Membership
+from cride.rides.models import Rating, Ride
+from cride.users.models import User, Profile
+
+# Utilities
+from cride.utils.testing import QueryPlanMixin
+from datetime import timedelta
+
+
+class IndexedQueriesAPITestCase(QueryPlanMixin, APITestCase):
+    """Main endpoints must be served by indexes."""
+
+    def setUp(self):
+        """Seed circles, members, rides, ratings and invitations."""
+        cache.clear()
+        now = timezone.now()
+        self.users = []
+        for i in range(6):
+            user = User.objects.create_user(
+                first_name='User',
+                last_name=str(i),
+                email='user{}@ciencias.unam.mx'.format(i),
+                username='user{}'.format(i),
+                password='admin123'
+            )
+            Profile.objects.create(user=user)
+            self.users.append(user)
+        self.user = self.users[0]
+
+        for slug_name in ('ciencias', 'ingenieria', 'medicina'):
+            circle = Circle.objects.create(
+                name=slug_name.title(),
+                slug_name=slug_name,
+                about='Seeded circle',
+            )
+            for user in self.users:
+                Membership.objects.create(
+                    user=user,
+                    profile=user.profile,
+                    circle=circle,
+                    remaining_invitations=2,
+                    is_active=user.pk % 5 != 0
+                )
+                Invitation.objects.create(circle=circle, issued_by=user)
+            for r in range(20):
+                ride = Ride.objects.create(
+                    offered_by=self.users[r % 6],
+                    offered_in=circle,
+                    available_seats=r % 4,
+                    departure_location='CU',
+                    departure_date=now + timedelta(hours=r - 5),
+                    arrival_location='Zocalo',
+                    arrival_date=now + timedelta(hours=r - 4),
+                    is_active=r % 7 != 0
+                )
+                ride.passengers.add(self.users[(r + 1) % 6])
+                Rating.objects.create(
+                    ride=ride,
+                    circle=circle,
+                    rating_user=self.users[(r + 1) % 6],
+                    rated_user=ride.offered_by,
+                    rating=1 + r % 5
+                )
+        self.circle = Circle.objects.get(slug_name='ingenieria')
+
+        token = Token.objects.create(user=self.user).key
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+
+    def test_rides_list(self):
+        """Listing rides uses the open rides index."""
+        self.assertIndexedQueries(
+            '/circles/{}/rides/'.format(self.circle.slug_name),
+            indexes=['ride_open_departure_idx', 'membership_user_circle_idx']
+        )
+
+    def test_circles_list(self):
+        """Listing circles uses the public circles index."""
+        self.assertIndexedQueries('/circles/', indexes=['circle_public_popular_idx'])
+
+    def test_members_list(self):
+        """Listing members uses the memberships indexes."""
+        self.assertIndexedQueries('/circles/{}/members/'.format(self.circle.slug_name))
+
+    def test_member_invitations(self):
+        """The invitations breakdown uses the invitations index."""
+        self.assertIndexedQueries('/circles/{}/members/{}/invitations/'.format(
+            self.circle.slug_name,
+            self.user.username
+        ), indexes=['invitation_issuer_idx'])
@@ -0,0 +1,131 @@
+"""Ride matching tests."""
+
+# Django
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+from rest_framework import status
+
+# Model
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride
+from cride.users.models import User, Profile
+
+# Utilities
+from cride.rides.matching import Match, match_rides
+from datetime import timedelta
+from unittest import mock
+
+
+class RideMatchingAPITestCase(APITestCase):
+    """Rides are matched across the user's circles."""
+
+    def setUp(self):
+        """Create circles, members and rides."""
+        self.now = timezone.now()
+        self.user = self.create_user('pablotrinidad')
+        self.driver = self.create_user('driver', reputation=5)
+        self.rookie = self.create_user('rookie', reputation=1)
+
+        self.ciencias = self.create_circle('ciencias', self.user, self.driver, self.rookie)
+        self.ingenieria = self.create_circle('ingenieria', self.user, self.driver)
+        self.left = self.create_circle('left', self.driver)
+        Membership.objects.create(user=self.user, profile=self.user.profile, circle=self.left, is_active=False)
+
+        token = Token.objects.create(user=self.user).key
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+
+    def create_user(self, username, reputation=5):
+        user = User.objects.create_user(
+            first_name=username,
+            last_name='Ciencias',
+            email='{}@ciencias.unam.mx'.format(username),
+            username=username,
+            password='admin123'
+        )
+        Profile.objects.create(user=user, reputation=reputation)
+        return user
+
+    def create_circle(self, slug_name, *members):
+        circle = Circle.objects.create(name=slug_name.title(), slug_name=slug_name, about=slug_name)
+        for user in members:
+            Membership.objects.create(user=user, profile=user.profile, circle=circle)
+        return circle
+
+    def create_ride(self, circle, offered_by, minutes, latitude=19.33, longitude=-99.18):
+        departure = self.now + timedelta(minutes=minutes)
+        return Ride.objects.create(
+            offered_by=offered_by,
+            offered_in=circle,
+            available_seats=2,
+            departure_location='CU',
+            departure_date=departure,
+            arrival_location='Zocalo',
+            arrival_date=departure + timedelta(hours=1),
+            departure_latitude=latitude,
+            departure_longitude=longitude,
+            arrival_latitude=19.43,
+            arrival_longitude=-99.13,
+        )
+
+    def test_ranking_across_circles(self):
+        """Rides of every active circle are ranked by departure proximity."""
+        later = self.create_ride(self.ciencias, self.driver, 120)
+        sooner = self.create_ride(self.ingenieria, self.driver, 30)
+        self.create_ride(self.left, self.driver, 30)
+        self.create_ride(self.ciencias, self.user, 30)
+        joined = self.create_ride(self.ciencias, self.driver, 30)
+        joined.passengers.add(self.user)
+
+        response = self.client.get('/rides/matches/', {'departure': (self.now + timedelta(minutes=30)).isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([ride['id'] for ride in results], [sooner.pk, later.pk])
+        self.assertEqual([ride['circle'] for ride in results], ['ingenieria', 'ciencias'])
+        self.assertGreater(results[0]['score'], results[1]['score'])
+
+    def test_reputation_and_location(self):
+        """Closer rides and better reputations rank higher."""
+        rookie = self.create_ride(self.ciencias, self.rookie, 60)
+        driver = self.create_ride(self.ciencias, self.driver, 60)
+        far = self.create_ride(self.ciencias, self.driver, 60, latitude=19.34, longitude=-99.19)
+        departure = self.now + timedelta(minutes=60)
+
+        matches = match_rides(self.user, departure, near=(19.33, -99.18), radius=5)
+        self.assertEqual([match.ride for match in matches], [driver.pk, far.pk, rookie.pk])
+
+        matches = match_rides(self.user, departure, limit=1)
+        self.assertEqual([match.ride for match in matches], [driver.pk])
+
+    def test_unknown_reputation(self):
+        """Offerers without a profile rank below rated ones."""
+        unknown = User.objects.create_user(
+            first_name='unknown',
+            last_name='Ciencias',
+            email='unknown@ciencias.unam.mx',
+            username='unknown',
+            password='admin123'
+        )
+        rookie = self.create_ride(self.ciencias, self.rookie, 60)
+        anonymous = self.create_ride(self.ciencias, unknown, 60)
+
+        matches = match_rides(self.user, self.now + timedelta(minutes=60))
+        self.assertEqual([match.ride for match in matches], [rookie.pk, anonymous.pk])
+
+    def test_deleted_ride(self):
+        """Rides deleted after being matched are left out."""
+        ride = self.create_ride(self.ciencias, self.driver, 30)
+        matches = [Match(ride.pk + 1, 0.9), Match(ride.pk, 0.8)]
+        with mock.patch('cride.rides.views.matches.match_rides', return_value=matches):
+            response = self.client.get('/rides/matches/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([ride['id'] for ride in response.data['results']], [ride.pk])
+
+    def test_invalid_params(self):
+        """Invalid parameters are rejected."""
+        response = self.client.get('/rides/matches/', {'limit': 500})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/rides/matches/', {'near': 'here'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,111 @@
+"""Rides keyset pagination tests."""
+
+# Django
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+from rest_framework import status
+
+# Model
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride
+from cride.users.models import User, Profile
+
+# Utilities
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+import json
+
+
+class RideKeysetPaginationAPITestCase(APITestCase):
+    """Rides cursor pagination API tests."""
+
+    def setUp(self):
+        """Create circle, member and rides sharing departure dates."""
+        self.user = User.objects.create_user(
+            first_name='Pablo',
+            last_name='Trinidad',
+            email='pablotrinidad@ciencias.unam.mx',
+            username='pablotrinidad',
+            password='admin123'
+        )
+        self.profile = Profile.objects.create(user=self.user)
+        self.circle = Circle.objects.create(
+            name='Facultad de Ciencias',
+            slug_name='ciencias',
+            about='Grupo de la facultadad de ciencias de la UNAM',
+        )
+        Membership.objects.create(user=self.user, profile=self.profile, circle=self.circle)
+
+        now = timezone.now()
+        for i in range(12):
+            departure = now + timedelta(hours=1 + i % 3, microseconds=123456)
+            Ride.objects.create(
+                offered_by=self.user,
+                offered_in=self.circle,
+                available_seats=3,
+                departure_location='CU',
+                departure_date=departure,
+                arrival_location='Zocalo',
+                arrival_date=departure + timedelta(hours=1),
+            )
+        self.expected = list(Ride.objects.order_by(
+            'departure_date', 'arrival_date', 'available_seats', 'pk'
+        ).values_list('pk', flat=True))
+
+        token = Token.objects.create(user=self.user).key
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+        self.url = '/circles/{}/rides/'.format(self.circle.slug_name)
+
+    def get(self, url, params=None):
+        """Return the data of a successful request."""
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_walk_forward_and_back(self):
+        """Following next and previous links serves every ride once in order."""
+        data = self.get(self.url, {'limit': 5})
+        self.assertNotIn('count', data)
+        self.assertIsNone(data['previous'])
+
+        pages = [[ride['id'] for ride in data['results']]]
+        while data['next']:
+            data = self.get(data['next'])
+            pages.append([ride['id'] for ride in data['results']])
+        self.assertEqual(sum(pages, []), self.expected)
+        self.assertEqual([len(page) for page in pages], [5, 5, 2])
+
+        data = self.get(data['previous'])
+        self.assertEqual([ride['id'] for ride in data['results']], pages[1])
+        data = self.get(data['previous'])
+        self.assertEqual([ride['id'] for ride in data['results']], pages[0])
+        self.assertIsNone(data['previous'])
+
+    def test_ordering_param(self):
+        """Cursors follow the ordering requested by the client."""
+        data = self.get(self.url, {'limit': 7, 'ordering': '-departure_date'})
+        ids = [ride['id'] for ride in data['results']]
+        ids += [ride['id'] for ride in self.get(data['next'])['results']]
+        expected = list(Ride.objects.order_by('-departure_date', 'pk').values_list('pk', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_offset_fallback(self):
+        """Clients sending an offset keep getting offset pages."""
+        data = self.get(self.url, {'limit': 5, 'offset': 5})
+        self.assertEqual(data['count'], 12)
+        self.assertEqual([ride['id'] for ride in data['results']], self.expected[5:10])
+
+    def test_invalid_cursor(self):
+        """Malformed cursors are rejected."""
+        response = self.client.get(self.url, {'cursor': 'nope'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor(self):
+        """Cursors with values their fields can't hold are rejected."""
+        for position in (['x', 'y', 1, 1], [None, None, None, None], [[], {}, 'z', 1]):
+            cursor = urlsafe_b64encode(json.dumps({'p': position}).encode('ascii')).decode('ascii')
+            response = self.client.get(self.url, {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,66 @@
+"""Rides query budget tests."""
+
+# Django
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+
+# Model
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride
+from cride.users.models import User, Profile
+
+# Utilities
+from cride.utils.testing import QueryBudgetMixin
+from datetime import timedelta
+
+
+class RidesQueryBudgetTestCase(QueryBudgetMixin, APITestCase):
+    """Rides endpoints query budget tests."""
+
+    def setUp(self):
+        """Create a circle with rides full of passengers."""
+        self.circle = Circle.objects.create(
+            name='Facultad de Ciencias',
+            slug_name='ciencias',
+            about='Grupo de la facultadad de ciencias de la UNAM',
+        )
+        users = []
+        for i in range(5):
+            user = User.objects.create_user(
+                first_name='User',
+                last_name=str(i),
+                email='user{}@ciencias.unam.mx'.format(i),
+                username='user{}'.format(i),
+                password='admin123'
+            )
+            profile = Profile.objects.create(user=user)
+            Membership.objects.create(user=user, profile=profile, circle=self.circle)
+            users.append(user)
+        self.user = users[0]
+
+        now = timezone.now()
+        for i in range(12):
+            ride = Ride.objects.create(
+                offered_by=users[i % 5],
+                offered_in=self.circle,
+                available_seats=5,
+                departure_location='Ciudad Universitaria',
+                departure_date=now + timedelta(hours=i + 1),
+                arrival_location='Zocalo',
+                arrival_date=now + timedelta(hours=i + 2),
+            )
+            ride.passengers.add(*users[1:])
+
+        token = Token.objects.create(user=self.user).key
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+
+    def test_list_rides(self):
+        """Listing rides doesn't depend on the page size."""
+        self.assertQueryBudget('/circles/ciencias/rides/', budget=4)
+
+    def test_search_rides(self):
+        """Searching rides doesn't depend on the page size."""
+        self.assertQueryBudget('/circles/ciencias/rides/', budget=4, search='zocalo')
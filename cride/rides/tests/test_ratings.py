@@ -0,0 +1,120 @@
+"""Ride ratings tests."""
+
+# Django
+from django.core.management import call_command
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+from rest_framework import status
+
+# Model
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride, Rating
+from cride.users.models import User, Profile
+
+# Utilities
+from datetime import timedelta
+from io import StringIO
+
+
+class RideRatingAPITestCase(APITestCase):
+    """Ride rating API tests."""
+
+    def setUp(self):
+        """Create a finished ride with passengers."""
+        self.circle = Circle.objects.create(
+            name='Facultad de Ciencias',
+            slug_name='ciencias',
+            about='Grupo de la facultadad de ciencias de la UNAM',
+        )
+        self.driver, self.first, self.second, self.third = [
+            self.create_member(username) for username in ('driver', 'first', 'second', 'third')
+        ]
+        self.ride = self.create_ride()
+        self.ride.passengers.add(self.first, self.second, self.third)
+
+    def create_member(self, username):
+        """Create a user member of the circle."""
+        user = User.objects.create_user(
+            first_name=username,
+            last_name='Test',
+            email='{}@ciencias.unam.mx'.format(username),
+            username=username,
+            password='admin123'
+        )
+        profile = Profile.objects.create(user=user)
+        Membership.objects.create(user=user, profile=profile, circle=self.circle)
+        return user
+
+    def create_ride(self):
+        """Create a ride offered by the driver that already happened."""
+        departure = timezone.now() - timedelta(hours=2)
+        return Ride.objects.create(
+            offered_by=self.driver,
+            offered_in=self.circle,
+            departure_location='Ciudad Universitaria',
+            departure_date=departure,
+            arrival_location='Zocalo',
+            arrival_date=departure + timedelta(hours=1),
+            is_active=False
+        )
+
+    def rate(self, user, rating, ride=None):
+        """Rate the ride as the given user."""
+        ride = ride or self.ride
+        token, _ = Token.objects.get_or_create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        return self.client.post(
+            '/circles/ciencias/rides/{}/rate/'.format(ride.pk),
+            {'rating': rating, 'comments': 'Nice ride'}
+        )
+
+    def test_rate(self):
+        """Ratings update the ride rating and the driver reputation."""
+        response = self.rate(self.first, 4)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data['rating'], 4)
+
+        self.rate(self.second, 5)
+        self.rate(self.third, 5)
+
+        self.ride.refresh_from_db()
+        self.assertEqual((self.ride.ratings_sum, self.ride.ratings_count, self.ride.rating), (14, 3, 4.7))
+        profile = Profile.objects.get(user=self.driver)
+        self.assertEqual((profile.ratings_sum, profile.ratings_count, profile.reputation), (14, 3, 4.7))
+
+    def test_reputation_spans_rides(self):
+        """Reputation averages the ratings of every ride offered."""
+        other_ride = self.create_ride()
+        other_ride.passengers.add(self.first)
+        self.rate(self.first, 5)
+        self.rate(self.first, 2, ride=other_ride)
+        self.assertEqual(Profile.objects.get(user=self.driver).reputation, 3.5)
+
+    def test_rate_twice(self):
+        """Passengers rate a ride only once."""
+        self.rate(self.first, 4)
+        response = self.rate(self.first, 1)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.ride.refresh_from_db()
+        self.assertEqual(self.ride.ratings_count, 1)
+
+    def test_backfill(self):
+        """Aggregates are recomputed from the ratings table."""
+        for user, rating in ((self.first, 3), (self.second, 4)):
+            Rating.objects.create(
+                ride=self.ride,
+                circle=self.circle,
+                rating_user=user,
+                rated_user=self.driver,
+                rating=rating
+            )
+        call_command('backfill_ratings', stdout=StringIO())
+
+        self.ride.refresh_from_db()
+        self.assertEqual((self.ride.ratings_sum, self.ride.ratings_count, self.ride.rating), (7, 2, 3.5))
+        profile = Profile.objects.get(user=self.driver)
+        self.assertEqual((profile.ratings_sum, profile.ratings_count, profile.reputation), (7, 2, 3.5))
+        self.assertEqual(Profile.objects.get(user=self.first).reputation, 5.0)
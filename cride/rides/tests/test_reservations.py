@@ -0,0 +1,122 @@
+"""Ride seat reservation tests."""
+
+# Django
+from django.db import IntegrityError
+from django.test import TestCase
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+from rest_framework import status
+
+# Model
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride
+from cride.users.models import User, Profile
+
+# Utilities
+from datetime import timedelta
+
+
+class SeatReservationMixin:
+    """Create a circle with a two seats ride and some members."""
+
+    def setUp(self):
+        self.circle = Circle.objects.create(
+            name='Facultad de Ciencias',
+            slug_name='ciencias',
+            about='Grupo de la facultadad de ciencias de la UNAM',
+        )
+        self.driver, self.first, self.second, self.third = [
+            self.create_member(username) for username in ('driver', 'first', 'second', 'third')
+        ]
+        departure = timezone.now() + timedelta(hours=1)
+        self.ride = Ride.objects.create(
+            offered_by=self.driver,
+            offered_in=self.circle,
+            available_seats=2,
+            departure_location='Ciudad Universitaria',
+            departure_date=departure,
+            arrival_location='Zocalo',
+            arrival_date=departure + timedelta(hours=1),
+        )
+
+    def create_member(self, username):
+        """Create a user member of the circle."""
+        user = User.objects.create_user(
+            first_name=username,
+            last_name='Test',
+            email='{}@ciencias.unam.mx'.format(username),
+            username=username,
+            password='admin123'
+        )
+        profile = Profile.objects.create(user=user)
+        Membership.objects.create(user=user, profile=profile, circle=self.circle)
+        return user
+
+
+class SeatReservationTestCase(SeatReservationMixin, TestCase):
+    """Ride manager seat reservation tests."""
+
+    def test_reserve_until_full(self):
+        """Seats can't be reserved once the ride is full."""
+        self.assertTrue(Ride.objects.reserve_seat(self.ride, self.first))
+        self.assertTrue(Ride.objects.reserve_seat(self.ride, self.second))
+        self.assertFalse(Ride.objects.reserve_seat(self.ride, self.third))
+
+        self.ride.refresh_from_db()
+        self.assertEqual(self.ride.available_seats, 0)
+        self.assertEqual(set(self.ride.passengers.all()), {self.first, self.second})
+
+    def test_stale_instance(self):
+        """Reservation doesn't trust the seats of the given instance."""
+        stale = Ride.objects.get(pk=self.ride.pk)
+        Ride.objects.filter(pk=self.ride.pk).update(available_seats=0)
+        self.assertEqual(stale.available_seats, 2)
+        self.assertFalse(Ride.objects.reserve_seat(stale, self.first))
+
+    def test_duplicated_passenger(self):
+        """Joining twice fails and gives the seat back."""
+        Ride.objects.reserve_seat(self.ride, self.first)
+        with self.assertRaises(IntegrityError):
+            Ride.objects.reserve_seat(self.ride, self.first)
+        self.ride.refresh_from_db()
+        self.assertEqual(self.ride.available_seats, 1)
+
+
+class JoinRideAPITestCase(SeatReservationMixin, APITestCase):
+    """Join ride API tests."""
+
+    def join(self, user):
+        """Join the ride as the given user."""
+        token, _ = Token.objects.get_or_create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        return self.client.post('/circles/ciencias/rides/{}/join/'.format(self.ride.pk))
+
+    def test_join(self):
+        """Joining takes a seat."""
+        response = self.join(self.first)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['available_seats'], 1)
+        self.assertEqual([p['username'] for p in response.data['passengers']], ['first'])
+
+    def test_join_twice(self):
+        """Passengers can't join the same ride twice."""
+        self.join(self.first)
+        response = self.join(self.first)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.ride.refresh_from_db()
+        self.assertEqual(self.ride.available_seats, 1)
+
+    def test_join_full_ride(self):
+        """Full rides can't be joined."""
+        Ride.objects.filter(pk=self.ride.pk).update(available_seats=0)
+        response = self.join(self.first)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_join_departing_ride(self):
+        """Rides about to depart can't be joined."""
+        Ride.objects.filter(pk=self.ride.pk).update(departure_date=timezone.now() + timedelta(minutes=5))
+        response = self.join(self.first)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,129 @@
+"""Rides location search tests."""
+
+# Django
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+from rest_framework import status
+
+# Model
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride, RideLocationToken
+from cride.users.models import User, Profile
+
+# Utilities
+from cride.utils import text
+from datetime import timedelta
+from io import StringIO
+
+
+class TextTestCase(TestCase):
+    """Text normalization tests."""
+
+    def test_accent_folding(self):
+        """Accents, case and punctuation are removed."""
+        self.assertEqual(text.normalize('Tec de Monterrey, Campus Santa Fé'), 'tec de monterrey campus santa fe')
+
+    def test_tokenize(self):
+        """Tokens are unique."""
+        self.assertEqual(text.tokenize('Ciudad Universitaria - Ciudad de México'), [
+            'ciudad', 'universitaria', 'de', 'mexico'
+        ])
+
+
+class RideLocationSearchAPITestCase(APITestCase):
+    """Ride location search API tests."""
+
+    def setUp(self):
+        """Create circle, member and rides."""
+        self.user = User.objects.create_user(
+            first_name='Pablo',
+            last_name='Trinidad',
+            email='pablotrinidad@ciencias.unam.mx',
+            username='pablotrinidad',
+            password='admin123'
+        )
+        self.profile = Profile.objects.create(user=self.user)
+        self.circle = Circle.objects.create(
+            name='Facultad de Ciencias',
+            slug_name='ciencias',
+            about='Grupo de la facultadad de ciencias de la UNAM',
+        )
+        Membership.objects.create(user=self.user, profile=self.profile, circle=self.circle)
+
+        self.to_zocalo = self.create_ride('Ciudad Universitaria', 'Zócalo', hours=1)
+        self.to_coyoacan = self.create_ride('Ciudad Universitaria', 'Coyoacán centro', hours=2)
+        self.to_santa_fe = self.create_ride('Zocalo norte', 'Santa Fe', hours=3)
+
+        token = Token.objects.create(user=self.user).key
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+        self.url = '/circles/{}/rides/'.format(self.circle.slug_name)
+
+    def create_ride(self, departure, arrival, hours):
+        """Create a ride between two locations."""
+        departure_date = timezone.now() + timedelta(hours=hours)
+        return Ride.objects.create(
+            offered_by=self.user,
+            offered_in=self.circle,
+            departure_location=departure,
+            departure_date=departure_date,
+            arrival_location=arrival,
+            arrival_date=departure_date + timedelta(hours=1),
+        )
+
+    def search(self, term, **params):
+        """Return the ids of the rides found with the given term."""
+        response = self.client.get(self.url, dict(params, search=term))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [ride['id'] for ride in response.data['results']]
+
+    def test_tokens_are_indexed(self):
+        """Saving a ride indexes its locations."""
+        tokens = RideLocationToken.objects.filter(ride=self.to_zocalo).values_list('field', 'token')
+        self.assertEqual(set(tokens), {
+            ('departure', 'ciudad'), ('departure', 'universitaria'), ('arrival', 'zocalo')
+        })
+
+    def test_tokens_are_updated(self):
+        """Changing a location replaces its tokens."""
+        self.to_zocalo.arrival_location = 'Polanco'
+        self.to_zocalo.save()
+        self.assertEqual(self.search('zocalo'), [self.to_santa_fe.pk])
+        self.assertEqual(self.search('polanco'), [self.to_zocalo.pk])
+
+    def test_accent_insensitive_prefix_search(self):
+        """Search ignores accents and matches word prefixes."""
+        self.assertEqual(self.search('coyoacan'), [self.to_coyoacan.pk])
+        self.assertEqual(self.search('Coyo'), [self.to_coyoacan.pk])
+
+    def test_every_term_must_match(self):
+        """All the search words must be found in the ride locations."""
+        self.assertEqual(self.search('universitaria zocalo'), [self.to_zocalo.pk])
+
+    def test_ranking(self):
+        """Exact matches rank before prefix matches."""
+        to_zocalotitlan = self.create_ride('Coyoacán', 'Zocalotitlan', hours=0.5)
+        self.assertEqual(
+            self.search('zocalo'),
+            [self.to_zocalo.pk, self.to_santa_fe.pk, to_zocalotitlan.pk]
+        )
+
+    def test_explicit_ordering(self):
+        """An explicit ordering replaces the ranking."""
+        self.assertEqual(
+            self.search('zocalo', ordering='-departure_date'),
+            [self.to_santa_fe.pk, self.to_zocalo.pk]
+        )
+
+    def test_reindex_command(self):
+        """The index can be rebuilt from the ride locations."""
+        RideLocationToken.objects.all().delete()
+        Ride.objects.update(location_search_text='')
+        call_command('index_ride_locations', stdout=StringIO())
+        self.assertEqual(self.search('coyoacan'), [self.to_coyoacan.pk])
+        ride = Ride.objects.get(pk=self.to_coyoacan.pk)
+        self.assertEqual(ride.location_search_text, 'ciudad universitaria coyoacan centro')
@@ -0,0 +1,113 @@
+"""Rides stats tests."""
+
+# Django
+from django.core.management import call_command
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.test import APITestCase
+from rest_framework.authtoken.models import Token
+from rest_framework import status
+
+# Model
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride
+from cride.users.models import User, Profile
+
+# Utilities
+from cride.utils.stats import Counters
+from datetime import timedelta
+from io import StringIO
+
+
+class RideStatsAPITestCase(APITestCase):
+    """Ride stats counters tests."""
+
+    def setUp(self):
+        """Create circle with two members."""
+        self.circle = Circle.objects.create(
+            name='Facultad de Ciencias',
+            slug_name='ciencias',
+            about='Grupo de la facultadad de ciencias de la UNAM',
+        )
+        self.driver = self.create_member('driver')
+        self.passenger = self.create_member('passenger')
+        self.url = '/circles/{}/rides/'.format(self.circle.slug_name)
+
+    def create_member(self, username):
+        """Create a user member of the circle."""
+        user = User.objects.create_user(
+            first_name=username,
+            last_name='Test',
+            email='{}@ciencias.unam.mx'.format(username),
+            username=username,
+            password='admin123'
+        )
+        profile = Profile.objects.create(user=user)
+        Membership.objects.create(user=user, profile=profile, circle=self.circle)
+        return user
+
+    def authenticate(self, user):
+        """Authenticate requests as the given user."""
+        token, _ = Token.objects.get_or_create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    def offer_ride(self):
+        """Offer a ride as the driver."""
+        self.authenticate(self.driver)
+        departure = timezone.now() + timedelta(hours=1)
+        response = self.client.post(self.url, {
+            'available_seats': 3,
+            'departure_location': 'Ciudad Universitaria',
+            'departure_date': departure.isoformat(),
+            'arrival_location': 'Zocalo',
+            'arrival_date': (departure + timedelta(hours=1)).isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return Ride.objects.latest('created')
+
+    def assertStats(self, obj, **stats):
+        """Verify the stored counters of the object."""
+        obj.refresh_from_db()
+        for field, value in stats.items():
+            self.assertEqual(getattr(obj, field), value, field)
+
+    def test_offer_ride(self):
+        """Offering a ride updates the circle, membership and profile counters."""
+        self.offer_ride()
+        self.assertStats(self.circle, rides_offered=1)
+        self.assertStats(Membership.objects.get(user=self.driver), rides_offered=1)
+        self.assertStats(self.driver.profile, rides_offered=1)
+
+    def test_join_ride(self):
+        """Joining a ride updates the circle, membership and profile counters."""
+        ride = self.offer_ride()
+        self.authenticate(self.passenger)
+        response = self.client.post('{}{}/join/'.format(self.url, ride.pk))
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertStats(self.circle, rides_offered=1, rides_taken=1)
+        self.assertStats(Membership.objects.get(user=self.passenger), rides_taken=1)
+        self.assertStats(self.passenger.profile, rides_taken=1)
+
+    def test_counters_buffer(self):
+        """Deltas for the same row are merged and applied at once."""
+        with Counters() as counters:
+            counters.add(self.circle, rides_offered=2)
+            counters.add(Circle, {'slug_name': 'ciencias'}, rides_offered=1, rides_taken=1)
+        self.assertStats(self.circle, rides_offered=3, rides_taken=1)
+
+    def test_reconcile_stats(self):
+        """Counters are recomputed from rides and passengers."""
+        ride = self.offer_ride()
+        ride.passengers.add(self.passenger)
+        Circle.objects.update(rides_offered=10, rides_taken=10)
+        Membership.objects.update(rides_offered=10, rides_taken=10)
+        Profile.objects.update(rides_offered=10, rides_taken=10)
+
+        call_command('reconcile_stats', stdout=StringIO())
+
+        self.assertStats(self.circle, rides_offered=1, rides_taken=1)
+        self.assertStats(Membership.objects.get(user=self.driver), rides_offered=1, rides_taken=0)
+        self.assertStats(Membership.objects.get(user=self.passenger), rides_offered=0, rides_taken=1)
+        self.assertStats(self.driver.profile, rides_offered=1, rides_taken=0)
+        self.assertStats(self.passenger.profile, rides_offered=0, rides_taken=1)
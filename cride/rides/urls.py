@@ -7,6 +7,7 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 # Views
+from .views import matches as match_views
 from .views import rides as ride_views
 
 router = DefaultRouter()
@@ -15,6 +16,7 @@ router.register(
     ride_views.RideViewSet,
     basename="ride"
 )
+router.register(r'rides/matches', match_views.RideMatchViewSet, basename='ride-match')
 urlpatterns = [
     path('', include(router.urls))
 ]
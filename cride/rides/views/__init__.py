@@ -1 +1,2 @@
 from .rides import *
+from .matches import *
@@ -0,0 +1,79 @@
+"""Ride matches views."""
+
+# Django REST Framework
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+# Models
+from cride.rides.models import Ride
+
+# Serializers
+from cride.rides.serializers import RideModelSerializer
+
+# Filters
+from cride.rides.filters import RideProximityFilter
+
+# Utilities
+from cride.rides.matching import match_rides
+from cride.utils.fast_serializers import compile_serializer
+from cride.utils.views import ReplicaReadMixin
+
+
+class RideMatchViewSet(ReplicaReadMixin, viewsets.GenericViewSet):
+    """Ride matches view set.
+
+    Rank the rides of every circle the requesting user belongs to:
+        + departure (datetime): desired departure, defaults to now.
+        + near / toward (lat,lng): desired departure and arrival points.
+        + radius (km): search radius around the given points.
+        + limit: number of matches, up to 100.
+    See cride.rides.matching for the scoring.
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = RideModelSerializer
+    replica_actions = ('list',)
+
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+
+    def list(self, request, *args, **kwargs):
+        params = request.query_params
+        proximity = RideProximityFilter()
+        matches = match_rides(
+            request.user,
+            departure=proximity.parse_date(params, 'departure'),
+            near=proximity.parse_point(params, 'near'),
+            toward=proximity.parse_point(params, 'toward'),
+            radius=proximity.parse_radius(params),
+            limit=self.parse_limit(params)
+        )
+
+        compiled = compile_serializer(RideModelSerializer, (('circles.Circle', 'name'),))
+        rows = list(compiled.values(
+            Ride.objects.filter(pk__in=[match.ride for match in matches]),
+            'offered_in__slug_name'
+        ))
+        rides = dict(zip(
+            [row['pk'] for row in rows],
+            compiled.serialize(rows, self.get_serializer_context())
+        ))
+        circles = {row['pk']: row['offered_in__slug_name'] for row in rows}
+        # Rides deleted since they were matched are left out
+        results = [
+            dict(rides[match.ride], circle=circles[match.ride], score=match.score)
+            for match in matches if match.ride in rides
+        ]
+        return Response({'results': results})
+
+    def parse_limit(self, params):
+        """Return the number of matches requested."""
+        try:
+            limit = int(params.get('limit', self.DEFAULT_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'})
+        if not 0 < limit <= self.MAX_LIMIT:
+            raise ValidationError({'limit': 'Limit must be between 1 and {}.'.format(self.MAX_LIMIT)})
+        return limit
@@ -4,7 +4,6 @@
 from datetime import timedelta
 from cride.rides.permissions.rides import IsRideOwner, IsNotRideOwner
 from rest_framework import mixins, viewsets, status
-from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.decorators import action
 # Permissions
@@ -18,17 +17,27 @@ from cride.rides.serializers import (
     CreateRideRatingSerializer
 )
 
-# Models
-from cride.circles.models import Circle
+# Cache
+from cride.circles.cache import get_circle_or_404
 
 # Utils
 from django.utils import timezone
+from cride.utils.pagination import KeysetPagination
+from cride.utils.views import (
+    ConditionalMixin, EagerLoadingMixin, FastListMixin, ReplicaReadMixin, TransactionPolicyMixin
+)
 
 # Filters
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from cride.rides.filters import RideLocationSearchFilter, RideProximityFilter
 
 
-class RideViewSet(mixins.CreateModelMixin,
+class RideViewSet(ReplicaReadMixin,
+                  TransactionPolicyMixin,
+                  ConditionalMixin,
+                  EagerLoadingMixin,
+                  FastListMixin,
+                  mixins.CreateModelMixin,
                   mixins.ListModelMixin,
                   mixins.RetrieveModelMixin,
                   mixins.UpdateModelMixin,
@@ -38,21 +47,29 @@ class RideViewSet(mixins.CreateModelMixin,
 
     serializer_class = CreateRideSerializer
     permission_classes = [IsAuthenticated, IsActiveCircleMember]
-    filter_backends = (SearchFilter, OrderingFilter)
+    filter_backends = (OrderingFilter, RideProximityFilter, RideLocationSearchFilter)
     ordering = ('departure_date', 'arrival_date', 'available_seats')
     ordering_fields = ('departure_date', 'arrival_date', 'available_seats')
-    search_fields = ('departure_location', 'arrival_location')
+    pagination_class = KeysetPagination
+    string_fields = {'circles.Circle': 'name'}
+    validator_relations = ('offered_by', 'offered_by__profile', 'passengers', 'passengers__profile')
+    atomic_actions = ('create', 'update', 'partial_update', 'join', 'finish', 'rate')
+    eager_loading = {
+        'join': RideModelSerializer,
+        'finish': RideModelSerializer,
+        'rate': RideModelSerializer
+    }
 
     def dispatch(self, request, *args, **kwargs):
         """Verify that the circle exists."""
         slug_name = kwargs['slug_name']
-        self.circle = get_object_or_404(Circle, slug_name=slug_name)
+        self.circle = get_circle_or_404(slug_name)
         return super(RideViewSet, self).dispatch(request, *args, **kwargs)
 
     def get_permissions(self):
         """Assign permissions based on action."""
         permissions = [IsAuthenticated, IsActiveCircleMember]
-        if self.action in ['update', 'update_partial', 'finish']:
+        if self.action in ['update', 'partial_update', 'finish']:
             permissions.append(IsRideOwner)
         if self.action == 'join':
             permissions.append(IsNotRideOwner)
@@ -71,7 +88,7 @@ class RideViewSet(mixins.CreateModelMixin,
 
         if self.action == 'create':
             return CreateRideSerializer
-        if self.action == 'update':
+        if self.action == 'join':
             return JoinRideSerializer
         if self.action == 'finish':
             return EndRideSerializer
@@ -81,14 +98,15 @@ class RideViewSet(mixins.CreateModelMixin,
 
     def get_queryset(self):
         """Return active circle's rides."""
-        if self.action != 'finish':
+        queryset = self.circle.ride_set.all()
+        if self.action not in ['finish', 'rate']:
             offset = timezone.now() + timedelta(minutes=10)
-            return self.circle.ride_set.filter(
+            queryset = queryset.filter(
                 departure_date__gte=offset,
                 is_active=True,
                 available_seats__gte=1
             )
-        return self.circle.ride_set.all()
+        return self.optimize_queryset(queryset)
 
     @action(detail=True, methods=['post'])
     def join(self, request, *args, **kwargs):
@@ -96,10 +114,12 @@ class RideViewSet(mixins.CreateModelMixin,
 
         ride = self.get_object()
         serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        context['ride'] = ride
         serializer = serializer_class(
             ride,
             data={'passenger': request.user.pk},
-            context={'ride': ride, 'circle': self.circle},
+            context=context,
             partial=True
         )
         serializer.is_valid(raise_exception=True)
@@ -133,5 +153,5 @@ class RideViewSet(mixins.CreateModelMixin,
         serializer = serializer_class(data=request.data, context=context)
         serializer.is_valid(raise_exception=True)
         ride = serializer.save()
-        data = serializer(ride).data
+        data = RideModelSerializer(ride).data
         return Response(data, status=status.HTTP_201_CREATED)
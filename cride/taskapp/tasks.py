@@ -1,21 +1,21 @@
 """Celery Tasks."""
 
 # Django
-from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.conf import settings
 
 # Celery
-from celery.decorators import task, periodic_task
+from cride.taskapp.celery import app
 
 # Utilities
 import jwt
 from django.utils import timezone
 from datetime import timedelta
-import time
+from cride.emails.delivery import deliver_outbox
+from cride.rides.expiry import expire_rides
 # Models
+from cride.emails.models import OutboxMessage
 from cride.users.models import User
-from cride.rides.models import Ride
 
 def gen_verification_token(user):
     """Create JWT token that the user can use to verify its account"""
@@ -29,13 +29,8 @@ def gen_verification_token(user):
     return token
 
 
-@task(name='send_confirmation_email', max_retries=3)
-def send_confirmation_email(user_pk):
-    """Send account verification link to given user."""
-    for i in range(30):
-        time.sleep(1)
-        print("Sleeping", str(i+1))
-    user = User.objects.get(pk=user_pk)
+def queue_confirmation_email(user):
+    """Queue the account verification link of the given user in the outbox."""
     verification_token = gen_verification_token(user)
     subject = 'Welcome @{}! verfify your account to start using Comparte Ride'.format(user.username)
     from_email = 'Comparte Ride <noreply@comparteride.com>'
@@ -43,17 +38,29 @@ def send_confirmation_email(user_pk):
         'emails/users/account_verification.html',
         {'token': verification_token, 'user': user}
     )
-    msg = EmailMultiAlternatives(subject, content, from_email, [user.email])
-    msg.attach_alternative(content, 'text/html')
-    msg.send()
+    OutboxMessage.objects.queue(subject, content, from_email, [user.email], html_body=content)
+
+
+@app.task(name='send_confirmation_email', max_retries=3)
+def send_confirmation_email(user_pk):
+    """Queue account verification link to given user."""
+    queue_confirmation_email(User.objects.get(pk=user_pk))
 
 
-@periodic_task(name='disabled_finished_rides', run_every=timedelta(minutes=1))
+@app.task(name='deliver_emails', ignore_result=True)
+def deliver_emails():
+    """Deliver due outbox messages.
+
+    Batches are delivered until the outbox has no due messages left
+    or EMAIL_OUTBOX_MAX_BATCHES is reached, the next run continues.
+    """
+    for _ in range(settings.EMAIL_OUTBOX_MAX_BATCHES):
+        delivery = deliver_outbox()
+        if sum(delivery) < settings.EMAIL_OUTBOX_BATCH_SIZE:
+            break
+
+
+@app.task(name='disabled_finished_rides')
 def disable_finished_rides():
     """Disable finished rides."""
-    now = timezone.now()
-    offset = now-timedelta(seconds=5)
-
-    # Update rides that have already finished
-    rides = Ride.objects.filter(arrival_date__gte=now, arrival_date__lte=offset, is_active=True)
-    rides.update(is_active=False)
+    return expire_rides().expired
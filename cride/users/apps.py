@@ -8,3 +8,7 @@ class UserAppConfig(AppConfig):
 
     name = 'cride.users'
     verbose_name = 'Users'
+
+    def ready(self):
+        """Register signals."""
+        from cride.users import signals  # noqa
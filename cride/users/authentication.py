@@ -0,0 +1,216 @@
+"""Users authentication.
+
+TokenAuthentication looks the token and its user up on every
+request. CachedTokenAuthentication keeps a snapshot of a few user
+fields in the configured Django cache for USERS_TOKEN_CACHE_TIMEOUT
+seconds, never the password hash. The receivers in
+`cride.users.signals` replace snapshots with a tombstone when the
+token is deleted (logout, rotation) or its user changes
+(deactivation, password change, ...). Snapshots are only added
+where there is nothing, so a request that read the token before
+the change can't bring it back.
+
+When USERS_AUTHENTICATION is `jwt` logins issue signed tokens
+instead: short-lived access tokens carrying the user, verified by
+JWTAuthentication without any query, and refresh tokens trading
+themselves for a new pair. Revoked tokens are listed in the cache
+until they expire, deactivated users revoke every token issued
+before.
+"""
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+# Django REST Framework
+from rest_framework.authentication import BaseAuthentication, TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+# Models
+from cride.users.models import User
+
+# Utilities
+import hashlib
+import jwt
+import time
+import uuid
+
+
+# Bump when the snapshot fields change so stale entries are ignored.
+CACHE_VERSION = 2
+
+TOKEN_KEY = 'users:token:v{version}:{digest}'
+REVOKED_TOKEN_KEY = 'users:jwt:revoked:{jti}'
+REVOKED_USER_KEY = 'users:jwt:revoked-user:{user}'
+
+JWT_ALGORITHM = 'HS256'
+
+# User fields carried by cached snapshots and access tokens, the rest load on access.
+USER_FIELDS = ('id', 'username', 'email', 'is_active', 'is_staff', 'is_verified')
+
+# Cached in place of invalidated snapshots.
+INVALIDATED = 'invalidated'
+
+
+def token_key(key):
+    """Return the cache key of a token, raw tokens are not used as keys."""
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return TOKEN_KEY.format(version=CACHE_VERSION, digest=digest)
+
+
+def invalidate_tokens(*keys):
+    """Replace the cached snapshots of the given tokens with tombstones."""
+    timeout = settings.USERS_TOKEN_CACHE_TIMEOUT
+    if timeout:
+        cache.set_many({token_key(key): INVALIDATED for key in keys if key}, timeout)
+
+
+def invalidate_user_tokens(user_id):
+    """Drop the cached snapshots of the user's tokens."""
+    invalidate_tokens(*Token.objects.filter(user_id=user_id).values_list('key', flat=True))
+
+
+def load_snapshot(key):
+    """Return the snapshot of a token and its user from the database, or None."""
+    row = Token.objects.using(DEFAULT_DB_ALIAS).filter(key=key).values_list(
+        'created', *('user__{}'.format(field) for field in USER_FIELDS)
+    ).first()
+    if row is None:
+        return None
+    return {'created': row[0], 'user': row[1:]}
+
+
+def build_user(values):
+    """Return a user from the values of USER_FIELDS, other fields load on access."""
+    values = dict(zip(USER_FIELDS, values))
+    # from_db expects the values in the order of the model fields
+    fields = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db(DEFAULT_DB_ALIAS, fields, [values[field] for field in fields])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication served from the cache.
+
+    Clients authenticate exactly as with TokenAuthentication,
+    a cache miss costs the same single query.
+    """
+
+    def authenticate_credentials(self, key):
+        timeout = settings.USERS_TOKEN_CACHE_TIMEOUT
+        if not timeout:
+            return super(CachedTokenAuthentication, self).authenticate_credentials(key)
+
+        cache_key = token_key(key)
+        snapshot = cache.get(cache_key)
+        if snapshot is None or snapshot == INVALIDATED:
+            cached = snapshot
+            snapshot = load_snapshot(key)
+            if snapshot is None:
+                raise AuthenticationFailed('Invalid token.')
+            if cached is None:
+                cache.add(cache_key, snapshot, timeout)
+
+        user = build_user(snapshot['user'])
+        if not user.is_active:
+            raise AuthenticationFailed('User inactive or deleted.')
+        token = Token.from_db(DEFAULT_DB_ALIAS, ('key', 'user_id', 'created'), (key, user.pk, snapshot['created']))
+        token.user = user
+        return (user, token)
+
+
+def encode_token(user, token_type, lifetime):
+    """Return a signed token of the given type for the user."""
+    now = time.time()
+    payload = {
+        'type': token_type,
+        'jti': uuid.uuid4().hex,
+        'user': user.pk,
+        'iat': now,
+        'exp': int(now + lifetime),
+    }
+    if token_type == 'access':
+        payload.update({field: getattr(user, field) for field in USER_FIELDS if field != 'id'})
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+
+def issue_tokens(user):
+    """Return the login tokens of the user for the configured authentication."""
+    if settings.USERS_AUTHENTICATION != 'jwt':
+        token, created = Token.objects.get_or_create(user=user)
+        return {'access_token': token.key}
+    return {
+        'access_token': encode_token(user, 'access', settings.USERS_ACCESS_TOKEN_LIFETIME),
+        'refresh_token': encode_token(user, 'refresh', settings.USERS_REFRESH_TOKEN_LIFETIME),
+    }
+
+
+def decode_token(token, token_type):
+    """Return the payload of a valid, unrevoked token of the given type.
+
+    Raise AuthenticationFailed otherwise.
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise AuthenticationFailed('Token has expired.')
+    except jwt.exceptions.PyJWTError:
+        raise AuthenticationFailed('Invalid token.')
+    if payload.get('type') != token_type:
+        raise AuthenticationFailed('Invalid token.')
+
+    revoked_key = REVOKED_TOKEN_KEY.format(jti=payload['jti'])
+    revoked_user_key = REVOKED_USER_KEY.format(user=payload['user'])
+    revoked = cache.get_many([revoked_key, revoked_user_key])
+    if revoked_key in revoked or payload['iat'] < revoked.get(revoked_user_key, 0):
+        raise AuthenticationFailed('Token has been revoked.')
+    return payload
+
+
+def revoke_token(payload):
+    """List the token in the cache until it expires.
+
+    Return whether this call revoked it: the listing is atomic, so
+    of concurrent calls for the same token only one gets True.
+    """
+    timeout = int(payload['exp'] - time.time()) + 1
+    if timeout <= 0:
+        return False
+    return cache.add(REVOKED_TOKEN_KEY.format(jti=payload['jti']), True, timeout)
+
+
+def revoke_user_tokens(user_id):
+    """Revoke every signed token issued to the user so far."""
+    cache.set(REVOKED_USER_KEY.format(user=user_id), time.time(), settings.USERS_REFRESH_TOKEN_LIFETIME)
+
+
+class JWTAuthentication(BaseAuthentication):
+    """Signed access token authentication.
+
+    Clients authenticate with an `Authorization: Bearer <token>`
+    header. The user is built from the token claims, fields it
+    doesn't carry are loaded from the database when accessed.
+    """
+
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise AuthenticationFailed('Invalid token header.')
+        try:
+            token = auth[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed('Invalid token header.')
+
+        payload = decode_token(token, 'access')
+        if not payload['is_active']:
+            raise AuthenticationFailed('User inactive or deleted.')
+        user = build_user([payload['user']] + [payload[field] for field in USER_FIELDS[1:]])
+        return (user, payload)
+
+    def authenticate_header(self, request):
+        return self.keyword
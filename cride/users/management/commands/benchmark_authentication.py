@@ -0,0 +1,77 @@
+"""Benchmark for token authentication."""
+
+# Django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils.module_loading import import_string
+
+# Django REST Framework
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+# Models
+from cride.users.models import User
+
+# Authentication
+from cride.users.authentication import encode_token
+
+# Utilities
+import statistics
+import time
+import uuid
+
+
+class Command(BaseCommand):
+    """Benchmark authentication command.
+
+    Create a user and its token in a transaction that is rolled back
+    at the end, then authenticate requests with TokenAuthentication
+    and with CachedTokenAuthentication and report the p50 and p99
+    time each request spends authenticating, plus its queries.
+    """
+
+    help = 'Compare the authentication overhead of requests with and without the token cache.'
+
+    AUTHENTICATION_CLASSES = (
+        ('token', 'rest_framework.authentication.TokenAuthentication', 'Token'),
+        ('cached', 'cride.users.authentication.CachedTokenAuthentication', 'Token'),
+        ('jwt', 'cride.users.authentication.JWTAuthentication', 'Bearer'),
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        run = uuid.uuid4().hex[:8]
+        with transaction.atomic():
+            user = User.objects.create(
+                username='bench-{}'.format(run),
+                email='bench-{}@comparteride.com'.format(run),
+                first_name='Bench',
+                last_name='Authentication'
+            )
+            token = Token.objects.create(user=user)
+            credentials = {
+                'Token': token.key,
+                'Bearer': encode_token(user, 'access', settings.USERS_ACCESS_TOKEN_LIFETIME),
+            }
+
+            for label, authentication_class, keyword in self.AUTHENTICATION_CLASSES:
+                request = APIRequestFactory().get('/', HTTP_AUTHORIZATION='{} {}'.format(keyword, credentials[keyword]))
+                authenticator = import_string(authentication_class)()
+                authenticator.authenticate(Request(request))  # Warm up
+                timings = []
+                with CaptureQueriesContext(connection) as queries:
+                    for _ in range(options['requests']):
+                        start = time.perf_counter()
+                        authenticator.authenticate(Request(request))
+                        timings.append((time.perf_counter() - start) * 1000 * 1000)
+                percentiles = statistics.quantiles(timings, n=100)
+                self.stdout.write('{:<8} p50 {:8.1f}us  p99 {:8.1f}us  {:.2f} queries per request'.format(
+                    label, statistics.median(timings), percentiles[98], len(queries) / options['requests']
+                ))
+            token.delete()
+            transaction.set_rollback(True)
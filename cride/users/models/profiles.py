@@ -28,6 +28,8 @@ class Profile(CRideModel):
         default=5.0,
         help_text="User's reputation on the rides taken and offered."
     )
+    ratings_sum = models.PositiveIntegerField(default=0)
+    ratings_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         """Return user's str representation."""
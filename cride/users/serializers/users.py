@@ -7,14 +7,17 @@ from django.core.validators import RegexValidator
 
 # Django REST Framework
 from rest_framework import serializers
-from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.validators import UniqueValidator
 
 # Models
 from cride.users.models import User, Profile
 
 # Tasks
-from cride.taskapp.tasks import send_confirmation_email
+from cride.taskapp.tasks import queue_confirmation_email
+
+# Authentication
+from cride.users.authentication import decode_token, issue_tokens, revoke_token
 
 # Serializers
 from cride.users.serializers import ProfileModelSerializer
@@ -89,7 +92,7 @@ class UserSignUpSerializer(serializers.Serializer):
         data.pop('password_confirmation')
         user = User.objects.create_user(**data, is_verified=False)
         Profile.objects.create(user=user)
-        send_confirmation_email.delay(user_pk=user.pk)
+        queue_confirmation_email(user)
         return user
 
 
@@ -114,8 +117,36 @@ class UserLoginSerializer(serializers.Serializer):
 
     def create(self, data):
         """Generate or retreive new Token"""
-        token, created = Token.objects.get_or_create(user=self.context['user'])
-        return self.context['user'], token.key
+        return self.context['user'], issue_tokens(self.context['user'])
+
+
+class RefreshTokenSerializer(serializers.Serializer):
+    """Refresh token serializer.
+
+    Trade a refresh token for a new pair of signed tokens,
+    the refresh token can't be used again.
+    """
+
+    refresh_token = serializers.CharField()
+
+    def validate_refresh_token(self, data):
+        """Verify the token is a valid refresh token of an active user and use it up."""
+        try:
+            payload = decode_token(data, 'refresh')
+        except AuthenticationFailed as error:
+            raise serializers.ValidationError(error.detail)
+        user = User.objects.filter(pk=payload['user'], is_active=True).first()
+        if user is None:
+            raise serializers.ValidationError('User inactive or deleted.')
+        # Claimed atomically, concurrent refreshes get a single pair
+        if not revoke_token(payload):
+            raise serializers.ValidationError('Token has been revoked.')
+        self.context['user'] = user
+        return data
+
+    def create(self, data):
+        """Issue a new pair."""
+        return self.context['user'], issue_tokens(self.context['user'])
 
 
 class AccountVerificationSerializer(serializers.Serializer):
@@ -0,0 +1,42 @@
+"""Users signals."""
+
+# Django
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+# Django REST Framework
+from rest_framework.authtoken.models import Token
+
+# Models
+from cride.users.models import User
+
+# Authentication
+from cride.users.authentication import invalidate_tokens, invalidate_user_tokens, revoke_user_tokens
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def token_changed(sender, instance, created=False, **kwargs):
+    """Invalidate the cached token, new ones can't be cached yet."""
+    if not created:
+        invalidate_tokens(instance.key)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, **kwargs):
+    """Invalidate the cached tokens of the user.
+
+    Signed tokens are revoked when the user is deactivated or its
+    password changes, set_password keeps the new one in `_password`
+    until the save is over.
+    """
+    if not created:
+        invalidate_user_tokens(instance.pk)
+        if not instance.is_active or instance._password is not None:
+            revoke_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    """Revoke the signed tokens of the user."""
+    revoke_user_tokens(instance.pk)
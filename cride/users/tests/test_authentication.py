@@ -0,0 +1,249 @@
+"""Authentication tests."""
+
+# Django
+from django.core.cache import cache
+from django.test import override_settings
+
+# Django REST Framework
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+# Model
+from cride.users.models import User, Profile
+
+# Serializers
+from cride.users.serializers import RefreshTokenSerializer
+
+# Authentication
+from cride.users import authentication
+from cride.users.authentication import CachedTokenAuthentication, JWTAuthentication, token_key
+
+# Utilities
+from cride.taskapp.tasks import gen_verification_token
+from unittest import mock
+
+
+class CachedTokenAuthenticationAPITestCase(APITestCase):
+    """Cached token authentication tests."""
+
+    def setUp(self):
+        """Create an authenticated user."""
+        cache.clear()
+        self.user = User.objects.create_user(
+            first_name='Pablo',
+            last_name='Trinidad',
+            email='pablotrinidad@ciencias.unam.mx',
+            username='pablotrinidad',
+            password='admin123'
+        )
+        Profile.objects.create(user=self.user)
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.url = '/users/{}/'.format(self.user.username)
+
+    def authenticate(self):
+        """Authenticate a new request with the user token."""
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION='Token ' + self.token.key)
+        return CachedTokenAuthentication().authenticate(Request(request))
+
+    def test_cached_across_requests(self):
+        """Only the first request looks the token up."""
+        with self.assertNumQueries(1):
+            self.assertEqual(self.authenticate(), (self.user, self.token))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(), (self.user, self.token))
+
+    @override_settings(USERS_TOKEN_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        """Without cache every request looks the token up."""
+        self.authenticate()
+        with self.assertNumQueries(1):
+            self.authenticate()
+
+    def test_snapshot(self):
+        """Only a few user fields are cached, never the password."""
+        self.user.is_staff = True
+        self.user.save()
+        user, token = self.authenticate()
+        self.assertTrue(user.is_staff)
+        self.assertTrue(user.is_active)
+        snapshot = cache.get(token_key(self.token.key))
+        self.assertNotIn(self.user.password, repr(snapshot))
+        self.assertNotIn('User', repr(snapshot))
+
+    def test_stale_fill(self):
+        """A request reading the token before a logout doesn't cache it back."""
+        load_snapshot = authentication.load_snapshot
+
+        def load_then_logout(key):
+            snapshot = load_snapshot(key)
+            self.token.delete()
+            return snapshot
+
+        with mock.patch.object(authentication, 'load_snapshot', side_effect=load_then_logout):
+            self.authenticate()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_invalid_token(self):
+        """Unknown tokens are rejected."""
+        self.client.credentials(HTTP_AUTHORIZATION='Token unknown')
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout(self):
+        """The token stops working right after logging out."""
+        self.client.get(self.url)
+        response = self.client.post('/users/logout/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Token.objects.filter(user=self.user).exists())
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivation(self):
+        """Deactivated users are rejected right away."""
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotation(self):
+        """Replaced tokens are rejected right away."""
+        self.client.get(self.url)
+        self.token.delete()
+        token = Token.objects.create(user=self.user)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+
+@override_settings(USERS_AUTHENTICATION='jwt')
+class JWTAuthenticationAPITestCase(APITestCase):
+    """Signed tokens authentication tests."""
+
+    def setUp(self):
+        """Create a verified user and log it in."""
+        cache.clear()
+        self.user = User.objects.create_user(
+            first_name='Pablo',
+            last_name='Trinidad',
+            email='pablotrinidad@ciencias.unam.mx',
+            username='pablotrinidad',
+            password='admin123',
+            is_verified=True
+        )
+        Profile.objects.create(user=self.user)
+        self.url = '/users/{}/'.format(self.user.username)
+        self.tokens = self.login()
+
+    def login(self):
+        """Log the user in and return its tokens."""
+        response = self.client.post('/users/login/', {
+            'email': self.user.email,
+            'password': 'admin123'
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data
+
+    def get(self, access_token):
+        """Request the user detail with the access token."""
+        return self.client.get(self.url, HTTP_AUTHORIZATION='Bearer ' + access_token)
+
+    def authenticate(self, access_token):
+        """Authenticate a new request with the access token."""
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION='Bearer ' + access_token)
+        return JWTAuthentication().authenticate(Request(request))
+
+    def test_login(self):
+        """Logins issue signed tokens, not DRF tokens."""
+        self.assertIn('refresh_token', self.tokens)
+        self.assertFalse(Token.objects.exists())
+        self.assertEqual(self.get(self.tokens['access_token']).status_code, status.HTTP_200_OK)
+
+    def test_no_queries(self):
+        """Access tokens are verified without touching the database."""
+        with self.assertNumQueries(0):
+            user, payload = self.authenticate(self.tokens['access_token'])
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.username, self.user.username)
+
+    def test_other_tokens(self):
+        """Refresh and verification tokens are not access tokens."""
+        self.assertEqual(self.get(self.tokens['refresh_token']).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.get(gen_verification_token(self.user)).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(USERS_ACCESS_TOKEN_LIFETIME=-1)
+    def test_expired(self):
+        """Expired access tokens are rejected."""
+        self.assertEqual(self.get(self.login()['access_token']).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh(self):
+        """Refresh tokens trade for a new pair once."""
+        response = self.client.post('/users/refresh/', {'refresh_token': self.tokens['refresh_token']})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.get(response.data['access_token']).status_code, status.HTTP_200_OK)
+
+        response = self.client.post('/users/refresh/', {'refresh_token': self.tokens['refresh_token']})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_logout(self):
+        """Logging out revokes the access and refresh tokens."""
+        response = self.client.post(
+            '/users/logout/',
+            {'refresh_token': self.tokens['refresh_token']},
+            HTTP_AUTHORIZATION='Bearer ' + self.tokens['access_token']
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.get(self.tokens['access_token']).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post('/users/refresh/', {'refresh_token': self.tokens['refresh_token']})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_concurrent_refresh(self):
+        """Only one of concurrent refreshes with the same token succeeds."""
+        data = {'refresh_token': self.tokens['refresh_token']}
+        first, second = RefreshTokenSerializer(data=data), RefreshTokenSerializer(data=data)
+        self.assertTrue(first.is_valid())
+        self.assertFalse(second.is_valid())
+
+    def test_logout_other_refresh_token(self):
+        """Logging out doesn't revoke refresh tokens of other users."""
+        other = User.objects.create_user(
+            first_name='Carlos',
+            last_name='Zamora',
+            email='carlos@ciencias.unam.mx',
+            username='carlos',
+            password='admin123',
+            is_verified=True
+        )
+        response = self.client.post('/users/login/', {'email': other.email, 'password': 'admin123'})
+        refresh_token = response.data['refresh_token']
+
+        response = self.client.post(
+            '/users/logout/',
+            {'refresh_token': refresh_token},
+            HTTP_AUTHORIZATION='Bearer ' + self.tokens['access_token']
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.post('/users/refresh/', {'refresh_token': refresh_token})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_password_change(self):
+        """Changing the password revokes every token issued so far."""
+        self.user.set_password('changed123')
+        self.user.save()
+        self.assertEqual(self.get(self.tokens['access_token']).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post('/users/refresh/', {'refresh_token': self.tokens['refresh_token']})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.user.first_name = 'Pablo Antonio'
+        self.user.save()
+        response = self.client.post('/users/login/', {'email': self.user.email, 'password': 'changed123'})
+        self.assertEqual(self.get(response.data['access_token']).status_code, status.HTTP_200_OK)
+
+    def test_deactivation(self):
+        """Deactivating a user revokes every token issued so far."""
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get(self.tokens['access_token']).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post('/users/refresh/', {'refresh_token': self.tokens['refresh_token']})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
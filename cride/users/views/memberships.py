@@ -7,24 +7,40 @@ from rest_framework.permissions import IsAuthenticated
 from cride.circles.permissions.memberships import IsActiveCircleMember
 
 # Models
-from cride.circles.models import Circle, Membership
+from cride.circles.models import Membership
+
+# Cache
+from cride.circles.cache import get_circle_or_404
 
 # Serializers
 from cride.circles.serializers import MembershipModelSerializer
 
+# Utilities
+from cride.utils.stats import increment
+from cride.utils.pagination import KeysetPagination
+from cride.utils.views import EagerLoadingMixin, FastListMixin, ReplicaReadMixin, TransactionPolicyMixin
+
 
-class MembershipViewSet(mixins.ListModelMixin,
+class MembershipViewSet(ReplicaReadMixin,
+                        TransactionPolicyMixin,
+                        EagerLoadingMixin,
+                        FastListMixin,
+                        mixins.ListModelMixin,
                         mixins.RetrieveModelMixin,
                         mixins.DestroyModelMixin,
                         viewsets.GenericViewSet):
     """Circle membership view set."""
 
     serializer_class = MembershipModelSerializer
+    pagination_class = KeysetPagination
+    string_fields = {'users.User': 'username'}
+    ordering = ('created',)
+    atomic_actions = ('destroy',)
 
     def dispatch(self, request, *args, **kwargs):
         """Verify that the circle exists."""
         slug_name = kwargs['slug_name']
-        self.circle = get_object_or_404(Circle, slug_name=slug_name)
+        self.circle = get_circle_or_404(slug_name)
         return super(MembershipViewSet, self).dispatch(request, *args, **kwargs)
 
     def get_permissions(self):
@@ -34,21 +50,21 @@ class MembershipViewSet(mixins.ListModelMixin,
 
     def get_queryset(self):
         """Return Circle members."""
-        return Membership.objects.filter(
+        queryset = Membership.objects.filter(
             circle=self.circle,
             is_active=True
         )
+        return self.optimize_queryset(queryset)
 
     def get_object(self):
         """Return the circle member by using the user's username."""
         return get_object_or_404(
-            Membership,
-            user__username=self.kwargs['pk'],
-            circle=self.circle,
-            is_active=True
+            self.get_queryset(),
+            user__username=self.kwargs['pk']
         )
 
     def perform_destroy(self, instance):
         """Disable membership"""
         instance.is_active = False
         instance.save()
+        increment(self.circle, members_count=-1)
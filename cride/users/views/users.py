@@ -5,6 +5,8 @@ from rest_framework.response import Response
 from rest_framework import viewsets, mixins
 from rest_framework.decorators import action
 from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
 
 # Permissions
 from rest_framework.permissions import IsAuthenticated, AllowAny
@@ -12,6 +14,7 @@ from cride.users.permissions import IsAccountOwner
 # Serializers
 from cride.users.serializers import (
     AccountVerificationSerializer,
+    RefreshTokenSerializer,
     UserLoginSerializer,
     UserModelSerializer,
     UserSignUpSerializer
@@ -24,10 +27,18 @@ from cride.users.models.users import User
 from cride.circles.models import Circle
 
 # Celery
-from cride.taskapp.tasks import send_confirmation_email
+from cride.taskapp.tasks import queue_confirmation_email
+
+# Authentication
+from cride.users.authentication import decode_token, revoke_token
+
+# Utilities
+from cride.utils.views import ReplicaReadMixin, TransactionPolicyMixin
 
 
 class UserViewSet(
+    ReplicaReadMixin,
+    TransactionPolicyMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
     viewsets.GenericViewSet,
@@ -41,10 +52,11 @@ class UserViewSet(
     queryset = User.objects.filter(is_active=True, is_client=True)
     serializer_class = UserModelSerializer
     lookup_field = 'username'
+    atomic_actions = ('signup',)
 
     def get_permissions(self):
         """Assign permissions based on action."""
-        if self.action in ['signup', 'login', 'verify']:
+        if self.action in ['signup', 'login', 'refresh', 'verify']:
             permissions = [AllowAny]
         elif self.action in ['retrieve', 'update', 'partial_update']:
             permissions = [IsAuthenticated, IsAccountOwner]
@@ -66,13 +78,40 @@ class UserViewSet(
         """User sign in"""
         serializer = UserLoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user, token = serializer.save()
+        user, tokens = serializer.save()
         data = {
             'user': UserModelSerializer(user).data,
-            'access_token': token
+            **tokens
         }
         return Response(data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'])
+    def refresh(self, request):
+        """Trade a refresh token for new signed tokens"""
+        serializer = RefreshTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user, tokens = serializer.save()
+        return Response(tokens, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def logout(self, request):
+        """User sign out, the access token stops working.
+
+        Signed tokens are revoked, along with the refresh token
+        when it is sent and belongs to the user.
+        """
+        if isinstance(request.auth, Token):
+            request.auth.delete()
+        else:
+            revoke_token(request.auth)
+            try:
+                payload = decode_token(request.data.get('refresh_token', ''), 'refresh')
+            except AuthenticationFailed:
+                payload = None
+            if payload is not None and payload['user'] == request.user.pk:
+                revoke_token(payload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
     @action(detail=False, methods=['post'])
     def verify(self, request):
         serializer = AccountVerificationSerializer(data=request.data)
@@ -85,7 +124,7 @@ class UserViewSet(
     def send_confirmation_email(self, request):
 
         user = User.objects.get(email=request.data['email'])
-        send_confirmation_email.delay(user_pk=user.pk)
+        queue_confirmation_email(user)
 
         return Response(status=status.HTTP_200_OK)
 
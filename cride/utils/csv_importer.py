@@ -1,17 +1,180 @@
-# Import csv library
-import csv
+"""CSV importer.
 
-# Models
+Circles are read from the file as a stream and written in chunks:
+every chunk is validated, deduplicated on `slug_name` and saved
+with one query to find existing circles plus one bulk insert, so
+the whole file never lives in memory and the number of queries
+grows with the number of chunks instead of the number of rows.
+"""
 
+# Django
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+# Models
 from cride.circles.models import Circle
 
+# Cache
+from cride.circles.cache import invalidate_circle, invalidate_circles_list
+
+# Utilities
+from itertools import islice
+import csv
+import time
+
+
+CIRCLE_FIELDS = (
+    'name', 'slug_name', 'about', 'verified',
+    'is_public', 'is_limited', 'members_limit',
+)
+
+REQUIRED_FIELDS = ('name', 'slug_name')
+
+ON_CONFLICT = ('skip', 'update', 'reject')
+
+
+class ImportReport:
+    """Import outcome: counters and rejected rows."""
+
+    def __init__(self):
+        self.read = 0
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+        self.rejects = []
+        self.started = time.monotonic()
+        self.elapsed = 0
+
+    def reject(self, line, row, error):
+        """Record a row that couldn't be imported."""
+        self.rejects.append((line, row, error))
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.elapsed if self.elapsed else 0
+
+    def __str__(self):
+        return (
+            '{read} rows read: {created} created, {updated} updated, {skipped} skipped, '
+            '{rejected} rejected in {elapsed:.2f}s ({speed:.0f} rows/sec).'
+        ).format(
+            read=self.read,
+            created=self.created,
+            updated=self.updated,
+            skipped=self.skipped,
+            rejected=len(self.rejects),
+            elapsed=self.elapsed,
+            speed=self.rows_per_second
+        )
+
+
+def clean_circle(row):
+    """Return the circle values of a CSV row, coerced to their field types.
+
+    Missing or blank optional columns take the field default, when
+    `is_limited` is not given circles with a members limit are limited.
+    """
+    if None in row:
+        raise ValidationError('Too many values.')
+    unknown = set(row) - set(CIRCLE_FIELDS)
+    if unknown:
+        raise ValidationError('Unknown columns: {}.'.format(', '.join(sorted(unknown))))
+
+    data = {}
+    for name in CIRCLE_FIELDS:
+        field = Circle._meta.get_field(name)
+        value = (row.get(name) or '').strip()
+        if not value and name not in REQUIRED_FIELDS:
+            data[name] = field.get_default()
+            continue
+        try:
+            data[name] = field.clean(value, None)
+        except ValidationError as error:
+            raise ValidationError('{}: {}'.format(name, ' '.join(error.messages)))
+
+    if not (row.get('is_limited') or '').strip():
+        data['is_limited'] = data['members_limit'] > 0
+    if data['is_limited'] and not data['members_limit']:
+        raise ValidationError('members_limit: Limited circles need a members limit.')
+    return data
+
+
+def chunks(iterable, size):
+    """Yield lists of at most `size` items."""
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def import_chunk(rows, report, seen, on_conflict='skip'):
+    """Validate and save a chunk of (line, row) pairs."""
+    circles = {}
+    for line, row in rows:
+        report.read += 1
+        try:
+            data = clean_circle(row)
+        except ValidationError as error:
+            report.reject(line, row, ' '.join(error.messages))
+            continue
+        if data['slug_name'] in seen:
+            report.reject(line, row, 'slug_name: Duplicated in file.')
+            continue
+        seen.add(data['slug_name'])
+        circles[data['slug_name']] = (line, row, data)
+
+    existing = Circle.objects.in_bulk(list(circles), field_name='slug_name')
+    now = timezone.now()
+    new = []
+    updated = []
+    for slug_name, (line, row, data) in circles.items():
+        circle = existing.get(slug_name)
+        if circle is None:
+            new.append(Circle(**data))
+        elif on_conflict == 'update':
+            for name, value in data.items():
+                setattr(circle, name, value)
+            circle.modified = now
+            updated.append(circle)
+        elif on_conflict == 'skip':
+            report.skipped += 1
+        else:
+            report.reject(line, row, 'slug_name: Circle already exists.')
+
+    Circle.objects.bulk_create(new)
+    if updated:
+        # Bulk updates skip the signals clearing the circles cache
+        Circle.objects.bulk_update(updated, CIRCLE_FIELDS + ('modified',))
+        slugs = [circle.slug_name for circle in updated]
+        transaction.on_commit(lambda: invalidate_circle(*slugs))
+    if new or updated:
+        transaction.on_commit(invalidate_circles_list)
+    report.created += len(new)
+    report.updated += len(updated)
+
+
+def import_circles(rows, batch_size=1000, on_conflict='skip'):
+    """Import circles from an iterable of dicts.
+
+    The import runs in a single transaction, rejected rows are
+    reported instead of stopping it but any database error rolls
+    back every chunk.
+    """
+    assert on_conflict in ON_CONFLICT, 'on_conflict must be one of {}'.format(ON_CONFLICT)
+    report = ImportReport()
+    seen = set()
+    with transaction.atomic():
+        # Data starts at line 2, after the header
+        for chunk in chunks(enumerate(rows, start=2), batch_size):
+            import_chunk(chunk, report, seen, on_conflict)
+    report.elapsed = time.monotonic() - report.started
+    return report
+
 
-def load_circles(file_name):
-    try:
-        with open(file_name, 'r') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                Circle.objects.create(**row)
-        print('file imported correctly')
-    except Exception as ex:
-        raise ex
+def load_circles(file_name, batch_size=1000, on_conflict='skip'):
+    """Import the circles of a CSV file."""
+    with open(file_name, 'r', newline='', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+        return import_circles(reader, batch_size=batch_size, on_conflict=on_conflict)
@@ -0,0 +1,97 @@
+"""Database utilities.
+
+Read-only requests can be served by read replicas. Views opt in
+with ReplicaReadMixin, which flags the reads of the request for the
+ReplicaRouter. Clients that just wrote something are pinned to the
+primary database for DATABASE_REPLICA_PIN_SECONDS so they read their
+own writes while replicas catch up.
+
+Data filling shared caches is read from the primary database: a
+lagging replica would otherwise put back what an invalidation just
+dropped, for the whole cache timeout.
+"""
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+# Utilities
+from contextlib import contextmanager
+from contextvars import ContextVar
+import hashlib
+import random
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+PIN_KEY = 'db:pinned:{client}'
+
+_replica = ContextVar('replica', default=None)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Send the reads of the block to a replica.
+
+    A single replica is picked for the whole block so its reads are
+    consistent with each other. Nested blocks can turn replica reads
+    back off with `enabled=False`.
+    """
+    replicas = settings.DATABASE_REPLICAS
+    token = _replica.set(random.choice(replicas) if enabled and replicas else None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def get_pin_key(request):
+    """Return the pin cache key of the client making the request.
+
+    Clients are told apart by their credentials, or their address
+    when anonymous.
+    """
+    client = request.META.get('HTTP_AUTHORIZATION') or request.META.get('REMOTE_ADDR', '')
+    return PIN_KEY.format(client=hashlib.sha256(client.encode()).hexdigest())
+
+
+def pin_to_primary(request):
+    """Make the client read from the primary database for a while."""
+    cache.set(get_pin_key(request), True, timeout=settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def is_pinned(request):
+    """Tell whether the client wrote recently."""
+    return bool(cache.get(get_pin_key(request)))
+
+
+class ReplicaRouter:
+    """Primary/replicas database router.
+
+    Writes always go to the primary database, reads go to the
+    replica picked by the enclosing `replica_reads` block, if any.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _replica.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Replicas hold the same data as the primary database."""
+        return True
+
+
+class ReplicaPinMiddleware:
+    """Pin clients to the primary database after successful writes."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request)
+        return response
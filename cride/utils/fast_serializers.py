@@ -0,0 +1,187 @@
+"""Fast serializers.
+
+ModelSerializer spends most of a list response walking its fields:
+resolving every attribute of every instance, checking for nulls
+and building nested serializers row by row. A compiled serializer
+walks the fields once and turns them into plain accessors over the
+rows of a `.values()` query, so a page costs one query plus one per
+to-many relation and no model instances are built at all.
+
+Compiled serializers produce the same output as the serializer
+they come from for the fields they support: model fields, nested
+serializers over relations and related fields. Anything else
+(method fields, `source='*'`, ...) is refused at compile time.
+"""
+
+# Django
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+
+# Django REST Framework
+from rest_framework import fields, relations, serializers
+
+# Utilities
+from collections import defaultdict
+from functools import lru_cache
+
+
+SCALARS = {
+    fields.BooleanField: bool,
+    fields.CharField: str,
+    fields.EmailField: str,
+    fields.SlugField: str,
+    fields.IntegerField: int,
+    fields.FloatField: float,
+}
+
+
+def file_url(field):
+    """Return a function converting a stored file name to its representation."""
+    storage = field.storage
+
+    def convert(name, context):
+        if not name:
+            return None
+        url = storage.url(name)
+        request = context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+    return convert
+
+
+class CompiledSerializer:
+    """Serializer output built from `.values()` rows.
+
+    Usage:
+        compiled = compile_serializer(RideModelSerializer, (('circles.Circle', 'name'),))
+        rows = compiled.values(queryset)
+        data = compiled.serialize(rows, context)
+
+    `string_fields` maps models to the field their `__str__` returns,
+    which is how StringRelatedField over them is read from rows.
+    """
+
+    def __init__(self, serializer_class, string_fields=None):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.string_fields = string_fields or {}
+        self.lookups = []
+        self.to_many = []
+        self.accessors = self.compile(serializer_class(), self.model, '')
+
+    def add_lookup(self, lookup):
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return lookup
+
+    def compile(self, serializer, model, prefix):
+        """Return the (name, accessor) pairs of the serializer fields."""
+        accessors = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*' or len(field.source_attrs) != 1:
+                raise ImproperlyConfigured('{}.{} has an unsupported source.'.format(
+                    type(serializer).__name__, name
+                ))
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured('{}.{} is not a model field.'.format(type(serializer).__name__, name))
+            accessors.append((name, self.compile_field(field, model_field, prefix)))
+        return accessors
+
+    def compile_field(self, field, model_field, prefix):
+        """Return a function reading the field representation from a row."""
+        lookup = prefix + field.source
+
+        if isinstance(field, serializers.ListSerializer):
+            if prefix:
+                raise ImproperlyConfigured('Nested to-many relations are not supported.')
+            return self.compile_to_many(field, model_field)
+
+        if isinstance(field, serializers.BaseSerializer):
+            related = model_field.related_model
+            pk = self.add_lookup('{}__{}'.format(lookup, related._meta.pk.name))
+            accessors = self.compile(field, related, lookup + '__')
+            return lambda row, context: None if row[pk] is None else {
+                name: accessor(row, context) for name, accessor in accessors
+            }
+
+        if isinstance(field, relations.StringRelatedField):
+            label = model_field.related_model._meta.label
+            if label not in self.string_fields:
+                raise ImproperlyConfigured('Add {} to string_fields to compile {}.'.format(label, lookup))
+            key = self.add_lookup('{}__{}'.format(lookup, self.string_fields[label]))
+            return lambda row, context: None if row[key] is None else str(row[key])
+
+        if isinstance(field, relations.PrimaryKeyRelatedField) and not field.pk_field:
+            key = self.add_lookup(lookup)
+            return lambda row, context: row[key]
+
+        if isinstance(field, (relations.RelatedField, relations.ManyRelatedField)):
+            raise ImproperlyConfigured('{} fields are not supported.'.format(type(field).__name__))
+
+        key = self.add_lookup(lookup)
+        if isinstance(field, fields.FileField):
+            convert = file_url(model_field)
+            return lambda row, context: convert(row[key], context)
+
+        scalar = SCALARS.get(type(field))
+        if scalar is not None:
+            return lambda row, context: None if row[key] is None else scalar(row[key])
+        to_representation = field.to_representation
+        return lambda row, context: None if row[key] is None else to_representation(row[key])
+
+    def compile_to_many(self, field, model_field):
+        """Return a function reading to-many relations loaded by `serialize`."""
+        if model_field.auto_created:
+            back = model_field.field.name
+        else:
+            back = model_field.related_query_name()
+        child = compile_serializer(type(field.child), tuple(sorted(self.string_fields.items())))
+        self.add_lookup('pk')
+        relation = (field.source, back, model_field.related_model, child)
+        self.to_many.append(relation)
+        return lambda row, context: context['_to_many'][field.source].get(row['pk'], [])
+
+    def values(self, queryset, *extra):
+        """Return the queryset rows with every value the serializer needs.
+
+        `extra` lookups are added to the rows, like the fields the
+        rows are ordered by for keyset pagination.
+        """
+        lookups = list(self.lookups)
+        for lookup in extra:
+            if lookup not in lookups:
+                lookups.append(lookup)
+        return queryset.select_related(None).prefetch_related(None).values(*lookups)
+
+    def load_to_many(self, rows, context):
+        """Return the serialized to-many relations of the rows, by relation and row pk."""
+        loaded = {}
+        pks = [row['pk'] for row in rows]
+        for source, back, related_model, child in self.to_many:
+            related = defaultdict(list)
+            if pks:
+                related_rows = list(child.values(
+                    related_model._default_manager.filter(**{'{}__in'.format(back): pks}),
+                    back
+                ))
+                items = child.serialize(related_rows, context)
+                for row, item in zip(related_rows, items):
+                    related[row[back]].append(item)
+            loaded[source] = related
+        return loaded
+
+    def serialize(self, rows, context=None):
+        """Return the representation of the rows."""
+        context = dict(context or {})
+        rows = list(rows)
+        if self.to_many:
+            context['_to_many'] = self.load_to_many(rows, context)
+        return [{name: accessor(row, context) for name, accessor in self.accessors} for row in rows]
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class, string_fields=()):
+    """Return the compiled version of a ModelSerializer class, compiled once."""
+    return CompiledSerializer(serializer_class, dict(string_fields))
@@ -0,0 +1,95 @@
+"""Geohash utilities.
+
+Geohashes split the world in a grid of nested cells identified by
+base32 strings, points sharing a prefix are close to each other.
+Storing the geohash of a point in an indexed column turns a
+proximity search into a handful of prefix lookups that any B-tree
+index can serve.
+"""
+
+# Utilities
+import math
+
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Default precision used to store points, ~38m x 19m cells.
+PRECISION = 8
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    """Return the geohash of the given point."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(geohash) < precision:
+        if even:
+            value, value_range = longitude, lng_range
+        else:
+            value, value_range = latitude, lat_range
+        middle = (value_range[0] + value_range[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            value_range[0] = middle
+        else:
+            value_range[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(geohash)
+
+
+def cell_size(precision):
+    """Return the (height, width) in degrees of a cell of the given precision."""
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = math.floor(precision * 5 / 2)
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def precision_for_radius(latitude, radius_km):
+    """Return the longest precision whose cells are at least radius_km wide.
+
+    With that precision a circle of the given radius is always
+    covered by the cell containing its center plus its 8 neighbors.
+    """
+    km_per_degree = math.pi * EARTH_RADIUS_KM / 180
+    lng_factor = max(math.cos(math.radians(latitude)), 0.01)
+    for precision in range(PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        if height * km_per_degree >= radius_km and width * km_per_degree * lng_factor >= radius_km:
+            return precision
+    return 1
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """Return the geohash prefixes covering a circle around the given point."""
+    precision = precision_for_radius(latitude, radius_km)
+    height, width = cell_size(precision)
+    cells = set()
+    for d_lat in (-height, 0, height):
+        lat = latitude + d_lat
+        if lat > 90 or lat < -90:
+            continue
+        for d_lng in (-width, 0, width):
+            lng = (longitude + d_lng + 180) % 360 - 180
+            cells.add(encode(lat, lng, precision))
+    return sorted(cells)
+
+
+def distance(lat_a, lng_a, lat_b, lng_b):
+    """Return the great circle distance in km between two points."""
+    lat_a, lng_a, lat_b, lng_b = map(math.radians, (lat_a, lng_a, lat_b, lng_b))
+    h = (
+        math.sin((lat_b - lat_a) / 2) ** 2 +
+        math.cos(lat_a) * math.cos(lat_b) * math.sin((lng_b - lng_a) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
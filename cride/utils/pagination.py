@@ -0,0 +1,190 @@
+"""Pagination utilities.
+
+Offset pagination costs O(offset) on deep pages plus a COUNT(*)
+per request. Keyset pagination instead remembers the sort key of
+the last row served and asks the database for the rows after it,
+every page is a range scan no matter how deep the client scrolls.
+"""
+
+# Django
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+# Django REST Framework
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.utils.urls import replace_query_param
+
+# Utilities
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+from decimal import Decimal
+import json
+
+
+Cursor = namedtuple('Cursor', ['reverse', 'position'])
+
+
+class KeysetPagination(CursorPagination):
+    """Keyset pagination.
+
+    Pages follow the ordering of the queryset (applied by the
+    view filters) or the view's `ordering`, the primary key is
+    appended as tiebreaker so the sort key is unique and pages
+    never skip nor repeat rows. Ordering fields must not be null.
+
+    Requests sending `offset` are served by LimitOffsetPagination
+    so existing clients keep working.
+    """
+
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    offset_query_param = 'offset'
+    tiebreaker = 'pk'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return the page following (or preceding) the requested cursor."""
+        self.fallback = None
+        if self.offset_query_param in request.query_params:
+            self.fallback = LimitOffsetPagination()
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor.reverse
+
+        if cursor is not None:
+            queryset = queryset.filter(self.get_keyset_filter(queryset, cursor))
+        ordering = [self.invert(field) for field in self.ordering] if reverse else self.ordering
+
+        results = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+
+        self.has_next = cursor is not None if reverse else has_more
+        self.has_previous = has_more if reverse else cursor is not None
+        if self.page:
+            self.first_position = self.get_position(self.page[0])
+            self.last_position = self.get_position(self.page[-1])
+        elif cursor is not None:
+            self.first_position = self.last_position = cursor.position
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        """Return the ordering of the queryset ending with the tiebreaker."""
+        ordering = list(queryset.query.order_by)
+        if not ordering:
+            ordering = list(getattr(view, 'ordering', None) or queryset.model._meta.ordering)
+        assert all(isinstance(field, str) and field != '?' for field in ordering), (
+            'Keyset pagination requires an ordering made of field names.'
+        )
+
+        fields = []
+        for field in ordering:
+            if field.lstrip('-') not in [f.lstrip('-') for f in fields]:
+                fields.append(field)
+        if not {'pk', 'id'} & {field.lstrip('-') for field in fields}:
+            fields.append(self.tiebreaker)
+        return fields
+
+    def get_keyset_filter(self, queryset, cursor):
+        """Return the condition selecting rows after the cursor position.
+
+        For an ordering (a, -b, pk) and a position (1, 2, 3) that is
+        a > 1 OR (a = 1 AND b < 2) OR (a = 1 AND b = 2 AND pk > 3),
+        comparisons are flipped to walk backwards. Position values are
+        converted by their fields, tampered cursors are rejected.
+        """
+        if len(cursor.position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, cursor.position):
+            name = field.lstrip('-')
+            try:
+                value = self.get_field(queryset, name).to_python(value)
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+            if value is None:
+                raise NotFound(self.invalid_cursor_message)
+            descending = field.startswith('-')
+            lookup = 'lt' if descending != cursor.reverse else 'gt'
+            condition |= Q(**equal, **{'{}__{}'.format(name, lookup): value})
+            equal[name] = value
+        return condition
+
+    @staticmethod
+    def get_field(queryset, name):
+        """Return the model field or annotation output field sorting by the given name."""
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        opts = queryset.model._meta
+        for attr in name.split('__'):
+            field = opts.pk if attr == 'pk' else opts.get_field(attr)
+            if field.is_relation:
+                opts = field.related_model._meta
+        return field
+
+    def get_position(self, instance):
+        """Return the sort key of an instance or a `.values()` row."""
+        position = []
+        for field in self.ordering:
+            if isinstance(instance, dict):
+                value = instance[field.lstrip('-')]
+            else:
+                value = instance
+                for attr in field.lstrip('-').split('__'):
+                    value = getattr(value, attr)
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = str(value)
+            position.append(value)
+        return position
+
+    @staticmethod
+    def invert(field):
+        """Return the opposite direction of an ordering field."""
+        return field[1:] if field.startswith('-') else '-' + field
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(Cursor(reverse=False, position=self.last_position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(Cursor(reverse=True, position=self.first_position))
+
+    def decode_cursor(self, request):
+        """Return the cursor sent in the request, if any."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            data = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            cursor = Cursor(reverse=bool(data.get('r')), position=data['p'])
+        except (TypeError, ValueError, KeyError, AttributeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(cursor.position, list):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def encode_cursor(self, cursor):
+        """Return the current url pointing at the cursor."""
+        data = {'p': cursor.position}
+        if cursor.reverse:
+            data['r'] = 1
+        encoded = urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return super(KeysetPagination, self).get_paginated_response(data)
@@ -0,0 +1,87 @@
+"""Stats utilities.
+
+Counters like rides offered or taken are denormalized on circles,
+memberships and profiles. Instead of read-modify-write cycles that
+lose concurrent updates, deltas are buffered and applied with F()
+expressions: one UPDATE per row, issued in a stable order so
+concurrent requests lock rows in the same sequence.
+"""
+
+# Django
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, FloatField, Func
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+# Utilities
+from collections import Counter, defaultdict
+
+
+def has_modified(model):
+    """Tell whether the model keeps a `modified` timestamp to bump on updates."""
+    try:
+        model._meta.get_field('modified')
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+class Counters:
+    """Counter deltas buffer.
+
+    Usage:
+        with Counters() as counters:
+            counters.add(circle, rides_taken=1)
+            counters.add(Profile, {'user_id': user.pk}, rides_taken=1)
+
+    Deltas are flushed when the block exits without errors.
+    """
+
+    def __init__(self):
+        self.deltas = defaultdict(Counter)
+
+    def add(self, target, lookups=None, **deltas):
+        """Buffer deltas for a model instance or for the row matching the lookups."""
+        if lookups is None:
+            model, lookups = type(target), {'pk': target.pk}
+        else:
+            model = target
+        key = (model, tuple(sorted(lookups.items())))
+        self.deltas[key].update(deltas)
+
+    def flush(self):
+        """Apply the buffered deltas and clear the buffer."""
+        keys = sorted(self.deltas, key=lambda key: (key[0]._meta.label, key[1]))
+        for model, lookups in keys:
+            increments = {
+                field: F(field) + delta
+                for field, delta in self.deltas[(model, lookups)].items()
+                if delta
+            }
+            if increments:
+                if has_modified(model):
+                    increments['modified'] = timezone.now()
+                model._default_manager.filter(**dict(lookups)).update(**increments)
+        self.deltas.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+
+
+def rounded_average(total, count, digits=1):
+    """Return an expression computing ROUND(total / count, digits) in the database."""
+    return Func(
+        Cast(total, FloatField()) / count,
+        template='ROUND(CAST(%(expressions)s AS NUMERIC), {})'.format(int(digits)),
+        output_field=FloatField()
+    )
+
+
+def increment(target, lookups=None, **deltas):
+    """Apply deltas right away to a single row."""
+    with Counters() as counters:
+        counters.add(target, lookups, **deltas)
@@ -0,0 +1,116 @@
+"""Testing utilities."""
+
+# Django
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Utilities
+import re
+
+
+TRANSACTION_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT', 'BEGIN', 'COMMIT')
+
+
+class QueryBudgetMixin:
+    """Query budget assertions for API test cases.
+
+    Endpoints must issue a fixed number of queries no matter
+    how many items the page holds. Budgets are measured once
+    caches are warm, transaction control statements are not
+    counted.
+    """
+
+    def assertQueryBudget(self, url, budget, page_sizes=(1, 10), **params):
+        """Verify every page size of a list endpoint fits the same query budget."""
+        self.client.get(url, dict(params, limit=page_sizes[0]))
+
+        counts = {}
+        for page_size in page_sizes:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url, dict(params, limit=page_size))
+            self.assertEqual(response.status_code, 200, response.data)
+            self.assertEqual(
+                len(response.data['results']),
+                page_size,
+                'Not enough data to fill a page of {} items.'.format(page_size)
+            )
+            counts[page_size] = [
+                query for query in context.captured_queries
+                if not query['sql'].upper().startswith(TRANSACTION_STATEMENTS)
+            ]
+
+        for page_size, queries in counts.items():
+            self.assertLessEqual(
+                len(queries),
+                budget,
+                '{} queries for a page of {} items:\n{}'.format(
+                    len(queries),
+                    page_size,
+                    '\n'.join(query['sql'] for query in queries)
+                )
+            )
+        self.assertEqual(
+            len({len(queries) for queries in counts.values()}),
+            1,
+            'Query count depends on page size: {}'.format(
+                {size: len(queries) for size, queries in counts.items()}
+            )
+        )
+
+
+class QueryPlanMixin:
+    """Query plan assertions for API test cases.
+
+    Every SELECT issued by an endpoint is explained, the test
+    fails if the database would read a whole table to answer
+    it. Sequential scans are disabled on PostgreSQL so tiny test
+    tables still show whether an index could serve the query.
+    """
+
+    def explain(self, sql, params):
+        """Return the plan lines of a query."""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET enable_seqscan = off')
+                try:
+                    cursor.execute('EXPLAIN ' + sql, params)
+                    return [row[0] for row in cursor.fetchall()]
+                finally:
+                    cursor.execute('RESET enable_seqscan')
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    @staticmethod
+    def is_sequential_scan(line):
+        """Tell whether a plan line reads a whole table."""
+        return 'Seq Scan' in line or bool(re.match(r'SCAN (TABLE )?\w+$', line))
+
+    def assertIndexedQueries(self, url, indexes=(), **params):
+        """Verify no query of the endpoint falls back to a sequential scan.
+
+        `indexes` names the indexes the plans are expected to use.
+        """
+        queries = []
+
+        def capture(execute, sql, sql_params, many, context):
+            queries.append((sql, sql_params))
+            return execute(sql, sql_params, many, context)
+
+        with connection.execute_wrapper(capture):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+
+        plans = []
+        for sql, sql_params in queries:
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            plan = self.explain(sql, sql_params)
+            scans = [line for line in plan if self.is_sequential_scan(line)]
+            self.assertEqual(scans, [], 'Sequential scan in:\n{}'.format(sql))
+            plans += plan
+        self.assertTrue(plans)
+        for index in indexes:
+            self.assertTrue(
+                any(index in line for line in plans),
+                'Index {} not used:\n{}'.format(index, '\n'.join(plans))
+            )
@@ -0,0 +1,24 @@
+"""Text utilities."""
+
+# Utilities
+import re
+import unicodedata
+
+
+NON_ALPHANUMERIC = re.compile(r'[^a-z0-9]+')
+
+
+def normalize(text):
+    """Return the text lowercased, without accents and punctuation."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    folded = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return NON_ALPHANUMERIC.sub(' ', folded.lower()).strip()
+
+
+def tokenize(text):
+    """Return the unique normalized tokens of the text, keeping their order."""
+    tokens = []
+    for token in normalize(text).split():
+        if token not in tokens:
+            tokens.append(token)
+    return tokens
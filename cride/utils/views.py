@@ -0,0 +1,238 @@
+"""Views utilities."""
+
+# Django
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import Count, Max, Prefetch
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+# Django REST Framework
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField, RelatedField
+
+# Utilities
+from cride.utils.db import SAFE_METHODS, is_pinned, replica_reads
+from cride.utils.fast_serializers import compile_serializer
+import hashlib
+
+
+def get_eager_loading(serializer, model):
+    """Return the (select_related, prefetch_related) lookups a serializer needs.
+
+    Walk the serializer fields looking for relations: nested
+    serializers and related fields over forward or one-to-one
+    relations are joined, to-many relations are prefetched with
+    their own nested lookups.
+    """
+    select_related = []
+    prefetch_related = []
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*' or len(field.source_attrs) != 1:
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue
+        if not model_field.is_relation:
+            continue
+
+        if isinstance(field, serializers.ListSerializer):
+            child_select, child_prefetch = get_eager_loading(field.child, model_field.related_model)
+            queryset = model_field.related_model._default_manager.select_related(
+                *child_select
+            ).prefetch_related(*child_prefetch)
+            prefetch_related.append(Prefetch(field.source, queryset=queryset))
+        elif isinstance(field, ManyRelatedField):
+            prefetch_related.append(field.source)
+        elif isinstance(field, serializers.BaseSerializer):
+            select_related.append(field.source)
+            child_select, child_prefetch = get_eager_loading(field, model_field.related_model)
+            select_related += ['{}__{}'.format(field.source, lookup) for lookup in child_select]
+            for lookup in child_prefetch:
+                if isinstance(lookup, Prefetch):
+                    lookup.add_prefix(field.source)
+                else:
+                    lookup = '{}__{}'.format(field.source, lookup)
+                prefetch_related.append(lookup)
+        elif isinstance(field, RelatedField) and not isinstance(field, PrimaryKeyRelatedField):
+            select_related.append(field.source)
+    return select_related, prefetch_related
+
+
+class EagerLoadingMixin:
+    """Eager loading mixin.
+
+    Optimize viewset querysets so serializing a whole page costs
+    a fixed number of queries. The lookups are derived from the
+    serializer used by the current action, `eager_loading` maps
+    actions to a different serializer class when the response is
+    rendered with another serializer than the one used for input.
+    """
+
+    eager_loading = {}
+
+    def get_eager_loading_serializer_class(self):
+        """Return the serializer class whose output must be optimized."""
+        return self.eager_loading.get(self.action) or self.get_serializer_class()
+
+    def optimize_queryset(self, queryset):
+        """Apply the select and prefetch related lookups of the current action."""
+        serializer = self.get_eager_loading_serializer_class()()
+        select_related, prefetch_related = get_eager_loading(serializer, queryset.model)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+
+class ReplicaReadMixin:
+    """Replica read mixin.
+
+    Serve the `replica_actions` of a viewset from the read replicas
+    unless the client wrote recently, see cride.utils.db.
+    """
+
+    replica_actions = ('list', 'retrieve')
+
+    def dispatch(self, request, *args, **kwargs):
+        action = getattr(self, 'action_map', {}).get(request.method.lower())
+        use_replica = (
+            request.method in SAFE_METHODS and
+            action in self.replica_actions and
+            not is_pinned(request)
+        )
+        with replica_reads(use_replica):
+            return super(ReplicaReadMixin, self).dispatch(request, *args, **kwargs)
+
+
+class TransactionPolicyMixin:
+    """Transaction policy mixin.
+
+    Requests run in autocommit unless their action is listed in
+    `atomic_actions`, those run in a transaction that is rolled
+    back when the request fails with an API exception.
+    """
+
+    atomic_actions = ('create', 'update', 'partial_update', 'destroy')
+
+    def dispatch(self, request, *args, **kwargs):
+        action = getattr(self, 'action_map', {}).get(request.method.lower())
+        if action not in self.atomic_actions:
+            return super(TransactionPolicyMixin, self).dispatch(request, *args, **kwargs)
+
+        with transaction.atomic():
+            response = super(TransactionPolicyMixin, self).dispatch(request, *args, **kwargs)
+            if getattr(response, 'exception', False):
+                transaction.set_rollback(True)
+        return response
+
+
+class ConditionalMixin:
+    """Conditional requests mixin.
+
+    Add ETag and Last-Modified headers to list and retrieve responses
+    and answer 304 Not Modified when the client already has them.
+    Validators come from the rows' `modified` timestamps and those
+    of the related rows listed in `validator_relations` (nested
+    users, profiles): a list is unchanged while the number of rows
+    and the latest `modified` of the filtered queryset are, which
+    one aggregate query tells without serializing anything. Updates
+    done with `QuerySet.update()` must bump `modified` themselves.
+    """
+
+    validator_relations = ()
+
+    def get_validators(self, queryset):
+        """Return the number of rows of the queryset and the last time they or their related rows changed."""
+        lookups = ['modified'] + ['{}__modified'.format(relation) for relation in self.validator_relations]
+        validators = queryset.order_by().aggregate(
+            count=Count('pk', distinct=True),
+            **{'modified_{}'.format(i): Max(lookup) for i, lookup in enumerate(lookups)}
+        )
+        count = validators.pop('count')
+        modified = [value for value in validators.values() if value is not None]
+        return count, max(modified) if modified else None
+
+    def get_etag(self, *parts):
+        """Return an ETag for the request and the given validator parts."""
+        request = self.request
+        renderer = getattr(request, 'accepted_media_type', '')
+        key = '|'.join(str(part) for part in (
+            type(self).__name__, self.action, renderer, request.get_full_path(), *parts
+        ))
+        return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+    def conditional_response(self, etag, last_modified, render):
+        """Return 304 when the client is up to date, otherwise the rendered response."""
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = render()
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        count, last_modified = self.get_validators(self.filter_queryset(self.get_queryset()))
+        return self.conditional_response(
+            self.get_etag(count, last_modified),
+            last_modified,
+            lambda: self.get_list_response(request, *args, **kwargs)
+        )
+
+    def get_list_response(self, request, *args, **kwargs):
+        """Return the full list response."""
+        return super(ConditionalMixin, self).list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        count, last_modified = self.get_validators(type(instance)._default_manager.filter(pk=instance.pk))
+        return self.conditional_response(
+            self.get_etag(instance.pk, last_modified),
+            last_modified,
+            lambda: Response(self.get_serializer(instance).data)
+        )
+
+
+class FastListMixin:
+    """Fast list mixin.
+
+    Serialize list pages with the compiled version of the list
+    serializer, see cride.utils.fast_serializers, unless the
+    FAST_LIST_SERIALIZERS setting is off. `string_fields` tells
+    the compiler how StringRelatedField models are represented.
+    """
+
+    string_fields = {}
+
+    def get_compiled_serializer(self):
+        """Return the compiled serializer of the current action."""
+        return compile_serializer(self.get_serializer_class(), tuple(sorted(self.string_fields.items())))
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_LIST_SERIALIZERS:
+            return super(FastListMixin, self).list(request, *args, **kwargs)
+
+        compiled = self.get_compiled_serializer()
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = (
+            list(queryset.query.order_by) +
+            list(getattr(self, 'ordering', None) or ()) +
+            list(queryset.model._meta.ordering)
+        )
+        # Rows carry the fields they are ordered by, for the pagination cursors
+        sort_keys = [field.lstrip('-') for field in ordering if isinstance(field, str) and field != '?']
+        rows = compiled.values(queryset, *sort_keys, 'pk')
+
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(compiled.serialize(page, context))
+        return Response(compiled.serialize(rows, context))